@@ -6,6 +6,8 @@ from alembic import context
 from app.core.config import settings
 from app.models.base import Base
 
+import app.models.batch  # noqa: F401
+import app.models.comparison  # noqa: F401
 import app.models.template  # noqa: F401
 import app.models.pipeline  # noqa: F401
 import app.models.user  # noqa: F401
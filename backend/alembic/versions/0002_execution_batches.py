@@ -0,0 +1,85 @@
+"""execution_batches
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "execution_batches",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("template_id", sa.Integer(), nullable=True),
+        sa.Column("pipeline_id", sa.Integer(), nullable=True),
+        sa.Column("provider", sa.String(50), nullable=True),
+        sa.Column("model", sa.String(100), nullable=True),
+        sa.Column("concurrency", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(
+            ["template_id"], ["templates.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["pipeline_id"], ["pipelines.id"], ondelete="CASCADE"
+        ),
+    )
+    op.create_index(
+        op.f("ix_execution_batches_user_id"), "execution_batches", ["user_id"]
+    )
+
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.add_column(sa.Column("batch_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_executions_batch_id",
+            "execution_batches",
+            ["batch_id"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+        batch_op.create_index(op.f("ix_executions_batch_id"), ["batch_id"])
+
+    with op.batch_alter_table("pipeline_executions") as batch_op:
+        batch_op.add_column(sa.Column("batch_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_pipeline_executions_batch_id",
+            "execution_batches",
+            ["batch_id"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+        batch_op.create_index(op.f("ix_pipeline_executions_batch_id"), ["batch_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("pipeline_executions") as batch_op:
+        batch_op.drop_index(op.f("ix_pipeline_executions_batch_id"))
+        batch_op.drop_constraint("fk_pipeline_executions_batch_id", type_="foreignkey")
+        batch_op.drop_column("batch_id")
+
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.drop_index(op.f("ix_executions_batch_id"))
+        batch_op.drop_constraint("fk_executions_batch_id", type_="foreignkey")
+        batch_op.drop_column("batch_id")
+
+    op.drop_index(op.f("ix_execution_batches_user_id"), table_name="execution_batches")
+    op.drop_table("execution_batches")
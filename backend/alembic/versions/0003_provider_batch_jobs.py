@@ -0,0 +1,94 @@
+"""provider_batch_jobs
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("execution_batches") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "mode",
+                sa.String(20),
+                nullable=False,
+                server_default="interactive",
+            )
+        )
+
+    op.create_table(
+        "provider_batch_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("execution_batch_id", sa.Integer(), nullable=False),
+        sa.Column("provider", sa.String(50), nullable=False),
+        sa.Column("provider_batch_id", sa.String(255), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("request_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(
+            ["execution_batch_id"], ["execution_batches.id"], ondelete="CASCADE"
+        ),
+    )
+    op.create_index(
+        op.f("ix_provider_batch_jobs_execution_batch_id"),
+        "provider_batch_jobs",
+        ["execution_batch_id"],
+    )
+    op.create_index(
+        op.f("ix_provider_batch_jobs_status"), "provider_batch_jobs", ["status"]
+    )
+
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.add_column(
+            sa.Column("provider_batch_job_id", sa.Integer(), nullable=True)
+        )
+        batch_op.create_foreign_key(
+            "fk_executions_provider_batch_job_id",
+            "provider_batch_jobs",
+            ["provider_batch_job_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+        batch_op.create_index(
+            op.f("ix_executions_provider_batch_job_id"), ["provider_batch_job_id"]
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.drop_index(op.f("ix_executions_provider_batch_job_id"))
+        batch_op.drop_constraint(
+            "fk_executions_provider_batch_job_id", type_="foreignkey"
+        )
+        batch_op.drop_column("provider_batch_job_id")
+
+    op.drop_index(
+        op.f("ix_provider_batch_jobs_status"), table_name="provider_batch_jobs"
+    )
+    op.drop_index(
+        op.f("ix_provider_batch_jobs_execution_batch_id"),
+        table_name="provider_batch_jobs",
+    )
+    op.drop_table("provider_batch_jobs")
+
+    with op.batch_alter_table("execution_batches") as batch_op:
+        batch_op.drop_column("mode")
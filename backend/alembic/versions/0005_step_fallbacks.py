@@ -0,0 +1,37 @@
+"""step_fallbacks
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("pipeline_steps") as batch_op:
+        batch_op.add_column(
+            sa.Column("fallbacks", sa.Text(), nullable=False, server_default="[]")
+        )
+
+    with op.batch_alter_table("pipeline_step_executions") as batch_op:
+        batch_op.add_column(sa.Column("provider", sa.String(50), nullable=True))
+        batch_op.add_column(sa.Column("model", sa.String(100), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("pipeline_step_executions") as batch_op:
+        batch_op.drop_column("model")
+        batch_op.drop_column("provider")
+
+    with op.batch_alter_table("pipeline_steps") as batch_op:
+        batch_op.drop_column("fallbacks")
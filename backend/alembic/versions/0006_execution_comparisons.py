@@ -0,0 +1,62 @@
+"""execution_comparisons
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "execution_comparisons",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("template_id", sa.Integer(), nullable=False),
+        sa.Column("variables", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["template_id"], ["templates.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        op.f("ix_execution_comparisons_user_id"), "execution_comparisons", ["user_id"]
+    )
+
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.add_column(sa.Column("comparison_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_executions_comparison_id",
+            "execution_comparisons",
+            ["comparison_id"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+        batch_op.create_index(op.f("ix_executions_comparison_id"), ["comparison_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.drop_index(op.f("ix_executions_comparison_id"))
+        batch_op.drop_constraint("fk_executions_comparison_id", type_="foreignkey")
+        batch_op.drop_column("comparison_id")
+
+    op.drop_index(
+        op.f("ix_execution_comparisons_user_id"), table_name="execution_comparisons"
+    )
+    op.drop_table("execution_comparisons")
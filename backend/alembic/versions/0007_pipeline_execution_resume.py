@@ -0,0 +1,35 @@
+"""pipeline_execution_resume
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("pipeline_executions") as batch_op:
+        batch_op.add_column(sa.Column("resumed_from_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_pipeline_executions_resumed_from_id",
+            "pipeline_executions",
+            ["resumed_from_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("pipeline_executions") as batch_op:
+        batch_op.drop_constraint("fk_pipeline_executions_resumed_from_id", type_="foreignkey")
+        batch_op.drop_column("resumed_from_id")
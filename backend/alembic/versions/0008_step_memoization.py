@@ -0,0 +1,35 @@
+"""step_memoization
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("pipeline_step_executions") as batch_op:
+        batch_op.add_column(sa.Column("fingerprint", sa.String(length=64), nullable=True))
+        batch_op.add_column(
+            sa.Column("memoized", sa.Boolean(), nullable=False, server_default=sa.false())
+        )
+        batch_op.create_index(
+            "ix_pipeline_step_executions_fingerprint", ["fingerprint"], unique=False
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("pipeline_step_executions") as batch_op:
+        batch_op.drop_index("ix_pipeline_step_executions_fingerprint")
+        batch_op.drop_column("memoized")
+        batch_op.drop_column("fingerprint")
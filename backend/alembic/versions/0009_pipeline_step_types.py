@@ -0,0 +1,39 @@
+"""pipeline_step_types
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("pipeline_steps") as batch_op:
+        batch_op.add_column(
+            sa.Column("step_type", sa.String(20), nullable=False, server_default="prompt")
+        )
+        batch_op.add_column(
+            sa.Column("options", sa.Text(), nullable=False, server_default="{}")
+        )
+        batch_op.alter_column("template_id", existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column("provider", existing_type=sa.String(50), nullable=True)
+        batch_op.alter_column("model", existing_type=sa.String(100), nullable=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("pipeline_steps") as batch_op:
+        batch_op.alter_column("model", existing_type=sa.String(100), nullable=False)
+        batch_op.alter_column("provider", existing_type=sa.String(50), nullable=False)
+        batch_op.alter_column("template_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column("options")
+        batch_op.drop_column("step_type")
@@ -0,0 +1,28 @@
+"""skipped_status
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite stores the enum as plain text; only PostgreSQL has a type to extend
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE executionstatus ADD VALUE IF NOT EXISTS 'SKIPPED'")
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop a value from an enum type
+    pass
@@ -0,0 +1,33 @@
+"""estimated_cost
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.add_column(sa.Column("estimated_cost", sa.Float(), nullable=True))
+
+    with op.batch_alter_table("pipeline_executions") as batch_op:
+        batch_op.add_column(sa.Column("estimated_cost", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("pipeline_executions") as batch_op:
+        batch_op.drop_column("estimated_cost")
+
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.drop_column("estimated_cost")
@@ -0,0 +1,35 @@
+"""cache_token_counts
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0012"
+down_revision: Union[str, Sequence[str], None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("executions", "pipeline_step_executions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(
+                sa.Column("cache_read_tokens", sa.Integer(), nullable=False, server_default="0")
+            )
+            batch_op.add_column(
+                sa.Column("cache_write_tokens", sa.Integer(), nullable=False, server_default="0")
+            )
+
+
+def downgrade() -> None:
+    for table in ("pipeline_step_executions", "executions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("cache_write_tokens")
+            batch_op.drop_column("cache_read_tokens")
@@ -0,0 +1,37 @@
+"""call_instrumentation
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0013"
+down_revision: Union[str, Sequence[str], None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CALL_COLUMNS = ("input_tokens", "output_tokens", "queue_wait_ms", "provider_latency_ms", "first_token_ms")
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.add_column(sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+    for table in ("executions", "pipeline_step_executions"):
+        with op.batch_alter_table(table) as batch_op:
+            for column in CALL_COLUMNS:
+                batch_op.add_column(sa.Column(column, sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    for table in ("pipeline_step_executions", "executions"):
+        with op.batch_alter_table(table) as batch_op:
+            for column in reversed(CALL_COLUMNS):
+                batch_op.drop_column(column)
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.drop_column("attempts")
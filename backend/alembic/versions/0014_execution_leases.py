@@ -0,0 +1,29 @@
+"""execution_leases
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0014"
+down_revision: Union[str, Sequence[str], None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("executions", "pipeline_executions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    for table in ("pipeline_executions", "executions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("claimed_at")
@@ -0,0 +1,27 @@
+"""pipeline_execution_options
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0015"
+down_revision: Union[str, Sequence[str], None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("pipeline_executions") as batch_op:
+        batch_op.add_column(sa.Column("options", sa.Text(), nullable=False, server_default="{}"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("pipeline_executions") as batch_op:
+        batch_op.drop_column("options")
@@ -0,0 +1,27 @@
+"""execution_options
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0016"
+down_revision: Union[str, Sequence[str], None] = "0015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.add_column(sa.Column("options", sa.Text(), nullable=False, server_default="{}"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("executions") as batch_op:
+        batch_op.drop_column("options")
@@ -0,0 +1,29 @@
+"""call_coalesced
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0017"
+down_revision: Union[str, Sequence[str], None] = "0016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("executions", "pipeline_step_executions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("coalesced", sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    for table in ("pipeline_step_executions", "executions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("coalesced")
@@ -0,0 +1,29 @@
+"""call_hedged
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0018"
+down_revision: Union[str, Sequence[str], None] = "0017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("executions", "pipeline_step_executions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("hedged", sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    for table in ("pipeline_step_executions", "executions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("hedged")
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from app.api.auth import router as auth_router
+from app.api.batches import router as batches_router
+from app.api.comparisons import router as comparisons_router
 from app.api.executions import router as executions_router
 from app.api.pipelines import executions_router as pipeline_executions_router
 from app.api.pipelines import router as pipelines_router
@@ -14,3 +16,5 @@ api_router.include_router(executions_router)
 api_router.include_router(providers_router)
 api_router.include_router(pipelines_router)
 api_router.include_router(pipeline_executions_router)
+api_router.include_router(batches_router)
+api_router.include_router(comparisons_router)
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.background import spawn
+from app.core.config import settings
+from app.core.database import get_background_db, get_db
+from app.core.security import get_current_user
+from app.engine.batch_runner import BatchRunner
+from app.models.execution import ExecutionStatus
+from app.models.user import User
+from app.schemas.batch import BatchCreateRequest, BatchResultListResponse, BatchSchema
+from app.services.batch_service import BatchService
+
+router = APIRouter(prefix="/batches", tags=["batches"])
+
+
+def _get_service(db: Session = Depends(get_db)) -> BatchService:
+    return BatchService(db)
+
+
+@router.post("/", response_model=BatchSchema, status_code=202)
+async def create_batch(
+    request: BatchCreateRequest,
+    service: BatchService = Depends(_get_service),
+    background_db: Session = Depends(get_background_db),
+    current_user: User = Depends(get_current_user),
+):
+    queued = settings.EXECUTION_MODE == "queue"
+    offline = request.mode == "offline"
+    try:
+        batch = service.create_batch(
+            request,
+            user_id=current_user.id,
+            status=ExecutionStatus.PENDING if queued and not offline else ExecutionStatus.RUNNING,
+            concurrency=request.concurrency or settings.BATCH_DEFAULT_CONCURRENCY,
+        )
+    except ValueError as e:
+        background_db.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if queued or offline:
+        # Offline rows are submitted to the provider Batch API by the worker
+        background_db.close()
+    else:
+        runner = BatchRunner(background_db, cache_mode=request.cache, coalesce=request.coalesce)
+        spawn(runner.run(batch.id))
+    return service.to_schema(batch)
+
+
+@router.get("/{batch_id}", response_model=BatchSchema)
+def get_batch(
+    batch_id: int,
+    service: BatchService = Depends(_get_service),
+    current_user: User = Depends(get_current_user),
+):
+    batch = service.get_batch(batch_id, user_id=current_user.id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return service.to_schema(batch)
+
+
+@router.get("/{batch_id}/results", response_model=BatchResultListResponse)
+def list_batch_results(
+    batch_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    service: BatchService = Depends(_get_service),
+    current_user: User = Depends(get_current_user),
+):
+    batch = service.get_batch(batch_id, user_id=current_user.id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    results, total = service.list_results(batch, skip=skip, limit=limit)
+    return BatchResultListResponse(results=results, total=total)
@@ -0,0 +1,88 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+
+from app.api.sse import stream_events
+from app.core.config import settings
+from app.core.database import get_background_db, get_db
+from app.core.security import get_current_user
+from app.models.execution import ExecutionStatus
+from app.models.user import User
+from app.schemas.comparison import ComparisonCreateRequest, ComparisonSchema
+from app.services.comparison_service import ComparisonService
+
+router = APIRouter(prefix="/comparisons", tags=["comparisons"])
+
+
+def _get_service(db: Session = Depends(get_db)) -> ComparisonService:
+    return ComparisonService(db)
+
+
+@router.post("/", response_model=ComparisonSchema, status_code=201)
+async def create_comparison(
+    request: ComparisonCreateRequest,
+    response: Response,
+    service: ComparisonService = Depends(_get_service),
+    current_user: User = Depends(get_current_user),
+):
+    queued = settings.EXECUTION_MODE == "queue"
+    try:
+        comparison = service.create_comparison(
+            request,
+            user_id=current_user.id,
+            status=ExecutionStatus.PENDING if queued else ExecutionStatus.RUNNING,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if queued:
+        response.status_code = 202
+    else:
+        await service.run_comparison(comparison, cache_mode=request.cache, coalesce=request.coalesce)
+    return service.to_schema(comparison)
+
+
+@router.post("/stream")
+async def stream_comparison(
+    request: ComparisonCreateRequest,
+    db: Session = Depends(get_background_db),
+    current_user: User = Depends(get_current_user),
+):
+    events: asyncio.Queue = asyncio.Queue()
+    service = ComparisonService(db, events=events)
+    try:
+        comparison = service.create_comparison(request, user_id=current_user.id, status=ExecutionStatus.RUNNING)
+    except ValueError as e:
+        db.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def run() -> tuple[str, dict]:
+        await service.run_comparison(comparison, cache_mode=request.cache, coalesce=request.coalesce)
+        return "completed", service.to_schema(comparison).model_dump(mode="json")
+
+    events.put_nowait(
+        (
+            "started",
+            {
+                "comparison_id": comparison.id,
+                "executions": [
+                    {"execution_id": e.id, "provider": e.provider, "model": e.model}
+                    for e in comparison.executions
+                ],
+            },
+        )
+    )
+    return stream_events(run(), events, db)
+
+
+@router.get("/{comparison_id}", response_model=ComparisonSchema)
+def get_comparison(
+    comparison_id: int,
+    service: ComparisonService = Depends(_get_service),
+    current_user: User = Depends(get_current_user),
+):
+    comparison = service.get_comparison(comparison_id, user_id=current_user.id)
+    if not comparison:
+        raise HTTPException(status_code=404, detail="Comparison not found")
+    return service.to_schema(comparison)
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.api.sse import stream_events
+from app.core.database import get_background_db, get_db
 from app.core.security import get_current_user
 from app.models.user import User
+from app.schemas.estimate import CostEstimateResponse
 from app.schemas.execution import (
     ExecutionCreateRequest,
     ExecutionListResponse,
@@ -19,17 +24,55 @@ def _get_service(db: Session = Depends(get_db)) -> ExecutionService:
 
 
 @router.post("/", response_model=ExecutionSchema, status_code=201)
-def execute_template(
+async def execute_template(
     request: ExecutionCreateRequest,
+    response: Response,
     service: ExecutionService = Depends(_get_service),
     current_user: User = Depends(get_current_user),
 ):
     try:
-        return service.execute_template(request, user_id=current_user.id)
+        if settings.EXECUTION_MODE == "queue":
+            response.status_code = 202
+            return service.enqueue_template(request, user_id=current_user.id)
+        return await service.execute_template(request, user_id=current_user.id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/estimate", response_model=CostEstimateResponse)
+def estimate_template_execution(
+    request: ExecutionCreateRequest,
+    service: ExecutionService = Depends(_get_service),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        return CostEstimateResponse.from_estimates(service.estimate(request, user_id=current_user.id))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/stream")
+async def stream_template_execution(
+    request: ExecutionCreateRequest,
+    db: Session = Depends(get_background_db),
+    current_user: User = Depends(get_current_user),
+):
+    events: asyncio.Queue = asyncio.Queue()
+    service = ExecutionService(db, events=events)
+    try:
+        execution = service.start_execution(request, user_id=current_user.id)
+    except ValueError as e:
+        db.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def run() -> tuple[str, dict]:
+        await service.run_execution(execution, cache_mode=request.cache, coalesce=request.coalesce)
+        return execution.status.value, ExecutionSchema.model_validate(execution).model_dump(mode="json")
+
+    events.put_nowait(("started", {"execution_id": execution.id}))
+    return stream_events(run(), events, db)
+
+
 @router.get("/", response_model=ExecutionListResponse)
 def list_executions(
     skip: int = Query(0, ge=0),
@@ -1,18 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.api.sse import stream_events
+from app.core.database import get_background_db, get_db
 from app.core.security import get_current_user
 from app.engine.pipeline_executor import PipelineExecutor
+from app.models.execution import ExecutionStatus
 from app.models.pipeline import Pipeline, PipelineExecution
 from app.models.user import User
+from app.schemas.estimate import CostEstimateResponse
 from app.schemas.pipeline import (
     PipelineCreateRequest,
+    PipelineEstimateRequest,
     PipelineExecuteRequest,
     PipelineExecutionListResponse,
     PipelineExecutionSchema,
     PipelineListResponse,
+    PipelineResumeRequest,
     PipelineSchema,
     PipelineStepSchema,
     PipelineUpdateRequest,
@@ -32,11 +40,14 @@ def _to_pipeline_schema(pipeline) -> PipelineSchema:
         PipelineStepSchema(
             id=s.id,
             step_order=s.step_order,
+            step_type=s.step_type,
             template_id=s.template_id,
-            template_name=s.template.name,
+            template_name=s.template.name if s.template else None,
             provider=s.provider,
             model=s.model,
             output_variable=s.output_variable,
+            fallbacks=s.fallbacks,
+            options=s.options,
         )
         for s in pipeline.steps
     ]
@@ -124,20 +135,87 @@ def delete_pipeline(
 
 
 @router.post("/{pipeline_id}/execute", response_model=PipelineExecutionSchema, status_code=201)
-def execute_pipeline(
+async def execute_pipeline(
     pipeline_id: int,
     request: PipelineExecuteRequest,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     try:
-        executor = PipelineExecutor(db)
-        execution = executor.execute(pipeline_id, request.variables, user_id=current_user.id)
+        executor = PipelineExecutor(
+            db,
+            cache_mode=request.cache,
+            coalesce=request.coalesce,
+            memoize=not request.force,
+            max_cost=request.max_cost_usd,
+        )
+        if settings.EXECUTION_MODE == "queue":
+            response.status_code = 202
+            execution = executor.enqueue(
+                pipeline_id, request.variables, user_id=current_user.id, max_parallel_steps=request.max_parallel_steps
+            )
+            return _enrich_pipeline_execution(execution)
+        execution = await executor.execute(
+            pipeline_id,
+            request.variables,
+            user_id=current_user.id,
+            max_parallel_steps=request.max_parallel_steps,
+        )
         return _enrich_pipeline_execution(execution)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/{pipeline_id}/estimate", response_model=CostEstimateResponse)
+def estimate_pipeline(
+    pipeline_id: int,
+    request: PipelineEstimateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        estimates = PipelineExecutor(db).estimate(pipeline_id, request.variables, user_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return CostEstimateResponse.from_estimates(estimates)
+
+
+@router.post("/{pipeline_id}/execute/stream")
+async def stream_pipeline_execution(
+    pipeline_id: int,
+    request: PipelineExecuteRequest,
+    db: Session = Depends(get_background_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not PipelineService(db).get_pipeline(pipeline_id, user_id=current_user.id):
+        db.close()
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+
+    events: asyncio.Queue = asyncio.Queue()
+    executor = PipelineExecutor(
+        db,
+        events=events,
+        cache_mode=request.cache,
+        coalesce=request.coalesce,
+        memoize=not request.force,
+        max_cost=request.max_cost_usd,
+    )
+    user_id = current_user.id
+
+    async def run() -> tuple[str, dict]:
+        execution = await executor.execute(
+            pipeline_id,
+            request.variables,
+            user_id=user_id,
+            max_parallel_steps=request.max_parallel_steps,
+        )
+        schema = PipelineExecutionSchema.model_validate(_enrich_pipeline_execution(execution))
+        return f"execution_{execution.status.value}", schema.model_dump(mode="json")
+
+    return stream_events(run(), events, db)
+
+
 @router.get("/{pipeline_id}/executions", response_model=PipelineExecutionListResponse)
 def list_pipeline_executions(
     pipeline_id: int,
@@ -205,3 +283,42 @@ def list_all_pipeline_executions(
         _enrich_pipeline_execution(execution)
 
     return PipelineExecutionListResponse(executions=executions, total=total)
+
+
+@executions_router.post("/{pipeline_execution_id}/resume", response_model=PipelineExecutionSchema, status_code=201)
+async def resume_pipeline_execution(
+    pipeline_execution_id: int,
+    response: Response,
+    request: PipelineResumeRequest | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    request = request or PipelineResumeRequest()
+    source = (
+        db.query(PipelineExecution)
+        .join(Pipeline, PipelineExecution.pipeline_id == Pipeline.id)
+        .filter(PipelineExecution.id == pipeline_execution_id, Pipeline.user_id == current_user.id)
+        .first()
+    )
+    if not source:
+        raise HTTPException(status_code=404, detail="Pipeline execution not found")
+
+    try:
+        executor = PipelineExecutor(
+            db, cache_mode=request.cache, coalesce=request.coalesce, max_cost=request.max_cost_usd
+        )
+        if settings.EXECUTION_MODE == "queue":
+            response.status_code = 202
+            execution = executor.create_resumed(
+                source,
+                user_id=current_user.id,
+                status=ExecutionStatus.PENDING,
+                max_parallel_steps=request.max_parallel_steps,
+            )
+            return _enrich_pipeline_execution(execution)
+        execution = await executor.resume(
+            source, user_id=current_user.id, max_parallel_steps=request.max_parallel_steps
+        )
+        return _enrich_pipeline_execution(execution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
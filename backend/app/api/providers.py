@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends
 
 from app.core.security import get_current_user
-from app.engine.providers import get_provider
+from app.engine.providers import list_provider_models
+from app.engine.circuit_breaker import circuit_breakers
+from app.engine.rate_limiter import rate_limiters
+from app.engine.response_cache import response_cache
 from app.models.user import User
 
 router = APIRouter(prefix="/providers", tags=["providers"])
@@ -12,7 +15,22 @@ def list_providers(current_user: User = Depends(get_current_user)):
     provider_names = ["anthropic", "openai"]
     return {
         "providers": [
-            {"name": name, "models": get_provider(name).list_models()}
+            {"name": name, "models": list_provider_models(name)}
             for name in provider_names
         ]
     }
+
+
+@router.get("/cache")
+def get_response_cache_stats(current_user: User = Depends(get_current_user)):
+    return response_cache.stats()
+
+
+@router.get("/limits")
+def get_rate_limiter_stats(current_user: User = Depends(get_current_user)):
+    return {"limiters": rate_limiters.stats()}
+
+
+@router.get("/circuits")
+def get_circuit_breaker_stats(current_user: User = Depends(get_current_user)):
+    return {"circuits": circuit_breakers.stats()}
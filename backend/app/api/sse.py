@@ -0,0 +1,39 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Awaitable
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.background import spawn
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_events(run: Awaitable[tuple[str, dict]], events: asyncio.Queue, db: Session) -> StreamingResponse:
+    spawn(_run_to_completion(run, events, db))
+    return StreamingResponse(_relay(events), media_type="text/event-stream")
+
+
+async def _run_to_completion(run: Awaitable[tuple[str, dict]], events: asyncio.Queue, db: Session) -> None:
+    try:
+        events.put_nowait(await run)
+    except ValueError as e:
+        events.put_nowait(("error", {"detail": str(e)}))
+    except Exception:
+        # The response has already started, so the client only learns of the failure from this event
+        logger.exception("Streamed run failed")
+        events.put_nowait(("error", {"detail": "Internal server error"}))
+    finally:
+        db.close()
+        events.put_nowait(None)
+
+
+async def _relay(events: asyncio.Queue) -> AsyncIterator[str]:
+    while (event := await events.get()) is not None:
+        yield format_sse(*event)
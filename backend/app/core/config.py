@@ -6,8 +6,52 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./prompt_lab.db"
     ANTHROPIC_API_KEY: str = ""
     OPENAI_API_KEY: str = ""
+    ANTHROPIC_BASE_URL: str = ""
+    OPENAI_BASE_URL: str = ""
     JWT_SECRET_KEY: str = "change-me-in-production"
     JWT_EXPIRATION_MINUTES: int = 1440
+    PIPELINE_MAX_PARALLEL_STEPS: int = 4
+    PIPELINE_MAP_CONCURRENCY: int = 8
+    USER_DAILY_BUDGET_USD: float = 0.0
+    EXECUTION_MODE: str = "inline"
+    WORKER_CONCURRENCY: int = 16
+    WORKER_POLL_INTERVAL_SECONDS: float = 1.0
+    WORKER_LEASE_SECONDS: float = 300.0
+    STREAM_CHECKPOINT_INTERVAL_SECONDS: float = 1.0
+    PROVIDER_MAX_CONNECTIONS: int = 100
+    PROVIDER_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    PROVIDER_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    PROVIDER_HTTP2: bool = False
+    PROVIDER_TIMEOUT_SECONDS: float = 600.0
+    PROVIDER_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    PROVIDER_CONCURRENCY_INITIAL: int = 4
+    PROVIDER_CONCURRENCY_MIN: int = 1
+    PROVIDER_CONCURRENCY_MAX: int = 64
+    PROVIDER_REQUESTS_PER_SECOND: float = 0.0
+    PROVIDER_RATE_LIMITS: dict[str, dict[str, float]] = {}
+    PROVIDER_RATE_LIMIT_BACKOFF_SECONDS: float = 1.0
+    PROVIDER_RATE_LIMIT_MAX_RETRIES: int = 5
+    PROVIDER_RETRY_MAX_ATTEMPTS: int = 3
+    PROVIDER_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    PROVIDER_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    PROVIDER_RETRY_DEADLINE_SECONDS: float = 300.0
+    PROVIDER_HEDGING: bool = False
+    PROVIDER_RETRY_POLICIES: dict[str, dict[str, float | bool]] = {}
+    CIRCUIT_BREAKER_WINDOW: int = 20
+    CIRCUIT_BREAKER_MIN_CALLS: int = 10
+    CIRCUIT_BREAKER_FAILURE_RATIO: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float = 120.0
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0
+    BATCH_DEFAULT_CONCURRENCY: int = 8
+    BATCH_RESULT_FLUSH_SIZE: int = 50
+    PROVIDER_BATCH_MAX_REQUESTS: int = 10000
+    PROVIDER_BATCH_POLL_INTERVAL_SECONDS: float = 60.0
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    RESPONSE_CACHE_DIR: str = ".response_cache"
+    RESPONSE_CACHE_MEMORY_ENTRIES: int = 1024
+    RESPONSE_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    RESPONSE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
 
     model_config = {"env_file": ".env"}
 
@@ -1,16 +1,46 @@
+import time
 from collections.abc import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.core.metrics import db_pool_checkout_wait, db_pool_connections_in_use
+
+
+class InstrumentedQueuePool(QueuePool):
+    """A QueuePool that times how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def instrument_pool(engine: Engine) -> None:
+    event.listen(engine, "checkout", lambda *_: db_pool_connections_in_use.inc())
+    event.listen(engine, "checkin", lambda *_: db_pool_connections_in_use.dec())
+
 
 connect_args = {}
 if settings.DATABASE_URL.startswith("sqlite"):
     connect_args["check_same_thread"] = False
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(bind=engine)
+engine_options = {}
+# In-memory SQLite keeps its default single-connection pool
+if ":memory:" not in settings.DATABASE_URL and settings.DATABASE_URL != "sqlite://":
+    engine_options["poolclass"] = InstrumentedQueuePool
+
+engine = create_engine(settings.DATABASE_URL, connect_args=connect_args, **engine_options)
+instrument_pool(engine)
+# Executions commit before awaiting a provider so that no connection is held
+# across the call; keep loaded attributes so that reading them afterwards
+# doesn't check out a connection again
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -19,3 +49,7 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_background_db() -> Session:
+    return SessionLocal()
@@ -0,0 +1,311 @@
+"""In-process metrics with Prometheus text exposition.
+
+Metrics are counters, gauges and histograms keyed by label values. With
+``METRICS_MULTIPROC_DIR`` set, every process periodically writes its
+values to ``<dir>/<pid>.json`` and a scrape of any process merges all
+files: counters and histograms are summed over every process that ever
+wrote, so they never go backwards when a worker restarts, while gauges
+are summed over live processes only. A starting process folds the files
+of exited processes into its own, so the directory holds about one file
+per live process.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelKey = tuple[str, ...]
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: dict[LabelKey, float | list[float]] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict[LabelKey, float | list[float]]:
+        with self._lock:
+            return {key: value.copy() if isinstance(value, list) else value for key, value in self.values.items()}
+
+    def merge(self, total: dict, values: dict) -> None:
+        for key, value in values.items():
+            total[key] = total.get(key, 0.0) + value
+
+    def absorb(self, values: dict) -> None:
+        with self._lock:
+            self.merge(self.values, values)
+
+    def samples(self, values: dict) -> Iterator[tuple[str, dict[str, str], float]]:
+        for key, value in sorted(values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+    @contextmanager
+    def track_in_progress(self, **labels: str) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    """Per label set: a count per bucket (the last one is +Inf), then the sum."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self.values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            counts[bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    def merge(self, total: dict, values: dict) -> None:
+        for key, counts in values.items():
+            current = total.setdefault(key, [0.0] * len(counts))
+            for i, count in enumerate(counts):
+                current[i] += count
+
+    def samples(self, values: dict) -> Iterator[tuple[str, dict[str, str], float]]:
+        for key, counts in sorted(values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_number(bound)}, cumulative
+            yield f"{self.name}_sum", labels, counts[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    def __init__(self, multiprocess_dir: str = ""):
+        self.multiprocess_dir = Path(multiprocess_dir) if multiprocess_dir else None
+        self.metrics: dict[str, Metric] = {}
+        # The periodic flusher and scrapes on the threadpool both flush
+        self._flush_lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def flush(self, exiting: bool = False) -> None:
+        """Write this process's values for other processes to merge.
+
+        A process that is shutting down drops its gauges, which describe
+        only its own live state.
+        """
+        if self.multiprocess_dir is None:
+            return
+        payload = {
+            name: [[list(key), value] for key, value in metric.snapshot().items()]
+            for name, metric in self.metrics.items()
+            if not (exiting and metric.kind == "gauge")
+        }
+        self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+        path = self.multiprocess_dir / f"{os.getpid()}.json"
+        with self._flush_lock:
+            with tempfile.NamedTemporaryFile("w", dir=self.multiprocess_dir, suffix=".tmp", delete=False) as temporary:
+                temporary.write(json.dumps(payload))
+            os.replace(temporary.name, path)
+
+    def absorb_exited_processes(self) -> None:
+        """Take over the counters and histograms of processes that have exited.
+
+        Their values live on in this process's file, and their own files are
+        removed. Each file is claimed by renaming it, so processes starting
+        together never absorb the same one twice.
+        """
+        if self.multiprocess_dir is None or not self.multiprocess_dir.is_dir():
+            return
+        claimed = []
+        for path in self.multiprocess_dir.glob("*.json"):
+            if _is_alive(int(path.stem)):
+                continue
+            target = path.with_suffix(f".absorbed-{os.getpid()}")
+            try:
+                path.rename(target)
+            except FileNotFoundError:
+                continue
+            claimed.append(target)
+            try:
+                payload = json.loads(target.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, entries in payload.items():
+                metric = self.metrics.get(name)
+                if metric is None or metric.kind == "gauge":
+                    continue
+                metric.absorb({tuple(key): value for key, value in entries})
+        if claimed:
+            self.flush()
+        for target in claimed:
+            target.unlink()
+
+    async def flush_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.flush()
+
+    def collect(self) -> dict[str, dict]:
+        """Current values of every metric, merged across processes."""
+        if self.multiprocess_dir is None:
+            return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+        self.flush()
+        totals: dict[str, dict] = {name: {} for name in self.metrics}
+        for path in self.multiprocess_dir.glob("*.json"):
+            try:
+                payload = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            alive = _is_alive(int(path.stem))
+            for name, entries in payload.items():
+                metric = self.metrics.get(name)
+                if metric is None or (metric.kind == "gauge" and not alive):
+                    continue
+                metric.merge(totals[name], {tuple(key): value for key, value in entries})
+        return totals
+
+    def render(self) -> str:
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for sample_name, labels, value in metric.samples(values):
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+
+def _is_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+metrics = MetricsRegistry(settings.METRICS_MULTIPROC_DIR)
+
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the response body is sent.",
+    ("method", "route", "status"),
+)
+provider_request_duration = metrics.histogram(
+    "provider_request_duration_seconds", "Latency of each request sent to a provider.", ("provider", "model")
+)
+provider_first_token = metrics.histogram(
+    "provider_first_token_seconds", "Time to the first streamed text of a provider request.", ("provider", "model")
+)
+provider_queue_wait = metrics.histogram(
+    "provider_queue_wait_seconds", "Time waiting for a provider concurrency slot.", ("provider", "model")
+)
+provider_requests = metrics.counter(
+    "provider_requests_total", "Provider requests by outcome: ok or the error type.", ("provider", "model", "outcome")
+)
+provider_tokens = metrics.histogram(
+    "provider_tokens", "Tokens per provider request.", ("provider", "model", "direction"), TOKEN_BUCKETS
+)
+provider_cache_tokens = metrics.counter(
+    "provider_cache_tokens_total", "Prompt tokens read from or written to provider caches.", ("provider", "model", "kind")
+)
+pipeline_step_duration = metrics.histogram(
+    "pipeline_step_duration_seconds", "Pipeline step duration, including waiting for a step slot.", ("step_type", "status")
+)
+db_pool_checkout_wait = metrics.histogram("db_pool_checkout_wait_seconds", "Time waiting for a pooled DB connection.")
+db_pool_connections_in_use = metrics.gauge("db_pool_connections_in_use", "DB connections checked out of the pool.")
+executions_in_flight = metrics.gauge("executions_in_flight", "Executions currently running.", ("kind",))
+cache_lookups = metrics.counter("cache_lookups_total", "Response cache and step memo lookups.", ("cache", "result"))
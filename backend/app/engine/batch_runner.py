@@ -0,0 +1,120 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.engine.execution_plan import compile_execution_plan
+from app.engine.pipeline_executor import PipelineExecutor
+from app.engine.providers import get_provider, provider_generation_params
+from app.engine.providers.base import LLMProvider
+from app.engine.providers.call_stats import track_call
+from app.engine.response_cache import CACHE_BYPASS
+from app.engine.token_estimator import check_context_window
+from app.engine.variable_substitution import CompiledTemplate, compile_template_version
+from app.models.batch import ExecutionBatch
+from app.models.execution import Execution, ExecutionStatus
+from app.models.pipeline import PipelineExecution
+from app.models.template import TemplateVersion
+from app.services.pipeline_service import PipelineService
+
+
+class BatchRunner:
+    def __init__(self, db: Session, cache_mode: str = CACHE_BYPASS, coalesce: bool = False):
+        self.db = db
+        self.cache_mode = cache_mode
+        self.coalesce = coalesce
+        self._results: list[dict] = []
+
+    async def run(self, batch_id: int) -> None:
+        try:
+            batch = self.db.get(ExecutionBatch, batch_id)
+            if batch.template_id is not None:
+                await self._run_template_batch(batch)
+            else:
+                await self._run_pipeline_batch(batch)
+        finally:
+            self.db.close()
+
+    async def _run_template_batch(self, batch: ExecutionBatch) -> None:
+        rows = (
+            self.db.query(Execution.id, Execution.variables, Execution.template_version_id)
+            .filter(Execution.batch_id == batch.id, Execution.status == ExecutionStatus.RUNNING)
+            .order_by(Execution.id)
+            .all()
+        )
+        if not rows:
+            return
+
+        version = self.db.get(TemplateVersion, rows[0].template_version_id)
+        template = compile_template_version(version.id, version.content)
+        provider = get_provider(batch.provider, cache_mode=self.cache_mode, coalesce=self.coalesce)
+        semaphore = asyncio.Semaphore(batch.concurrency)
+
+        async def run_row(execution_id: int, variables: str) -> None:
+            async with semaphore:
+                result = await self._execute_row(provider, batch.provider, batch.model, template, execution_id, variables)
+            self._results.append(result)
+            if len(self._results) >= settings.BATCH_RESULT_FLUSH_SIZE:
+                self._flush_results()
+
+        await asyncio.gather(*(run_row(row.id, row.variables) for row in rows))
+        self._flush_results()
+
+    async def _execute_row(
+        self,
+        provider: LLMProvider,
+        provider_name: str,
+        model: str,
+        template: CompiledTemplate,
+        execution_id: int,
+        variables: str,
+    ) -> dict:
+        result = {"id": execution_id, "output": None, "error": None}
+        with track_call() as call:
+            try:
+                prompt = template.render(json.loads(variables))
+                check_context_window(provider_name, model, prompt, provider_generation_params(provider_name))
+                result["output"] = await provider.execute(prompt, model)
+                result["status"] = ExecutionStatus.COMPLETED
+            except Exception as e:
+                result["error"] = str(e)
+                result["status"] = ExecutionStatus.FAILED
+        result.update(call.columns())
+        result["completed_at"] = datetime.now(timezone.utc)
+        return result
+
+    def _flush_results(self) -> None:
+        if not self._results:
+            return
+        results, self._results = self._results, []
+        self.db.execute(update(Execution), results)
+        self.db.commit()
+
+    async def _run_pipeline_batch(self, batch: ExecutionBatch) -> None:
+        pipeline_executions = (
+            self.db.query(PipelineExecution)
+            .filter(PipelineExecution.batch_id == batch.id, PipelineExecution.status == ExecutionStatus.RUNNING)
+            .order_by(PipelineExecution.id)
+            .all()
+        )
+        pipeline = PipelineService(self.db).get_pipeline(batch.pipeline_id, batch.user_id)
+        plan = compile_execution_plan(self.db, pipeline, batch.user_id)
+        executor = PipelineExecutor(self.db, cache_mode=self.cache_mode, coalesce=self.coalesce)
+        semaphore = asyncio.Semaphore(batch.concurrency)
+
+        async def run_row(pipeline_execution: PipelineExecution) -> None:
+            variables = json.loads(pipeline_execution.variables)
+            try:
+                plan.check_variables(variables)
+            except ValueError:
+                pipeline_execution.status = ExecutionStatus.FAILED
+                pipeline_execution.completed_at = datetime.now(timezone.utc)
+                self.db.commit()
+                return
+            async with semaphore:
+                await executor.run_plan(pipeline_execution, plan, variables)
+
+        await asyncio.gather(*(run_row(pe) for pe in pipeline_executions))
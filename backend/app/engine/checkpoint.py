@@ -0,0 +1,16 @@
+import time
+
+from app.core.config import settings
+
+
+class OutputCheckpoint:
+    def __init__(self, interval: float | None = None):
+        self.interval = settings.STREAM_CHECKPOINT_INTERVAL_SECONDS if interval is None else interval
+        self._last_saved = time.monotonic()
+
+    def is_due(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_saved < self.interval:
+            return False
+        self._last_saved = now
+        return True
@@ -0,0 +1,132 @@
+import time
+from collections import deque
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Error-rate and latency breaker for one (provider, model) pair.
+
+    The breaker opens once at least ``min_calls`` of the last ``window`` calls
+    were recorded and the share of failed or slow calls reaches
+    ``failure_ratio``. After ``open_seconds`` it half-opens and lets a single
+    probe through; the probe's outcome closes or re-opens it.
+    """
+
+    def __init__(
+        self,
+        window: int,
+        min_calls: int,
+        failure_ratio: float,
+        slow_call_seconds: float,
+        open_seconds: float,
+    ):
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                return False
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def is_open(self) -> bool:
+        return self.state == OPEN and time.monotonic() - self.opened_at < self.open_seconds
+
+    def record_success(self, seconds: float) -> None:
+        if seconds >= self.slow_call_seconds:
+            self.record_failure()
+            return
+        if self.state == HALF_OPEN:
+            self._close()
+            return
+        self._outcomes.append(False)
+
+    def record_failure(self) -> None:
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(True)
+        if len(self._outcomes) >= self.min_calls and self.failure_rate() >= self.failure_ratio:
+            self._open()
+
+    def record_ignored(self) -> None:
+        """The call ended without telling us anything about the provider."""
+        self._probe_in_flight = False
+
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def stats(self) -> dict:
+        state = self.state
+        if state == OPEN and not self.is_open():
+            state = HALF_OPEN
+        return {
+            "state": state,
+            "failure_rate": round(self.failure_rate(), 4),
+            "calls": len(self._outcomes),
+            "open_for": max(0.0, self.opened_at + self.open_seconds - time.monotonic()) if state == OPEN else 0.0,
+        }
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._outcomes.clear()
+        self._probe_in_flight = False
+
+
+class CircuitBreakerRegistry:
+    def __init__(self):
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, provider: str, model: str) -> CircuitBreaker:
+        key = (provider, model)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                window=settings.CIRCUIT_BREAKER_WINDOW,
+                min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+                failure_ratio=settings.CIRCUIT_BREAKER_FAILURE_RATIO,
+                slow_call_seconds=settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+                open_seconds=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+            )
+            self._breakers[key] = breaker
+        return breaker
+
+    def is_open(self, provider: str, model: str) -> bool:
+        breaker = self._breakers.get((provider, model))
+        return breaker is not None and breaker.is_open()
+
+    def stats(self) -> list[dict]:
+        return [
+            {"provider": provider, "model": model, **breaker.stats()}
+            for (provider, model), breaker in sorted(self._breakers.items())
+        ]
+
+
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+
+from app.engine.execution_plan import ExecutionPlan
+from app.engine.providers import provider_generation_params
+from app.engine.token_estimator import CallEstimate, estimate_call, estimate_tokens
+from app.engine.variable_substitution import CompiledTemplate
+from app.models.pipeline import StepType
+
+
+@dataclass(frozen=True)
+class StepEstimate:
+    step_order: int | None
+    provider: str
+    model: str
+    call: CallEstimate
+
+
+def estimate_prompt(provider: str, model: str, prompt: str) -> CallEstimate:
+    return estimate_call(provider, model, prompt, provider_generation_params(provider))
+
+
+def estimate_template(template: CompiledTemplate, provider: str, model: str, variables: dict[str, str]) -> CallEstimate:
+    # Missing variables fail the execution itself; estimate them as empty
+    prompt = template.render({name: variables.get(name, "") for name in template.variables})
+    return estimate_prompt(provider, model, prompt)
+
+
+def estimate_plan(plan: ExecutionPlan, variables: dict[str, str]) -> list[StepEstimate]:
+    """Estimate every model call of a pipeline before it runs.
+
+    Outputs of earlier steps are unknown at this point, so each slot filled
+    by a step output is counted at that step's full output budget. Branches
+    are all counted, and map or tree-reduce steps are estimated as a single
+    call over their whole input, which understates their per-chunk template
+    overhead and output.
+    """
+    produced_tokens: dict[str, int] = {}
+    estimates = []
+    for step in plan.steps:
+        context = {name: "" if name in produced_tokens else variables.get(name, "") for name in step.inputs()}
+        call = None
+        source = step.options.get("input_variable")
+
+        if step.step_type == StepType.PROMPT or (step.step_type == StepType.ROUTE and step.template):
+            prompt = step.template.render(context)
+            pending = sum(produced_tokens.get(slot, 0) for slot in step.template.slots)
+            call = estimate_call(step.provider, step.model, prompt, provider_generation_params(step.provider), pending)
+        elif step.step_type == StepType.MAP or (
+            step.step_type == StepType.AGGREGATE and step.options["aggregate"] == "tree"
+        ):
+            item = step.options["item_variable"]
+            prompt = step.template.render({**context, item: context[source]})
+            pending = sum(produced_tokens.get(source if slot == item else slot, 0) for slot in step.template.slots)
+            call = estimate_call(step.provider, step.model, prompt, provider_generation_params(step.provider), pending)
+
+        if call is not None:
+            estimates.append(StepEstimate(step.step_order, step.provider, step.model, call))
+
+        if step.step_type == StepType.ROUTE:
+            produced_tokens[step.output_variable] = 1
+        elif call is not None:
+            produced_tokens[step.output_variable] = call.max_output_tokens
+        else:
+            produced_tokens[step.output_variable] = produced_tokens.get(source) or estimate_tokens(context[source])
+    return estimates
+
+
+def total_cost(estimates: list[StepEstimate]) -> float | None:
+    """Summed cost, or None when any call's model has no known price."""
+    if any(estimate.call.cost is None for estimate in estimates):
+        return None
+    return round(sum(estimate.call.cost for estimate in estimates), 6)
@@ -0,0 +1,91 @@
+import json
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session
+
+from app.engine.variable_substitution import CompiledTemplate, compile_template_version
+from app.models.pipeline import Pipeline, StepType
+from app.services.template_service import TemplateService
+
+
+@dataclass(frozen=True)
+class PlannedStep:
+    id: int
+    step_order: int
+    template_version_id: int | None
+    template: CompiledTemplate | None
+    provider: str | None
+    model: str | None
+    output_variable: str
+    fallbacks: tuple[tuple[str, str], ...] = ()
+    step_type: str = StepType.PROMPT.value
+    options: dict = field(default_factory=dict, compare=False)
+
+    def targets(self) -> list[tuple[str, str]]:
+        """The primary (provider, model) followed by the declared fallbacks."""
+        return [(self.provider, self.model), *self.fallbacks]
+
+    def inputs(self) -> list[str]:
+        """Variables the step reads from the pipeline context.
+
+        Split, map, aggregate and route steps read ``input_variable``; the
+        template of a map or tree-reduce step sees each item as
+        ``item_variable`` instead of taking it from the context. A step gated
+        on a branch also reads the ``router`` variable that selects it.
+        """
+        names = list(self.template.variables) if self.template else []
+        if self.step_type in (StepType.MAP, StepType.AGGREGATE):
+            names = [n for n in names if n != self.options["item_variable"]]
+        if self.step_type != StepType.PROMPT:
+            names.insert(0, self.options["input_variable"])
+        if self.options.get("router"):
+            names.append(self.options["router"])
+        return list(dict.fromkeys(names))
+
+    def runs_on(self, context: dict[str, str]) -> bool:
+        """Whether the branch this step is gated on was selected."""
+        router = self.options.get("router")
+        return router is None or context[router].strip() == self.options["branch"]
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    pipeline_id: int
+    steps: tuple[PlannedStep, ...]
+
+    def check_variables(self, variables: dict[str, str]) -> None:
+        available = set(variables)
+        for step in self.steps:
+            for name in step.inputs():
+                if name not in available:
+                    raise ValueError(f"Missing variable: {name} (step {step.step_order})")
+            available.add(step.output_variable)
+
+
+def compile_execution_plan(db: Session, pipeline: Pipeline, user_id: int) -> ExecutionPlan:
+    template_ids = {step.template_id for step in pipeline.steps if step.template_id is not None}
+    versions = TemplateService(db).get_latest_versions(template_ids, user_id)
+
+    planned_steps = []
+    for step in pipeline.steps:
+        version = None
+        if step.template_id is not None:
+            version = versions.get(step.template_id)
+            if not version:
+                raise ValueError(f"Template not found for step {step.step_order}")
+        planned_steps.append(
+            PlannedStep(
+                id=step.id,
+                step_order=step.step_order,
+                template_version_id=version.id if version else None,
+                template=compile_template_version(version.id, version.content) if version else None,
+                provider=step.provider,
+                model=step.model,
+                output_variable=step.output_variable,
+                fallbacks=tuple((t["provider"], t["model"]) for t in json.loads(step.fallbacks)),
+                step_type=step.step_type,
+                options=json.loads(step.options),
+            )
+        )
+
+    return ExecutionPlan(pipeline_id=pipeline.id, steps=tuple(planned_steps))
@@ -0,0 +1,42 @@
+import hashlib
+import json
+
+from sqlalchemy.orm import Session
+
+from app.models.execution import ExecutionStatus
+from app.models.pipeline import PipelineStepExecution
+
+
+def step_fingerprint(
+    template_version_id: int | None,
+    provider: str | None,
+    model: str | None,
+    params: dict,
+    prompt: str,
+    options: dict | None = None,
+) -> str:
+    payload = json.dumps(
+        {
+            "template_version_id": template_version_id,
+            "provider": provider,
+            "model": model,
+            "params": params,
+            "prompt": prompt,
+            "options": options or {},
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def find_memoized_step(db: Session, fingerprint: str) -> PipelineStepExecution | None:
+    """Latest completed step execution with the same fingerprint, if any."""
+    return (
+        db.query(PipelineStepExecution)
+        .filter(
+            PipelineStepExecution.fingerprint == fingerprint,
+            PipelineStepExecution.status == ExecutionStatus.COMPLETED,
+        )
+        .order_by(PipelineStepExecution.id.desc())
+        .first()
+    )
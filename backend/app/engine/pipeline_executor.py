@@ -1,96 +1,559 @@
+import asyncio
 import json
+import logging
+import time
+from collections.abc import Collection
 from datetime import datetime, timezone
 
+from sqlalchemy import inspect
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.engine.providers import get_provider
-from app.engine.variable_substitution import substitute_variables
+from app.core.config import settings
+from app.core.metrics import cache_lookups, executions_in_flight, pipeline_step_duration
+from app.engine.checkpoint import OutputCheckpoint
+from app.engine.circuit_breaker import CircuitOpenError, circuit_breakers
+from app.engine.cost_estimate import StepEstimate, estimate_plan, total_cost
+from app.engine.memoization import find_memoized_step, step_fingerprint
+from app.engine.providers import get_provider, provider_generation_params
+from app.engine.providers.call_stats import CallStats, record_queue_wait, track_call
+from app.engine.response_cache import CACHE_BYPASS
+from app.engine.routing import select_branch
+from app.engine.execution_plan import ExecutionPlan, PlannedStep, compile_execution_plan
+from app.engine.step_graph import StepGraph
+from app.engine.text_splitter import parse_json_list, split_text
+from app.engine.token_estimator import check_context_window
 from app.models.execution import ExecutionStatus
-from app.models.pipeline import PipelineExecution, PipelineStepExecution
+from app.models.pipeline import PipelineExecution, PipelineStepExecution, StepType
+from app.services.budget_service import BudgetService
 from app.services.pipeline_service import PipelineService
-from app.services.template_service import TemplateService
+
+logger = logging.getLogger(__name__)
 
 
 class PipelineExecutor:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        events: asyncio.Queue | None = None,
+        cache_mode: str = CACHE_BYPASS,
+        coalesce: bool = False,
+        memoize: bool = True,
+        max_cost: float | None = None,
+    ):
         self.db = db
+        self.events = events
+        self.cache_mode = cache_mode
+        self.coalesce = coalesce
+        self.memoize = memoize
+        self.max_cost = max_cost
+
+    @classmethod
+    def for_claimed(cls, db: Session, pipeline_execution: PipelineExecution) -> "PipelineExecutor":
+        """An executor with the options a queued execution was submitted with."""
+        options = json.loads(pipeline_execution.options)
+        return cls(
+            db,
+            cache_mode=options.get("cache", CACHE_BYPASS),
+            coalesce=options.get("coalesce", False),
+            memoize=options.get("memoize", True),
+        )
+
+    async def execute(
+        self,
+        pipeline_id: int,
+        variables: dict[str, str],
+        user_id: int,
+        max_parallel_steps: int | None = None,
+    ) -> PipelineExecution:
+        plan = self._compile_plan(pipeline_id, variables, user_id)
+        cost = self._check_budget(plan, variables, user_id)
+        pipeline_execution = self._create_execution_record(
+            pipeline_id, variables, ExecutionStatus.RUNNING, max_parallel_steps
+        )
+        pipeline_execution.estimated_cost = cost
+        self.db.commit()
+        return await self._run(pipeline_execution, plan, variables, max_parallel_steps)
+
+    async def resume(
+        self, source: PipelineExecution, user_id: int, max_parallel_steps: int | None = None
+    ) -> PipelineExecution:
+        pipeline_execution = self.create_resumed(source, user_id, ExecutionStatus.RUNNING, max_parallel_steps)
+        return await self.run_claimed(pipeline_execution)
+
+    def create_resumed(
+        self,
+        source: PipelineExecution,
+        user_id: int,
+        status: ExecutionStatus,
+        max_parallel_steps: int | None = None,
+    ) -> PipelineExecution:
+        if source.status != ExecutionStatus.FAILED:
+            raise ValueError("Only failed pipeline executions can be resumed")
+
+        variables = json.loads(source.variables)
+        plan = self._compile_plan(source.pipeline_id, variables, user_id)
+        # Completed steps are copied over rather than run again
+        completed = {s.step_order for s in source.step_executions if s.status == ExecutionStatus.COMPLETED}
+        cost = self._check_budget(plan, variables, user_id, skip_orders=completed)
+        pipeline_execution = self._create_execution_record(source.pipeline_id, variables, status, max_parallel_steps)
+        pipeline_execution.resumed_from_id = source.id
+        pipeline_execution.estimated_cost = cost
+        self.db.commit()
+        self.db.refresh(pipeline_execution)
+        return pipeline_execution
+
+    def enqueue(
+        self, pipeline_id: int, variables: dict[str, str], user_id: int, max_parallel_steps: int | None = None
+    ) -> PipelineExecution:
+        plan = self._compile_plan(pipeline_id, variables, user_id)
+        cost = self._check_budget(plan, variables, user_id)
+        pipeline_execution = self._create_execution_record(
+            pipeline_id, variables, ExecutionStatus.PENDING, max_parallel_steps
+        )
+        pipeline_execution.estimated_cost = cost
+        self.db.commit()
+        self.db.refresh(pipeline_execution)
+        return pipeline_execution
+
+    async def run_claimed(self, pipeline_execution: PipelineExecution) -> PipelineExecution:
+        pipeline = pipeline_execution.pipeline
+        variables = json.loads(pipeline_execution.variables)
+        max_parallel_steps = json.loads(pipeline_execution.options).get("max_parallel_steps")
+        plan = self._compile_plan(pipeline.id, variables, pipeline.user_id)
+        outputs = self._reuse_completed_steps(pipeline_execution, plan)
+        return await self._run(pipeline_execution, plan, variables, max_parallel_steps, outputs)
+
+    async def run_plan(
+        self, pipeline_execution: PipelineExecution, plan: ExecutionPlan, variables: dict[str, str]
+    ) -> PipelineExecution:
+        return await self._run(pipeline_execution, plan, variables, None)
 
-    def execute(self, pipeline_id: int, variables: dict[str, str], user_id: int) -> PipelineExecution:
+    def estimate(self, pipeline_id: int, variables: dict[str, str], user_id: int) -> list[StepEstimate]:
+        return estimate_plan(self._compile_plan(pipeline_id, variables, user_id), variables)
+
+    def _check_budget(
+        self, plan: ExecutionPlan, variables: dict[str, str], user_id: int, skip_orders: Collection[int] = ()
+    ) -> float | None:
+        cost = total_cost([e for e in estimate_plan(plan, variables) if e.step_order not in skip_orders])
+        BudgetService(self.db).check(user_id, cost, self.max_cost)
+        return cost
+
+    def _compile_plan(self, pipeline_id: int, variables: dict[str, str], user_id: int) -> ExecutionPlan:
         pipeline = PipelineService(self.db).get_pipeline(pipeline_id, user_id)
         if not pipeline:
             raise ValueError("Pipeline not found")
 
-        pipeline_execution = self._create_execution_record(pipeline_id, variables)
-        context = dict(variables)
+        plan = compile_execution_plan(self.db, pipeline, user_id)
+        plan.check_variables(variables)
+        return plan
 
-        for step in pipeline.steps:
-            step_execution = self._create_step_execution(pipeline_execution, step, context, user_id)
+    async def _run(
+        self,
+        pipeline_execution: PipelineExecution,
+        plan: ExecutionPlan,
+        variables: dict[str, str],
+        max_parallel_steps: int | None,
+        outputs: dict[int, str] | None = None,
+    ) -> PipelineExecution:
+        with executions_in_flight.track_in_progress(kind="pipeline"):
+            return await self._run_steps(pipeline_execution, plan, variables, max_parallel_steps, outputs)
 
-            try:
-                output = self._execute_step(step, context, user_id)
-                self._mark_step_completed(step_execution, output)
-                context[step.output_variable] = output
-            except Exception as e:
-                self._mark_step_failed(step_execution, str(e))
-                self._mark_execution_failed(pipeline_execution)
-                return pipeline_execution
+    async def _run_steps(
+        self,
+        pipeline_execution: PipelineExecution,
+        plan: ExecutionPlan,
+        variables: dict[str, str],
+        max_parallel_steps: int | None,
+        outputs: dict[int, str] | None,
+    ) -> PipelineExecution:
+        self._emit("execution_started", {"pipeline_execution_id": pipeline_execution.id})
+        graph = StepGraph(plan.steps, {step.id: step.inputs() for step in plan.steps})
+        semaphore = asyncio.Semaphore(max_parallel_steps or settings.PIPELINE_MAX_PARALLEL_STEPS)
+
+        outputs = dict(outputs or {})
+        pending = [step for step in plan.steps if step.id not in outputs]
+        running: dict[asyncio.Task, PlannedStep] = {}
+        skipped: set[int] = set()
+        failed = False
+
+        try:
+            while pending or running:
+                # Skipping a step can make its dependents ready, so keep
+                # scheduling until nothing new becomes ready
+                while not failed and (ready := [s for s in pending if graph.is_ready(s, outputs.keys(), skipped)]):
+                    for step in ready:
+                        pending.remove(step)
+                        if graph.missing_input(step, skipped):
+                            skipped.add(step.id)
+                            self._record_skipped_step(pipeline_execution, step)
+                            continue
+                        context = graph.context_for(step, variables, outputs, skipped)
+                        if not step.runs_on(context):
+                            skipped.add(step.id)
+                            self._record_skipped_step(pipeline_execution, step)
+                            continue
+                        task = asyncio.create_task(self._run_step(pipeline_execution, step, context, semaphore))
+                        running[task] = step
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step = running.pop(task)
+                    output = task.result()
+                    if output is None:
+                        failed = True
+                    else:
+                        outputs[step.id] = output
+        except Exception:
+            # Steps record their own failures; this is the scheduling itself failing
+            logger.exception("Pipeline execution %s failed", pipeline_execution.id)
+            self.db.rollback()
+            failed = True
+        finally:
+            for task in running:
+                task.cancel()
 
-        self._mark_execution_completed(pipeline_execution)
+        if failed:
+            self._mark_execution_failed(pipeline_execution)
+        else:
+            self._mark_execution_completed(pipeline_execution)
         return pipeline_execution
 
-    def _create_execution_record(self, pipeline_id: int, variables: dict[str, str]) -> PipelineExecution:
+    async def _run_step(
+        self,
+        pipeline_execution: PipelineExecution,
+        step: PlannedStep,
+        context: dict[str, str],
+        semaphore: asyncio.Semaphore,
+    ) -> str | None:
+        """Run one step and record its outcome; returns None when the step failed."""
+        step_execution = None
+        call = None
+        queued_at = time.monotonic()
+        try:
+            step_execution = self._create_step_execution(pipeline_execution, step, context)
+            self._emit("step_started", {"step_order": step.step_order, "step_execution_id": step_execution.id})
+
+            memoized = find_memoized_step(self.db, step_execution.fingerprint) if self.memoize else None
+            if self.memoize:
+                cache_lookups.inc(cache="step_memo", result="miss" if memoized is None else "hit")
+            if memoized is not None:
+                step_execution.provider, step_execution.model = memoized.provider, memoized.model
+                step_execution.memoized = True
+                self._mark_step_completed(step_execution, memoized.output)
+                self._emit(
+                    "step_completed", {"step_order": step.step_order, "output": memoized.output, "memoized": True}
+                )
+                return memoized.output
+
+            # Release the connection while waiting for a step slot and the provider
+            self.db.commit()
+            queued_at = time.monotonic()
+            async with semaphore:
+                with track_call() as call:
+                    # Waiting for a step slot is queueing too, on top of the provider limiter's
+                    record_queue_wait(time.monotonic() - queued_at)
+                    output = await self._execute(step, step_execution, context)
+                self._record_call_stats(step_execution, call)
+                self._mark_step_completed(step_execution, output)
+        except Exception as e:
+            self._fail_step(pipeline_execution, step, step_execution, call, e)
+            pipeline_step_duration.observe(time.monotonic() - queued_at, step_type=step.step_type, status="failed")
+            self._emit("step_failed", {"step_order": step.step_order, "error": str(e)})
+            return None
+
+        pipeline_step_duration.observe(time.monotonic() - queued_at, step_type=step.step_type, status="completed")
+        self._emit("step_completed", {"step_order": step.step_order, "output": output})
+        return output
+
+    def _fail_step(
+        self,
+        pipeline_execution: PipelineExecution,
+        step: PlannedStep,
+        step_execution: PipelineStepExecution | None,
+        call: CallStats | None,
+        error: Exception,
+    ) -> None:
+        # Only a database error warrants a rollback: the session is shared with
+        # the other running steps, whose uncommitted changes it would discard
+        if isinstance(error, SQLAlchemyError):
+            self.db.rollback()
+        if step_execution is None or not inspect(step_execution).persistent:
+            self._record_failed_step(pipeline_execution, step, str(error))
+            return
+        if call is not None:
+            self._record_call_stats(step_execution, call)
+        self._mark_step_failed(step_execution, str(error))
+
+    def _reuse_completed_steps(self, pipeline_execution: PipelineExecution, plan: ExecutionPlan) -> dict[int, str]:
+        """Collect the steps a claimed execution does not need to run again.
+
+        An execution requeued after its worker died keeps the steps it had
+        completed; a resumed execution gets copies of its source's completed
+        steps. Returns the reused outputs keyed by step id, so that only the
+        remaining steps run.
+        """
+        planned_ids = {step.id for step in plan.steps}
+        own = self._completed_steps(pipeline_execution.id, planned_ids)
+        if own or pipeline_execution.resumed_from_id is None:
+            return {step_execution.pipeline_step_id: step_execution.output for step_execution in own}
+
+        completed = self._completed_steps(pipeline_execution.resumed_from_id, planned_ids)
+
+        outputs = {}
+        for step_execution in completed:
+            self.db.add(
+                PipelineStepExecution(
+                    pipeline_execution_id=pipeline_execution.id,
+                    pipeline_step_id=step_execution.pipeline_step_id,
+                    step_order=step_execution.step_order,
+                    input_prompt=step_execution.input_prompt,
+                    provider=step_execution.provider,
+                    model=step_execution.model,
+                    fingerprint=step_execution.fingerprint,
+                    output=step_execution.output,
+                    status=ExecutionStatus.COMPLETED,
+                    completed_at=step_execution.completed_at,
+                )
+            )
+            outputs[step_execution.pipeline_step_id] = step_execution.output
+        self.db.commit()
+        return outputs
+
+    def _completed_steps(self, pipeline_execution_id: int, step_ids: set[int]) -> list[PipelineStepExecution]:
+        return (
+            self.db.query(PipelineStepExecution)
+            .filter(
+                PipelineStepExecution.pipeline_execution_id == pipeline_execution_id,
+                PipelineStepExecution.status == ExecutionStatus.COMPLETED,
+                PipelineStepExecution.pipeline_step_id.in_(step_ids),
+            )
+            .all()
+        )
+
+    def _create_execution_record(
+        self,
+        pipeline_id: int,
+        variables: dict[str, str],
+        status: ExecutionStatus,
+        max_parallel_steps: int | None = None,
+    ) -> PipelineExecution:
         execution = PipelineExecution(
             pipeline_id=pipeline_id,
-            status=ExecutionStatus.RUNNING,
+            status=status,
             variables=json.dumps(variables),
+            options=json.dumps(
+                {
+                    "cache": self.cache_mode,
+                    "coalesce": self.coalesce,
+                    "memoize": self.memoize,
+                    "max_parallel_steps": max_parallel_steps,
+                }
+            ),
         )
         self.db.add(execution)
         self.db.flush()
         return execution
 
-    def _create_step_execution(self, pipeline_execution, step, context, user_id: int) -> PipelineStepExecution:
-        template = TemplateService(self.db).get_template(step.template_id, user_id)
-        latest_version = template.latest_version
-        input_prompt = substitute_variables(latest_version.content, context)
+    def _create_step_execution(
+        self, pipeline_execution: PipelineExecution, step: PlannedStep, context: dict[str, str]
+    ) -> PipelineStepExecution:
+        if step.step_type == StepType.PROMPT or (step.step_type == StepType.ROUTE and step.template):
+            input_prompt = step.template.render(context)
+        else:
+            input_prompt = context[step.options["input_variable"]]
 
         step_execution = PipelineStepExecution(
             pipeline_execution_id=pipeline_execution.id,
             pipeline_step_id=step.id,
             step_order=step.step_order,
             input_prompt=input_prompt,
+            fingerprint=step_fingerprint(
+                step.template_version_id,
+                step.provider,
+                step.model,
+                provider_generation_params(step.provider) if step.provider else {},
+                input_prompt,
+                step.options,
+            ),
             status=ExecutionStatus.RUNNING,
         )
         self.db.add(step_execution)
         self.db.flush()
         return step_execution
 
-    def _execute_step(self, step, context, user_id: int) -> str:
-        template = TemplateService(self.db).get_template(step.template_id, user_id)
-        latest_version = template.latest_version
-        resolved_prompt = substitute_variables(latest_version.content, context)
-        provider = get_provider(step.provider)
-        return provider.execute(resolved_prompt, step.model)
+    async def _execute(self, step: PlannedStep, step_execution: PipelineStepExecution, context: dict[str, str]) -> str:
+        if step.step_type == StepType.SPLIT:
+            chunks = split_text(step_execution.input_prompt, step.options["split_by"], step.options["chunk_size"])
+            return json.dumps(chunks)
+        if step.step_type == StepType.MAP:
+            return json.dumps(await self._map(step, step_execution, context))
+        if step.step_type == StepType.AGGREGATE:
+            return await self._aggregate(step, step_execution, context)
+        if step.step_type == StepType.ROUTE:
+            return await self._route(step, step_execution)
+        return await self._execute_step(step, step_execution, step_execution.input_prompt, self.events is not None)
+
+    async def _map(
+        self, step: PlannedStep, step_execution: PipelineStepExecution, context: dict[str, str]
+    ) -> list[str]:
+        items = parse_json_list(step_execution.input_prompt)
+        item_variable = step.options["item_variable"]
+        prompts = [step.template.render({**context, item_variable: item}) for item in items]
+        return await self._fan_out(step, step_execution, prompts)
+
+    async def _aggregate(
+        self, step: PlannedStep, step_execution: PipelineStepExecution, context: dict[str, str]
+    ) -> str:
+        """Concatenate the input items, or tree-reduce them through the template.
+
+        Each reduce level renders the template over groups of ``fan_in`` items
+        concurrently, so the number of sequential model calls grows with the
+        logarithm of the item count rather than linearly.
+        """
+        items = parse_json_list(step_execution.input_prompt)
+        separator = step.options["separator"]
+        if step.options["aggregate"] == "concat":
+            return separator.join(items)
+
+        fan_in = step.options["fan_in"]
+        item_variable = step.options["item_variable"]
+        while len(items) > 1:
+            groups = [items[i : i + fan_in] for i in range(0, len(items), fan_in)]
+            prompts = [step.template.render({**context, item_variable: separator.join(group)}) for group in groups]
+            items = await self._fan_out(step, step_execution, prompts)
+        return items[0] if items else ""
+
+    async def _route(self, step: PlannedStep, step_execution: PipelineStepExecution) -> str:
+        """Select a branch by rule, classifying the input with the model first if a template is set."""
+        value = step_execution.input_prompt
+        if step.template is not None:
+            value = await self._execute_step(step, step_execution, value, stream=False)
+        return select_branch(value, step.options["routes"], step.options["default_branch"])
+
+    async def _fan_out(
+        self, step: PlannedStep, step_execution: PipelineStepExecution, prompts: list[str]
+    ) -> list[str]:
+        limit = asyncio.Semaphore(step.options.get("max_concurrency") or settings.PIPELINE_MAP_CONCURRENCY)
+
+        async def call(prompt: str) -> str:
+            async with limit:
+                # Interleaved tokens from concurrent items would be unreadable
+                return await self._execute_step(step, step_execution, prompt, stream=False)
+
+        tasks = [asyncio.ensure_future(call(prompt)) for prompt in prompts]
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _execute_step(
+        self, step: PlannedStep, step_execution: PipelineStepExecution, prompt: str, stream: bool
+    ) -> str:
+        error: Exception | None = None
+        for provider_name, model in step.targets():
+            if circuit_breakers.is_open(provider_name, model):
+                error = CircuitOpenError(f"Circuit open for {provider_name}/{model}")
+                continue
+            step_execution.provider, step_execution.model = provider_name, model
+            chunks: list[str] = []
+            try:
+                return await self._call_target(provider_name, model, step, step_execution, prompt, stream, chunks)
+            except Exception as e:
+                # Tokens already streamed to the client cannot be taken back
+                if chunks:
+                    raise
+                error = e
+        raise error
+
+    async def _call_target(
+        self,
+        provider_name: str,
+        model: str,
+        step: PlannedStep,
+        step_execution: PipelineStepExecution,
+        prompt: str,
+        stream: bool,
+        chunks: list[str],
+    ) -> str:
+        check_context_window(provider_name, model, prompt, provider_generation_params(provider_name))
+        provider = get_provider(provider_name, cache_mode=self.cache_mode, coalesce=self.coalesce)
+        if not stream:
+            return await provider.execute(prompt, model)
+
+        checkpoint = OutputCheckpoint()
+        async for text in provider.stream(prompt, model):
+            chunks.append(text)
+            self._emit("token", {"step_order": step.step_order, "text": text})
+            if checkpoint.is_due():
+                step_execution.output = "".join(chunks)
+                self.db.commit()
+        return "".join(chunks)
+
+    def _emit(self, event: str, data: dict) -> None:
+        if self.events is not None:
+            self.events.put_nowait((event, data))
+
+    def _record_skipped_step(self, pipeline_execution: PipelineExecution, step: PlannedStep) -> None:
+        self.db.add(
+            PipelineStepExecution(
+                pipeline_execution_id=pipeline_execution.id,
+                pipeline_step_id=step.id,
+                step_order=step.step_order,
+                input_prompt="",
+                status=ExecutionStatus.SKIPPED,
+                completed_at=datetime.now(timezone.utc),
+            )
+        )
+        self.db.commit()
+        self._emit("step_skipped", {"step_order": step.step_order})
+
+    def _record_failed_step(self, pipeline_execution: PipelineExecution, step: PlannedStep, error: str) -> None:
+        self.db.add(
+            PipelineStepExecution(
+                pipeline_execution_id=pipeline_execution.id,
+                pipeline_step_id=step.id,
+                step_order=step.step_order,
+                input_prompt="",
+                status=ExecutionStatus.FAILED,
+                error=error,
+                completed_at=datetime.now(timezone.utc),
+            )
+        )
+        self.db.commit()
+
+    def _record_call_stats(self, step_execution: PipelineStepExecution, call: CallStats) -> None:
+        for column, value in call.columns().items():
+            setattr(step_execution, column, value)
 
     def _mark_step_completed(self, step_execution: PipelineStepExecution, output: str) -> None:
         step_execution.output = output
         step_execution.status = ExecutionStatus.COMPLETED
         step_execution.completed_at = datetime.now(timezone.utc)
-        self.db.flush()
+        self.db.commit()
 
     def _mark_step_failed(self, step_execution: PipelineStepExecution, error: str) -> None:
         step_execution.error = error
         step_execution.status = ExecutionStatus.FAILED
         step_execution.completed_at = datetime.now(timezone.utc)
-        self.db.flush()
+        self.db.commit()
 
     def _mark_execution_completed(self, execution: PipelineExecution) -> None:
         execution.status = ExecutionStatus.COMPLETED
         execution.completed_at = datetime.now(timezone.utc)
-        self.db.commit()
-        self.db.refresh(execution)
+        self._commit_finished(execution)
 
     def _mark_execution_failed(self, execution: PipelineExecution) -> None:
         execution.status = ExecutionStatus.FAILED
         execution.completed_at = datetime.now(timezone.utc)
+        self._commit_finished(execution)
+
+    def _commit_finished(self, execution: PipelineExecution) -> None:
         self.db.commit()
-        self.db.refresh(execution)
+        # Reload lazily rather than refreshing now, which would hold a connection
+        # while other executions on this session await providers. Step rows were
+        # added by id, not through the relationship.
+        self.db.expire(execution, ["completed_at", "step_executions"])
@@ -0,0 +1,22 @@
+CACHE_BREAK = "{{/cache}}"
+MAX_CACHE_BREAKPOINTS = 4
+
+
+def split_cache_prefixes(prompt: str) -> tuple[list[str], str]:
+    """Split a rendered prompt at its cache breaks.
+
+    Templates put ``{{/cache}}`` after content that repeats across calls,
+    such as a shared document or instruction block. Returns the segments
+    that end at a break, in order, and the uncached tail. Only the last
+    ``MAX_CACHE_BREAKPOINTS`` breaks are kept, since each one costs a cache
+    write and providers cap how many a request may carry.
+    """
+    *prefixes, tail = prompt.split(CACHE_BREAK)
+    if len(prefixes) > MAX_CACHE_BREAKPOINTS:
+        cut = len(prefixes) - MAX_CACHE_BREAKPOINTS + 1
+        prefixes = ["".join(prefixes[:cut]), *prefixes[cut:]]
+    return prefixes, tail
+
+
+def strip_cache_breaks(prompt: str) -> str:
+    return prompt.replace(CACHE_BREAK, "")
@@ -0,0 +1,215 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.engine.providers import get_provider, provider_generation_params
+from app.engine.providers.base import BatchRequest, BatchResult
+from app.engine.token_estimator import check_context_window
+from app.engine.variable_substitution import compile_template_version
+from app.models.batch import ExecutionBatch, ProviderBatchJob
+from app.models.execution import Execution, ExecutionStatus
+from app.models.template import TemplateVersion
+
+logger = logging.getLogger(__name__)
+
+JOB_PREPARING = "preparing"
+JOB_SUBMITTED = "submitted"
+JOB_ENDED = "ended"
+
+CUSTOM_ID_PREFIX = "execution-"
+
+
+class ProviderBatchCoordinator:
+    """Moves offline batch rows through the providers' asynchronous Batch APIs.
+
+    Rows of an offline batch stay RUNNING with no provider job until
+    ``submit_pending`` claims them into a job; ``collect_finished`` later polls
+    each submitted job and writes the results back onto the claimed rows.
+    """
+
+    def __init__(self, db: Session, max_requests: int = settings.PROVIDER_BATCH_MAX_REQUESTS):
+        self.db = db
+        self.max_requests = max_requests
+
+    async def submit_pending(self) -> int:
+        batch_ids = self.db.scalars(
+            select(Execution.batch_id)
+            .join(ExecutionBatch, ExecutionBatch.id == Execution.batch_id)
+            .where(
+                ExecutionBatch.mode == "offline",
+                Execution.status == ExecutionStatus.RUNNING,
+                Execution.provider_batch_job_id.is_(None),
+            )
+            .distinct()
+        ).all()
+
+        submitted = 0
+        for batch_id in batch_ids:
+            batch = self.db.get(ExecutionBatch, batch_id)
+            while await self._submit_next_job(batch):
+                submitted += 1
+        return submitted
+
+    async def collect_finished(self) -> int:
+        jobs = (
+            self.db.query(ProviderBatchJob)
+            .filter(ProviderBatchJob.status == JOB_SUBMITTED)
+            .order_by(ProviderBatchJob.id)
+            .all()
+        )
+
+        collected = 0
+        for job in jobs:
+            provider = get_provider(job.provider)
+            try:
+                results = await provider.poll_batch(job.provider_batch_id)
+            except Exception:
+                logger.exception("Polling provider batch job %s failed", job.id)
+                continue
+            if results is None:
+                continue
+            self._store_results(job, results)
+            collected += 1
+        return collected
+
+    async def _submit_next_job(self, batch: ExecutionBatch) -> bool:
+        job = ProviderBatchJob(
+            execution_batch_id=batch.id,
+            provider=batch.provider,
+            status=JOB_PREPARING,
+        )
+        self.db.add(job)
+        self.db.flush()
+
+        claimed = self._claim_rows(batch, job)
+        if not claimed:
+            self.db.delete(job)
+            self.db.commit()
+            return False
+
+        requests, failures = self._build_requests(batch, claimed)
+        if failures:
+            self.db.execute(update(Execution), failures)
+        job.request_count = len(requests)
+        self.db.commit()
+
+        if not requests:
+            self._finish_job(job)
+            return True
+
+        provider = get_provider(batch.provider)
+        try:
+            job.provider_batch_id = await provider.submit_batch(requests)
+        except Exception:
+            logger.exception("Submitting provider batch job %s failed", job.id)
+            self._release_job(job)
+            return False
+
+        job.status = JOB_SUBMITTED
+        self.db.commit()
+        return True
+
+    def _claim_rows(self, batch: ExecutionBatch, job: ProviderBatchJob) -> list[Execution]:
+        candidates = (
+            select(Execution.id)
+            .where(
+                Execution.batch_id == batch.id,
+                Execution.status == ExecutionStatus.RUNNING,
+                Execution.provider_batch_job_id.is_(None),
+            )
+            .order_by(Execution.id)
+            .limit(self.max_requests)
+            .scalar_subquery()
+        )
+        self.db.execute(
+            update(Execution)
+            .where(Execution.id.in_(candidates), Execution.provider_batch_job_id.is_(None))
+            .values(provider_batch_job_id=job.id)
+            .execution_options(synchronize_session=False)
+        )
+        return (
+            self.db.query(Execution)
+            .filter(Execution.provider_batch_job_id == job.id)
+            .order_by(Execution.id)
+            .all()
+        )
+
+    def _build_requests(
+        self, batch: ExecutionBatch, executions: list[Execution]
+    ) -> tuple[list[BatchRequest], list[dict]]:
+        version = self.db.get(TemplateVersion, executions[0].template_version_id)
+        template = compile_template_version(version.id, version.content)
+        params = provider_generation_params(batch.provider)
+
+        requests, failures = [], []
+        for execution in executions:
+            try:
+                prompt = template.render(json.loads(execution.variables))
+                check_context_window(batch.provider, batch.model, prompt, params)
+            except ValueError as e:
+                failures.append(self._result_row(execution.id, error=str(e)))
+                continue
+            requests.append(BatchRequest(f"{CUSTOM_ID_PREFIX}{execution.id}", prompt, batch.model))
+        return requests, failures
+
+    def _store_results(self, job: ProviderBatchJob, results: list[BatchResult]) -> None:
+        pending_ids = set(
+            self.db.scalars(
+                select(Execution.id).where(
+                    Execution.provider_batch_job_id == job.id,
+                    Execution.status == ExecutionStatus.RUNNING,
+                )
+            ).all()
+        )
+
+        rows = []
+        for result in results:
+            if not result.custom_id.startswith(CUSTOM_ID_PREFIX):
+                continue
+            execution_id = int(result.custom_id.removeprefix(CUSTOM_ID_PREFIX))
+            if execution_id in pending_ids:
+                pending_ids.discard(execution_id)
+                row = self._result_row(execution_id, result.output, result.error)
+                row["input_tokens"] = result.input_tokens
+                row["output_tokens"] = result.output_tokens
+                row["cache_read_tokens"] = result.cache_read_tokens
+                row["cache_write_tokens"] = result.cache_write_tokens
+                rows.append(row)
+
+        rows.extend(
+            self._result_row(execution_id, error="No result returned by provider batch")
+            for execution_id in pending_ids
+        )
+
+        if rows:
+            self.db.execute(update(Execution), rows)
+        self._finish_job(job)
+
+    def _result_row(self, execution_id: int, output: str | None = None, error: str | None = None) -> dict:
+        return {
+            "id": execution_id,
+            "output": output,
+            "error": error,
+            "status": ExecutionStatus.FAILED if error is not None else ExecutionStatus.COMPLETED,
+            "completed_at": datetime.now(timezone.utc),
+        }
+
+    def _finish_job(self, job: ProviderBatchJob) -> None:
+        job.status = JOB_ENDED
+        job.completed_at = datetime.now(timezone.utc)
+        self.db.commit()
+
+    def _release_job(self, job: ProviderBatchJob) -> None:
+        self.db.rollback()
+        self.db.execute(
+            update(Execution)
+            .where(Execution.provider_batch_job_id == job.id)
+            .values(provider_batch_job_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.delete(job)
+        self.db.commit()
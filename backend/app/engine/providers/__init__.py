@@ -1,8 +1,18 @@
 from app.core.config import settings
 from app.engine.providers.anthropic_provider import AnthropicProvider
 from app.engine.providers.base import LLMProvider
+from app.engine.providers.caching_provider import CachingProvider
+from app.engine.providers.circuit_breaker_provider import CircuitBreakerProvider
+from app.engine.providers.coalescing_provider import CoalescingProvider
 from app.engine.providers.mock_provider import MockProvider
 from app.engine.providers.openai_provider import OpenAIProvider
+from app.engine.providers.rate_limited_provider import RateLimitedProvider
+from app.engine.providers.retrying_provider import RetryingProvider, retry_policy_for
+from app.engine.providers.registry import ProviderRegistry
+from app.engine.circuit_breaker import circuit_breakers
+from app.engine.rate_limiter import rate_limiters
+from app.engine.response_cache import CACHE_BYPASS, response_cache
+from app.engine.single_flight import single_flight
 
 PROVIDER_MAP: dict[str, type[LLMProvider]] = {
     "anthropic": AnthropicProvider,
@@ -10,15 +20,28 @@ PROVIDER_MAP: dict[str, type[LLMProvider]] = {
     "mock": MockProvider,
 }
 
+provider_registry = ProviderRegistry(PROVIDER_MAP)
+
 
 def _is_test_env() -> bool:
     return settings.APP_ENV == "test"
 
 
-def get_provider(name: str) -> LLMProvider:
-    if _is_test_env():
-        return MockProvider()
-    provider_class = PROVIDER_MAP.get(name)
-    if not provider_class:
-        raise ValueError(f"Unknown provider: {name}")
-    return provider_class()
+def get_provider(name: str, cache_mode: str = CACHE_BYPASS, coalesce: bool = False) -> LLMProvider:
+    provider = provider_registry.get("mock" if _is_test_env() else name)
+    provider = CircuitBreakerProvider(provider, name, circuit_breakers)
+    provider = RateLimitedProvider(provider, name, rate_limiters)
+    provider = RetryingProvider(provider, name, retry_policy_for(name))
+    if coalesce:
+        provider = CoalescingProvider(provider, name, single_flight)
+    if cache_mode == CACHE_BYPASS:
+        return provider
+    return CachingProvider(provider, name, cache_mode, response_cache)
+
+
+def provider_generation_params(name: str) -> dict:
+    return provider_registry.get("mock" if _is_test_env() else name).generation_params()
+
+
+def list_provider_models(name: str) -> list[str]:
+    return PROVIDER_MAP["mock" if _is_test_env() else name].MODELS
@@ -1,20 +1,144 @@
-from anthropic import Anthropic
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+
+from anthropic import APIConnectionError, APIStatusError, AsyncAnthropic, DefaultAsyncHttpxClient, RateLimitError
 
 from app.core.config import settings
-from app.engine.providers.base import LLMProvider
+from app.engine.providers.base import (
+    BatchRequest,
+    BatchResult,
+    LLMProvider,
+    ProviderRateLimitError,
+    ProviderTransientError,
+)
+from app.engine.providers.call_stats import report_usage
+from app.engine.providers.http_options import RETRYABLE_STATUS_CODES, http_client_options, retry_after_seconds
+from app.engine.prompt_segments import split_cache_prefixes
+
+MAX_TOKENS = 4096
+
+
+@contextmanager
+def _translated_errors() -> Iterator[None]:
+    try:
+        yield
+    except RateLimitError as e:
+        raise ProviderRateLimitError(e.message, retry_after_seconds(e.response.headers)) from e
+    except APIStatusError as e:
+        if e.status_code in RETRYABLE_STATUS_CODES:
+            raise ProviderTransientError(e.message) from e
+        raise
+    except APIConnectionError as e:
+        raise ProviderTransientError(str(e)) from e
+
+
+def _user_message(prompt: str) -> dict:
+    """A user message with a cache_control breakpoint after each cacheable prefix."""
+    prefixes, tail = split_cache_prefixes(prompt)
+    if not prefixes:
+        return {"role": "user", "content": prompt}
+
+    content = [
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}
+        for prefix in prefixes
+        if prefix
+    ]
+    if tail:
+        content.append({"type": "text", "text": tail})
+    return {"role": "user", "content": content}
+
+
+def _prompt_tokens(usage) -> int:
+    # input_tokens leaves out cached tokens; count the whole prompt, as OpenAI does
+    return usage.input_tokens + (usage.cache_read_input_tokens or 0) + (usage.cache_creation_input_tokens or 0)
+
+
+def _record_usage(usage, model: str) -> None:
+    report_usage(
+        "anthropic",
+        model,
+        _prompt_tokens(usage),
+        usage.output_tokens,
+        usage.cache_read_input_tokens,
+        usage.cache_creation_input_tokens,
+    )
 
 
 class AnthropicProvider(LLMProvider):
-    def __init__(self):
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+    MODELS = ["claude-sonnet-4-5-20250929", "claude-haiku-4-5-20251001"]
 
-    def execute(self, prompt: str, model: str) -> str:
-        message = self.client.messages.create(
-            model=model,
-            max_tokens=4096,
-            messages=[{"role": "user", "content": prompt}],
+    def __init__(self):
+        self.client = AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            base_url=settings.ANTHROPIC_BASE_URL or None,
+            http_client=DefaultAsyncHttpxClient(**http_client_options()),
+            max_retries=0,
         )
+
+    def generation_params(self) -> dict:
+        return {"max_tokens": MAX_TOKENS}
+
+    async def execute(self, prompt: str, model: str) -> str:
+        with _translated_errors():
+            message = await self.client.messages.create(
+                model=model,
+                max_tokens=MAX_TOKENS,
+                messages=[_user_message(prompt)],
+            )
+        _record_usage(message.usage, model)
         return message.content[0].text
 
-    def list_models(self) -> list[str]:
-        return ["claude-sonnet-4-5-20250929", "claude-haiku-4-5-20251001"]
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        with _translated_errors():
+            async with self.client.messages.stream(
+                model=model,
+                max_tokens=MAX_TOKENS,
+                messages=[_user_message(prompt)],
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+                _record_usage((await stream.get_final_message()).usage, model)
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        batch = await self.client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": request.custom_id,
+                    "params": {
+                        "model": request.model,
+                        "max_tokens": MAX_TOKENS,
+                        "messages": [_user_message(request.prompt)],
+                    },
+                }
+                for request in requests
+            ]
+        )
+        return batch.id
+
+    async def poll_batch(self, batch_id: str) -> list[BatchResult] | None:
+        batch = await self.client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+
+        results = []
+        async for entry in await self.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                message = entry.result.message
+                results.append(
+                    BatchResult(
+                        entry.custom_id,
+                        output=message.content[0].text,
+                        input_tokens=_prompt_tokens(message.usage),
+                        output_tokens=message.usage.output_tokens,
+                        cache_read_tokens=message.usage.cache_read_input_tokens or 0,
+                        cache_write_tokens=message.usage.cache_creation_input_tokens or 0,
+                    )
+                )
+            elif entry.result.type == "errored":
+                results.append(BatchResult(entry.custom_id, error=entry.result.error.error.message))
+            else:
+                results.append(BatchResult(entry.custom_id, error=f"Batch request {entry.result.type}"))
+        return results
+
+    async def aclose(self) -> None:
+        await self.client.close()
@@ -1,11 +1,57 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+
+class ProviderTransientError(Exception):
+    """A failure worth retrying: connection errors, timeouts and 5xx responses."""
+
+
+class ProviderRateLimitError(Exception):
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    custom_id: str
+    prompt: str
+    model: str
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    custom_id: str
+    output: str | None = None
+    error: str | None = None
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
 
 
 class LLMProvider(ABC):
+    MODELS: list[str] = []
+
     @abstractmethod
-    def execute(self, prompt: str, model: str) -> str:
+    async def execute(self, prompt: str, model: str) -> str:
         pass
 
-    @abstractmethod
+    def generation_params(self) -> dict:
+        return {}
+
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        yield await self.execute(prompt, model)
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        raise NotImplementedError(f"{type(self).__name__} does not support batch submission")
+
+    async def poll_batch(self, batch_id: str) -> list[BatchResult] | None:
+        raise NotImplementedError(f"{type(self).__name__} does not support batch submission")
+
     def list_models(self) -> list[str]:
+        return list(self.MODELS)
+
+    async def aclose(self) -> None:
         pass
@@ -0,0 +1,52 @@
+from collections.abc import AsyncIterator
+
+from app.core.metrics import cache_lookups
+from app.engine.providers.base import LLMProvider
+from app.engine.response_cache import CACHE_READ, ResponseCache, response_cache_key
+
+
+class CachingProvider(LLMProvider):
+    def __init__(self, provider: LLMProvider, provider_name: str, mode: str, cache: ResponseCache):
+        self.provider = provider
+        self.provider_name = provider_name
+        self.mode = mode
+        self.cache = cache
+
+    async def execute(self, prompt: str, model: str) -> str:
+        key = self._key(prompt, model)
+        if self.mode == CACHE_READ:
+            cached = await self._lookup(key)
+            if cached is not None:
+                return cached
+
+        output = await self.provider.execute(prompt, model)
+        await self.cache.set(key, output)
+        return output
+
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        key = self._key(prompt, model)
+        if self.mode == CACHE_READ:
+            cached = await self._lookup(key)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks: list[str] = []
+        async for text in self.provider.stream(prompt, model):
+            chunks.append(text)
+            yield text
+        await self.cache.set(key, "".join(chunks))
+
+    def generation_params(self) -> dict:
+        return self.provider.generation_params()
+
+    def list_models(self) -> list[str]:
+        return self.provider.list_models()
+
+    async def _lookup(self, key: str) -> str | None:
+        cached = await self.cache.get(key)
+        cache_lookups.inc(cache="response", result="miss" if cached is None else "hit")
+        return cached
+
+    def _key(self, prompt: str, model: str) -> str:
+        return response_cache_key(self.provider_name, model, self.provider.generation_params(), prompt)
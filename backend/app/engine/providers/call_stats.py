@@ -0,0 +1,118 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from app.core.metrics import provider_cache_tokens, provider_tokens
+
+
+@dataclass
+class CallStats:
+    """Stats for one logical provider call, summed over its attempts.
+
+    Timings stay None when no request reached the provider, e.g. on a
+    response-cache hit; hedged attempts overlap, so their time is counted
+    twice in ``provider_seconds``.
+    """
+
+    attempts: int = 0
+    hedged: bool = False
+    coalesced: bool = False
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    queue_wait_seconds: float | None = None
+    provider_seconds: float | None = None
+    first_token_seconds: float | None = None
+
+    def columns(self) -> dict:
+        """Values for the per-call columns shared by executions and step executions."""
+        return {
+            "attempts": self.attempts,
+            "coalesced": self.coalesced,
+            "hedged": self.hedged,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "queue_wait_ms": _milliseconds(self.queue_wait_seconds),
+            "provider_latency_ms": _milliseconds(self.provider_seconds),
+            "first_token_ms": _milliseconds(self.first_token_seconds),
+        }
+
+
+_current_call: ContextVar[CallStats | None] = ContextVar("current_call", default=None)
+
+
+@contextmanager
+def track_call() -> Iterator[CallStats]:
+    """Collect stats for the provider calls made inside the block.
+
+    Provider wrappers report into the innermost tracked call; code outside a
+    ``track_call`` block simply records nothing.
+    """
+    stats = CallStats()
+    token = _current_call.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_call.reset(token)
+
+
+def current_call() -> CallStats | None:
+    return _current_call.get()
+
+
+def record_cache_usage(read_tokens: int | None, write_tokens: int | None) -> None:
+    stats = _current_call.get()
+    if stats is not None:
+        stats.cache_read_tokens += read_tokens or 0
+        stats.cache_write_tokens += write_tokens or 0
+
+
+def record_token_usage(input_tokens: int | None, output_tokens: int | None) -> None:
+    stats = _current_call.get()
+    if stats is not None:
+        stats.input_tokens = (stats.input_tokens or 0) + (input_tokens or 0)
+        stats.output_tokens = (stats.output_tokens or 0) + (output_tokens or 0)
+
+
+def report_usage(
+    provider: str,
+    model: str,
+    input_tokens: int | None,
+    output_tokens: int | None,
+    cache_read_tokens: int | None = 0,
+    cache_write_tokens: int | None = 0,
+) -> None:
+    """Record a provider response's usage on the tracked call and in the metrics."""
+    record_token_usage(input_tokens, output_tokens)
+    record_cache_usage(cache_read_tokens, cache_write_tokens)
+    provider_tokens.observe(input_tokens or 0, provider=provider, model=model, direction="input")
+    provider_tokens.observe(output_tokens or 0, provider=provider, model=model, direction="output")
+    provider_cache_tokens.inc(cache_read_tokens or 0, provider=provider, model=model, kind="read")
+    provider_cache_tokens.inc(cache_write_tokens or 0, provider=provider, model=model, kind="write")
+
+
+def record_queue_wait(seconds: float) -> None:
+    stats = _current_call.get()
+    if stats is not None:
+        stats.queue_wait_seconds = (stats.queue_wait_seconds or 0.0) + seconds
+
+
+def record_provider_time(seconds: float) -> None:
+    stats = _current_call.get()
+    if stats is not None:
+        stats.provider_seconds = (stats.provider_seconds or 0.0) + seconds
+
+
+def record_first_token(seconds: float) -> None:
+    """Time from sending a streamed request to its first text; the first attempt to stream wins."""
+    stats = _current_call.get()
+    if stats is not None and stats.first_token_seconds is None:
+        stats.first_token_seconds = seconds
+
+
+def _milliseconds(seconds: float | None) -> int | None:
+    return None if seconds is None else round(seconds * 1000)
@@ -0,0 +1,67 @@
+import time
+from collections.abc import AsyncIterator
+
+from app.engine.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError
+from app.engine.providers.base import BatchRequest, BatchResult, LLMProvider, ProviderTransientError
+
+
+class CircuitBreakerProvider(LLMProvider):
+    def __init__(self, provider: LLMProvider, provider_name: str, breakers: CircuitBreakerRegistry):
+        self.provider = provider
+        self.provider_name = provider_name
+        self.breakers = breakers
+
+    async def execute(self, prompt: str, model: str) -> str:
+        breaker = self._admit(model)
+        started = time.monotonic()
+        try:
+            output = await self.provider.execute(prompt, model)
+        except ProviderTransientError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.record_ignored()
+            raise
+        breaker.record_success(time.monotonic() - started)
+        return output
+
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        # Streams are judged on time to first chunk; their total duration
+        # depends on the output length.
+        breaker = self._admit(model)
+        started = time.monotonic()
+        recorded = False
+        try:
+            async for text in self.provider.stream(prompt, model):
+                if not recorded:
+                    breaker.record_success(time.monotonic() - started)
+                    recorded = True
+                yield text
+        except ProviderTransientError:
+            if not recorded:
+                breaker.record_failure()
+            raise
+        except BaseException:
+            if not recorded:
+                breaker.record_ignored()
+            raise
+        if not recorded:
+            breaker.record_success(time.monotonic() - started)
+
+    def generation_params(self) -> dict:
+        return self.provider.generation_params()
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        return await self.provider.submit_batch(requests)
+
+    async def poll_batch(self, batch_id: str) -> list[BatchResult] | None:
+        return await self.provider.poll_batch(batch_id)
+
+    def list_models(self) -> list[str]:
+        return self.provider.list_models()
+
+    def _admit(self, model: str) -> CircuitBreaker:
+        breaker = self.breakers.get(self.provider_name, model)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {self.provider_name}/{model}")
+        return breaker
@@ -0,0 +1,37 @@
+from collections.abc import AsyncIterator
+
+from app.engine.providers.base import LLMProvider
+from app.engine.providers.call_stats import current_call
+from app.engine.response_cache import response_cache_key
+from app.engine.single_flight import SingleFlight
+
+
+class CoalescingProvider(LLMProvider):
+    """Shares one upstream call between concurrent identical requests.
+
+    Streams are passed through untouched: each stream has its own consumer
+    and pacing, so only ``execute`` is coalesced.
+    """
+
+    def __init__(self, provider: LLMProvider, provider_name: str, flights: SingleFlight):
+        self.provider = provider
+        self.provider_name = provider_name
+        self.flights = flights
+
+    async def execute(self, prompt: str, model: str) -> str:
+        key = response_cache_key(self.provider_name, model, self.provider.generation_params(), prompt)
+        output, shared = await self.flights.do(key, lambda: self.provider.execute(prompt, model))
+        stats = current_call()
+        if shared and stats is not None:
+            stats.coalesced = True
+        return output
+
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        async for text in self.provider.stream(prompt, model):
+            yield text
+
+    def generation_params(self) -> dict:
+        return self.provider.generation_params()
+
+    def list_models(self) -> list[str]:
+        return self.provider.list_models()
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from app.core.config import settings
+
+RETRYABLE_STATUS_CODES = {408, 409, 500, 502, 503, 504, 529}
+
+
+def http_client_options() -> dict:
+    return {
+        "http2": settings.PROVIDER_HTTP2,
+        "limits": httpx.Limits(
+            max_connections=settings.PROVIDER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.PROVIDER_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        "timeout": httpx.Timeout(
+            settings.PROVIDER_TIMEOUT_SECONDS,
+            connect=settings.PROVIDER_CONNECT_TIMEOUT_SECONDS,
+        ),
+    }
+
+
+def retry_after_seconds(headers: httpx.Headers) -> float | None:
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
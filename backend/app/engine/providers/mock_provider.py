@@ -1,9 +1,36 @@
-from app.engine.providers.base import LLMProvider
+import uuid
+from collections.abc import AsyncIterator
+
+from app.engine.providers.base import BatchRequest, BatchResult, LLMProvider
+from app.engine.providers.call_stats import record_token_usage
+from app.engine.prompt_segments import strip_cache_breaks
+from app.engine.token_estimator import estimate_tokens
 
 
 class MockProvider(LLMProvider):
-    def execute(self, prompt: str, model: str) -> str:
-        return f"Mock response for: {prompt[:100]}"
+    MODELS = ["mock-model"]
+
+    def __init__(self):
+        self._batches: dict[str, list[BatchResult]] = {}
+
+    async def execute(self, prompt: str, model: str) -> str:
+        output = f"Mock response for: {strip_cache_breaks(prompt)[:100]}"
+        record_token_usage(estimate_tokens(strip_cache_breaks(prompt)), estimate_tokens(output))
+        return output
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        batch_id = f"mock-batch-{uuid.uuid4().hex}"
+        self._batches[batch_id] = [
+            BatchResult(request.custom_id, output=await self.execute(request.prompt, request.model))
+            for request in requests
+        ]
+        return batch_id
+
+    async def poll_batch(self, batch_id: str) -> list[BatchResult] | None:
+        return self._batches.pop(batch_id, [])
 
-    def list_models(self) -> list[str]:
-        return ["mock-model"]
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        first_word, *rest = (await self.execute(prompt, model)).split(" ")
+        yield first_word
+        for word in rest:
+            yield f" {word}"
@@ -1,19 +1,139 @@
-from openai import OpenAI
+import json
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, DefaultAsyncHttpxClient, RateLimitError
 
 from app.core.config import settings
-from app.engine.providers.base import LLMProvider
+from app.engine.providers.base import (
+    BatchRequest,
+    BatchResult,
+    LLMProvider,
+    ProviderRateLimitError,
+    ProviderTransientError,
+)
+from app.engine.providers.call_stats import report_usage
+from app.engine.providers.http_options import RETRYABLE_STATUS_CODES, http_client_options, retry_after_seconds
+from app.engine.prompt_segments import strip_cache_breaks
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+@contextmanager
+def _translated_errors() -> Iterator[None]:
+    try:
+        yield
+    except RateLimitError as e:
+        raise ProviderRateLimitError(e.message, retry_after_seconds(e.response.headers)) from e
+    except APIStatusError as e:
+        if e.status_code in RETRYABLE_STATUS_CODES:
+            raise ProviderTransientError(e.message) from e
+        raise
+    except APIConnectionError as e:
+        raise ProviderTransientError(str(e)) from e
+
+
+def _cached_tokens(usage) -> int:
+    # OpenAI caches long prompt prefixes automatically; only reads are reported
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    return (details.cached_tokens or 0) if details else 0
+
+
+def _record_usage(usage, model: str) -> None:
+    if usage is not None:
+        report_usage("openai", model, usage.prompt_tokens, usage.completion_tokens, _cached_tokens(usage))
 
 
 class OpenAIProvider(LLMProvider):
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    MODELS = ["gpt-4o", "gpt-4o-mini"]
 
-    def execute(self, prompt: str, model: str) -> str:
-        response = self.client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
+    def __init__(self):
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            http_client=DefaultAsyncHttpxClient(**http_client_options()),
+            max_retries=0,
         )
+
+    async def execute(self, prompt: str, model: str) -> str:
+        with _translated_errors():
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": strip_cache_breaks(prompt)}],
+            )
+        _record_usage(response.usage, model)
         return response.choices[0].message.content
 
-    def list_models(self) -> list[str]:
-        return ["gpt-4o", "gpt-4o-mini"]
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        with _translated_errors():
+            stream = await self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": strip_cache_breaks(prompt)}],
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            async for chunk in stream:
+                _record_usage(chunk.usage, model)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": request.custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": {
+                        "model": request.model,
+                        "messages": [{"role": "user", "content": strip_cache_breaks(request.prompt)}],
+                    },
+                }
+            )
+            for request in requests
+        ]
+        input_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def poll_batch(self, batch_id: str) -> list[BatchResult] | None:
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status not in BATCH_FINAL_STATUSES:
+            return None
+
+        results = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                results.append(self._parse_batch_line(json.loads(line)))
+        return results
+
+    def _parse_batch_line(self, item: dict) -> BatchResult:
+        response = item.get("response")
+        if response and response.get("status_code") == 200:
+            body = response["body"]
+            usage = body.get("usage") or {}
+            details = usage.get("prompt_tokens_details") or {}
+            return BatchResult(
+                item["custom_id"],
+                output=body["choices"][0]["message"]["content"],
+                input_tokens=usage.get("prompt_tokens"),
+                output_tokens=usage.get("completion_tokens"),
+                cache_read_tokens=details.get("cached_tokens") or 0,
+            )
+        error = item.get("error") or (response or {}).get("body")
+        return BatchResult(item["custom_id"], error=json.dumps(error))
+
+    async def aclose(self) -> None:
+        await self.client.close()
@@ -0,0 +1,107 @@
+import time
+from collections.abc import AsyncIterator
+
+from app.core.config import settings
+from app.core.metrics import provider_first_token, provider_queue_wait, provider_request_duration, provider_requests
+from app.engine.providers.base import BatchRequest, BatchResult, LLMProvider, ProviderRateLimitError
+from app.engine.providers.call_stats import record_first_token, record_provider_time, record_queue_wait
+from app.engine.rate_limiter import AdaptiveLimiter, RateLimiterRegistry
+
+
+class RateLimitedProvider(LLMProvider):
+    """Holds a limiter slot around each provider request.
+
+    As the layer closest to the wire, it also times each attempt: the wait
+    for a slot and the request itself are reported to the tracked call.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        provider_name: str,
+        limiters: RateLimiterRegistry,
+        max_retries: int = settings.PROVIDER_RATE_LIMIT_MAX_RETRIES,
+    ):
+        self.provider = provider
+        self.provider_name = provider_name
+        self.limiters = limiters
+        self.max_retries = max_retries
+
+    async def execute(self, prompt: str, model: str) -> str:
+        limiter = self.limiters.get(self.provider_name, model)
+        for attempt in range(self.max_retries + 1):
+            ticket = await self._acquire(limiter, model)
+            sent_at = time.monotonic()
+            outcome = "ok"
+            try:
+                output = await self.provider.execute(prompt, model)
+            except ProviderRateLimitError as e:
+                outcome = type(e).__name__
+                limiter.release_rate_limited(ticket, e.retry_after)
+                if attempt == self.max_retries:
+                    raise
+                continue
+            except BaseException as e:
+                outcome = type(e).__name__
+                limiter.release_failed()
+                raise
+            finally:
+                self._observe_request(model, time.monotonic() - sent_at, outcome)
+            limiter.release(ticket)
+            return output
+
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        limiter = self.limiters.get(self.provider_name, model)
+        for attempt in range(self.max_retries + 1):
+            ticket = await self._acquire(limiter, model)
+            sent_at = time.monotonic()
+            outcome = "ok"
+            started = False
+            try:
+                async for text in self.provider.stream(prompt, model):
+                    if not started:
+                        first_token = time.monotonic() - sent_at
+                        record_first_token(first_token)
+                        provider_first_token.observe(first_token, provider=self.provider_name, model=model)
+                    started = True
+                    yield text
+            except ProviderRateLimitError as e:
+                outcome = type(e).__name__
+                limiter.release_rate_limited(ticket, e.retry_after)
+                # Text already sent to the caller cannot be taken back
+                if started or attempt == self.max_retries:
+                    raise
+                continue
+            except BaseException as e:
+                outcome = type(e).__name__
+                limiter.release_failed()
+                raise
+            finally:
+                self._observe_request(model, time.monotonic() - sent_at, outcome)
+            limiter.release(ticket)
+            return
+
+    async def _acquire(self, limiter: AdaptiveLimiter, model: str) -> int:
+        queued_at = time.monotonic()
+        ticket = await limiter.acquire()
+        waited = time.monotonic() - queued_at
+        record_queue_wait(waited)
+        provider_queue_wait.observe(waited, provider=self.provider_name, model=model)
+        return ticket
+
+    def _observe_request(self, model: str, seconds: float, outcome: str) -> None:
+        record_provider_time(seconds)
+        provider_request_duration.observe(seconds, provider=self.provider_name, model=model)
+        provider_requests.inc(provider=self.provider_name, model=model, outcome=outcome)
+
+    def generation_params(self) -> dict:
+        return self.provider.generation_params()
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        return await self.provider.submit_batch(requests)
+
+    async def poll_batch(self, batch_id: str) -> list[BatchResult] | None:
+        return await self.provider.poll_batch(batch_id)
+
+    def list_models(self) -> list[str]:
+        return self.provider.list_models()
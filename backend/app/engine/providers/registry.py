@@ -0,0 +1,23 @@
+from app.engine.providers.base import LLMProvider
+
+
+class ProviderRegistry:
+    def __init__(self, provider_classes: dict[str, type[LLMProvider]]):
+        self.provider_classes = provider_classes
+        self._providers: dict[str, LLMProvider] = {}
+
+    def get(self, name: str) -> LLMProvider:
+        provider = self._providers.get(name)
+        if provider is None:
+            provider_class = self.provider_classes.get(name)
+            if not provider_class:
+                raise ValueError(f"Unknown provider: {name}")
+            provider = provider_class()
+            self._providers[name] = provider
+        return provider
+
+    async def aclose(self) -> None:
+        providers = list(self._providers.values())
+        self._providers.clear()
+        for provider in providers:
+            await provider.aclose()
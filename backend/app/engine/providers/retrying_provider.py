@@ -0,0 +1,168 @@
+import asyncio
+import math
+import random
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, replace
+
+from app.core.config import settings
+from app.engine.providers.base import BatchRequest, BatchResult, LLMProvider, ProviderTransientError
+from app.engine.providers.call_stats import current_call
+
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    deadline: float = 300.0
+    hedge: bool = False
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number ``attempt``."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def retry_policy_for(provider_name: str) -> RetryPolicy:
+    policy = RetryPolicy(
+        max_attempts=settings.PROVIDER_RETRY_MAX_ATTEMPTS,
+        base_delay=settings.PROVIDER_RETRY_BASE_DELAY_SECONDS,
+        max_delay=settings.PROVIDER_RETRY_MAX_DELAY_SECONDS,
+        deadline=settings.PROVIDER_RETRY_DEADLINE_SECONDS,
+        hedge=settings.PROVIDER_HEDGING,
+    )
+    return replace(policy, **settings.PROVIDER_RETRY_POLICIES.get(provider_name, {}))
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per (provider, model)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: dict[tuple[str, str], deque[float]] = {}
+
+    def record(self, provider: str, model: str, seconds: float) -> None:
+        samples = self._samples.get((provider, model))
+        if samples is None:
+            samples = self._samples[(provider, model)] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def p95(self, provider: str, model: str) -> float | None:
+        samples = self._samples.get((provider, model))
+        if not samples or len(samples) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+
+latency_tracker = LatencyTracker()
+
+
+class RetryingProvider(LLMProvider):
+    def __init__(
+        self,
+        provider: LLMProvider,
+        provider_name: str,
+        policy: RetryPolicy,
+        latencies: LatencyTracker = latency_tracker,
+    ):
+        self.provider = provider
+        self.provider_name = provider_name
+        self.policy = policy
+        self.latencies = latencies
+
+    async def execute(self, prompt: str, model: str) -> str:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.policy.deadline
+        attempt = 1
+        while True:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    return await self._attempt(prompt, model)
+            except TimeoutError:
+                raise ProviderTransientError(
+                    f"Provider call exceeded its {self.policy.deadline:g}s deadline"
+                ) from None
+            except ProviderTransientError:
+                delay = self.policy.backoff(attempt)
+                if attempt >= self.policy.max_attempts or loop.time() + delay >= deadline:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.policy.deadline
+        attempt = 1
+        while True:
+            self._count_attempt()
+            started = False
+            try:
+                async for text in self.provider.stream(prompt, model):
+                    started = True
+                    yield text
+                return
+            except ProviderTransientError:
+                # Text already sent to the caller cannot be taken back
+                delay = self.policy.backoff(attempt)
+                if started or attempt >= self.policy.max_attempts or loop.time() + delay >= deadline:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def generation_params(self) -> dict:
+        return self.provider.generation_params()
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        return await self.provider.submit_batch(requests)
+
+    async def poll_batch(self, batch_id: str) -> list[BatchResult] | None:
+        return await self.provider.poll_batch(batch_id)
+
+    def list_models(self) -> list[str]:
+        return self.provider.list_models()
+
+    async def _attempt(self, prompt: str, model: str) -> str:
+        hedge_after = self.latencies.p95(self.provider_name, model) if self.policy.hedge else None
+        if hedge_after is None:
+            return await self._timed_call(prompt, model)
+
+        # Fire a duplicate once the first call is slower than p95 and keep
+        # whichever succeeds first; the loser is cancelled.
+        primary = asyncio.create_task(self._timed_call(prompt, model))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                stats = current_call()
+                if stats is not None:
+                    stats.hedged = True
+                tasks.add(asyncio.create_task(self._timed_call(prompt, model)))
+
+            error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _timed_call(self, prompt: str, model: str) -> str:
+        self._count_attempt()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        output = await self.provider.execute(prompt, model)
+        self.latencies.record(self.provider_name, model, loop.time() - started)
+        return output
+
+    def _count_attempt(self) -> None:
+        stats = current_call()
+        if stats is not None:
+            stats.attempts += 1
@@ -0,0 +1,87 @@
+import asyncio
+import math
+import random
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+from app.engine.providers.base import LLMProvider, ProviderTransientError
+from app.engine.providers.call_stats import record_token_usage
+from app.engine.token_estimator import estimate_tokens
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """Seconds to first token, drawn from a fixed, uniform or lognormal distribution.
+
+    For ``lognormal``, ``value`` is the median and ``spread`` the sigma of the
+    underlying normal, which gives the long right tail real providers show.
+    For ``uniform``, the latency falls in ``value ± spread``.
+    """
+
+    kind: str = "fixed"
+    value: float = 0.0
+    spread: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        """Parse ``fixed:0.05``, ``uniform:0.05:0.02`` or ``lognormal:0.05:0.5``."""
+        kind, *numbers = spec.split(":")
+        if kind not in ("fixed", "uniform", "lognormal") or not 1 <= len(numbers) <= 2:
+            raise ValueError(f"Invalid latency distribution: {spec}")
+        return cls(kind, *(float(n) for n in numbers))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return max(0.0, rng.uniform(self.value - self.spread, self.value + self.spread))
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.value), self.spread) if self.value > 0 else 0.0
+        return self.value
+
+
+class SimulatedProvider(LLMProvider):
+    """Stand-in provider with realistic timing, for benchmarks and load tests.
+
+    Each call waits a sampled time-to-first-token, fails with a transient
+    error at ``error_rate``, then produces ``output_tokens`` words, streamed
+    ``token_interval`` seconds apart. Seeded, so sweeps are repeatable.
+    """
+
+    MODELS = ["simulated"]
+
+    def __init__(
+        self,
+        latency: LatencyDistribution = LatencyDistribution(),
+        error_rate: float = 0.0,
+        output_tokens: int = 50,
+        token_interval: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.output_tokens = output_tokens
+        self.token_interval = token_interval
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    async def execute(self, prompt: str, model: str) -> str:
+        await self._first_token(prompt)
+        if self.token_interval:
+            await asyncio.sleep(self.token_interval * self.output_tokens)
+        return " ".join(self._words())
+
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        await self._first_token(prompt)
+        for i, word in enumerate(self._words()):
+            if i and self.token_interval:
+                await asyncio.sleep(self.token_interval)
+            yield word if i == 0 else f" {word}"
+
+    async def _first_token(self, prompt: str) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.latency.sample(self.rng))
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise ProviderTransientError("Simulated provider error")
+        record_token_usage(estimate_tokens(prompt), self.output_tokens)
+
+    def _words(self) -> list[str]:
+        return [f"token{i}" for i in range(self.output_tokens)]
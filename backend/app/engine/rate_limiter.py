@@ -0,0 +1,144 @@
+import asyncio
+import math
+import time
+from collections import deque
+
+from app.core.config import settings
+
+
+class AdaptiveLimiter:
+    """Concurrency window plus token bucket for one (provider, model) pair.
+
+    The concurrency window follows AIMD: every successful call widens it by
+    ``1 / limit`` (roughly one slot per window of successes) and a rate-limit
+    response halves it and pauses new calls until the provider's retry-after
+    has passed. Other failures free their slot without widening the window.
+    Callers over the limit wait instead of failing.
+    """
+
+    def __init__(
+        self,
+        initial_concurrency: int,
+        min_concurrency: int,
+        max_concurrency: int,
+        requests_per_second: float = 0.0,
+        backoff_seconds: float = 1.0,
+    ):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.limit = float(min(max(initial_concurrency, min_concurrency), max_concurrency))
+        self.requests_per_second = requests_per_second
+        self.backoff_seconds = backoff_seconds
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._capacity = max(1.0, requests_per_second)
+        self._tokens = self._capacity
+        self._refilled_at = time.monotonic()
+        self._epoch = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> int:
+        """Wait for a free slot; returns a ticket to hand back on release."""
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = self._try_acquire(time.monotonic())
+            if delay == 0:
+                return self._epoch
+
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout=delay)
+            except TimeoutError:
+                pass
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def release(self, ticket: int) -> None:
+        self.in_flight -= 1
+        if ticket == self._epoch:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        self._wake_waiters()
+
+    def release_failed(self) -> None:
+        """Free a slot whose call failed for a reason other than rate limiting."""
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def release_rate_limited(self, ticket: int, retry_after: float | None) -> None:
+        self.in_flight -= 1
+        # Calls already in flight when the window shrank report the same
+        # overload, so only the first of them halves the window again.
+        if ticket == self._epoch:
+            self.limit = max(self.min_concurrency, self.limit / 2)
+            self._epoch += 1
+        pause = retry_after if retry_after is not None else self.backoff_seconds
+        self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        self._wake_waiters()
+
+    def stats(self) -> dict:
+        return {
+            "limit": math.floor(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "paused_for": max(0.0, self.paused_until - time.monotonic()),
+        }
+
+    def _try_acquire(self, now: float) -> float | None:
+        """Take a slot and return 0, or return how long to wait (None: until a release)."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= math.floor(self.limit):
+            return None
+        if self.requests_per_second > 0:
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._refilled_at) * self.requests_per_second
+            )
+            self._refilled_at = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.requests_per_second
+            self._tokens -= 1
+        self.in_flight += 1
+        return 0
+
+    def _wake_waiters(self) -> None:
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class RateLimiterRegistry:
+    def __init__(self, overrides: dict[str, dict[str, float]] | None = None):
+        self.overrides = overrides or {}
+        self._limiters: dict[tuple[str, str], AdaptiveLimiter] = {}
+
+    def get(self, provider: str, model: str) -> AdaptiveLimiter:
+        key = (provider, model)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._create(provider, model)
+            self._limiters[key] = limiter
+        return limiter
+
+    def stats(self) -> list[dict]:
+        return [
+            {"provider": provider, "model": model, **limiter.stats()}
+            for (provider, model), limiter in sorted(self._limiters.items())
+        ]
+
+    def _create(self, provider: str, model: str) -> AdaptiveLimiter:
+        options = {
+            **self.overrides.get(provider, {}),
+            **self.overrides.get(f"{provider}:{model}", {}),
+        }
+        return AdaptiveLimiter(
+            initial_concurrency=int(options.get("initial_concurrency", settings.PROVIDER_CONCURRENCY_INITIAL)),
+            min_concurrency=int(options.get("min_concurrency", settings.PROVIDER_CONCURRENCY_MIN)),
+            max_concurrency=int(options.get("max_concurrency", settings.PROVIDER_CONCURRENCY_MAX)),
+            requests_per_second=options.get("requests_per_second", settings.PROVIDER_REQUESTS_PER_SECOND),
+            backoff_seconds=settings.PROVIDER_RATE_LIMIT_BACKOFF_SECONDS,
+        )
+
+
+rate_limiters = RateLimiterRegistry(settings.PROVIDER_RATE_LIMITS)
@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from app.core.config import settings
+
+CACHE_BYPASS = "bypass"
+CACHE_READ = "read"
+CACHE_WRITE = "write"
+
+
+def response_cache_key(provider: str, model: str, params: dict, prompt: str) -> str:
+    payload = json.dumps(
+        {"provider": provider, "model": model, "params": params, "prompt": prompt},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        directory: str | Path,
+        memory_entries: int,
+        ttl_seconds: int,
+        max_bytes: int,
+    ):
+        self.directory = Path(directory)
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._disk_bytes: int | None = None
+        # Disk writes run in worker threads; this guards the size accounting and eviction
+        self._disk_lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    async def get(self, key: str) -> str | None:
+        entry = self._memory.get(key)
+        if entry and not self._is_expired(entry[0]):
+            self._memory.move_to_end(key)
+            self.counters["memory_hits"] += 1
+            return entry[1]
+
+        entry = await asyncio.to_thread(self._read_disk, key)
+        if entry and not self._is_expired(entry[0]):
+            self._remember(key, entry)
+            self.counters["disk_hits"] += 1
+            return entry[1]
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, output: str) -> None:
+        entry = (time.time(), output)
+        self._remember(key, entry)
+        await asyncio.to_thread(self._write_disk, key, entry)
+        self.counters["writes"] += 1
+
+    def stats(self) -> dict[str, int | float]:
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        lookups = hits + self.counters["misses"]
+        return {**self.counters, "hit_ratio": hits / lookups if lookups else 0.0}
+
+    def _is_expired(self, created_at: float) -> bool:
+        return time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, entry: tuple[float, str]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> tuple[float, str] | None:
+        try:
+            data = json.loads(self._path(key).read_text())
+        except (OSError, ValueError):
+            return None
+        return data["created_at"], data["output"]
+
+    def _write_disk(self, key: str, entry: tuple[float, str]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps({"created_at": entry[0], "output": entry[1]}))
+
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(f.stat().st_size for f in self._disk_files())
+            # Overwriting an entry replaces its bytes rather than adding to them
+            self._disk_bytes += tmp_path.stat().st_size - self._size(path)
+            os.replace(tmp_path, path)
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _disk_files(self) -> list[Path]:
+        return list(self.directory.glob("*/*.json"))
+
+    def _evict(self) -> None:
+        files = sorted(
+            ((f.stat().st_mtime, f.stat().st_size, f) for f in self._disk_files()),
+            key=lambda item: item[0],
+        )
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for _, size, path in files:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.counters["evictions"] += 1
+        self._disk_bytes = total
+
+
+response_cache = ResponseCache(
+    directory=settings.RESPONSE_CACHE_DIR,
+    memory_entries=settings.RESPONSE_CACHE_MEMORY_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+)
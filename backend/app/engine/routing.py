@@ -0,0 +1,27 @@
+import re
+
+
+def select_branch(value: str, routes: list[dict], default_branch: str | None) -> str:
+    """Pick the branch for ``value`` from the first matching route rule.
+
+    ``equals`` and ``contains`` compare case-insensitively after trimming, so
+    a classifier answering "Billing." still routes to a ``billing`` rule via
+    ``contains``. Without rules, the trimmed value itself is the branch.
+    """
+    text = value.strip()
+    for rule in routes:
+        if _matches(text, rule["match"], rule["value"]):
+            return rule["branch"]
+    if default_branch is not None:
+        return default_branch
+    if not routes:
+        return text
+    raise ValueError(f"No route matched {text[:100]!r}")
+
+
+def _matches(text: str, match: str, value: str) -> bool:
+    if match == "equals":
+        return text.lower() == value.strip().lower()
+    if match == "contains":
+        return value.strip().lower() in text.lower()
+    return re.search(value, text) is not None
@@ -0,0 +1,37 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one shared call.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it is in flight await the same task. A caller being cancelled does
+    not cancel the shared call for the others.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.shared = 0
+
+    async def do(self, key: str, call: Callable[[], Awaitable[str]]) -> tuple[str, bool]:
+        """Return the call's result and whether it came from another caller's call."""
+        task = self._in_flight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.shared += 1
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(call())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), False
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case every caller went away
+            task.exception()
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,45 @@
+from collections.abc import Collection, Sequence
+
+from app.engine.execution_plan import PlannedStep
+
+
+class StepGraph:
+    """Dependencies between steps, derived from the variables they read and write.
+
+    A step reads each variable from the latest earlier step that writes it.
+    When that producer is skipped (e.g. it sits on a branch the router did
+    not take), the variable falls back to the next earlier producer, so
+    branches that write the same variable join again in the steps after them.
+    """
+
+    def __init__(self, steps: Sequence[PlannedStep], variables: dict[int, list[str]]):
+        # Producers of each consumed variable, latest first
+        self.producers: dict[int, dict[str, list[int]]] = {}
+        earlier_producers: dict[str, list[int]] = {}
+        for step in steps:
+            self.producers[step.id] = {
+                name: list(reversed(earlier_producers[name]))
+                for name in variables[step.id]
+                if name in earlier_producers
+            }
+            earlier_producers.setdefault(step.output_variable, []).append(step.id)
+
+    def is_ready(self, step: PlannedStep, outputs: Collection[int], skipped: Collection[int]) -> bool:
+        producers = (self._producer(ids, skipped) for ids in self.producers[step.id].values())
+        return all(producer_id is None or producer_id in outputs for producer_id in producers)
+
+    def missing_input(self, step: PlannedStep, skipped: Collection[int]) -> bool:
+        """Whether a variable the step reads was only written by steps that were skipped."""
+        return any(self._producer(ids, skipped) is None for ids in self.producers[step.id].values())
+
+    def context_for(
+        self, step: PlannedStep, variables: dict[str, str], outputs: dict[int, str], skipped: Collection[int]
+    ) -> dict[str, str]:
+        context = dict(variables)
+        for name, producer_ids in self.producers[step.id].items():
+            context[name] = outputs[self._producer(producer_ids, skipped)]
+        return context
+
+    @staticmethod
+    def _producer(producer_ids: list[int], skipped: Collection[int]) -> int | None:
+        return next((producer_id for producer_id in producer_ids if producer_id not in skipped), None)
@@ -0,0 +1,53 @@
+import json
+import re
+
+from app.engine.token_estimator import WORD_PATTERN, estimate_tokens
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def split_text(text: str, by: str, chunk_size: int) -> list[str]:
+    """Split ``text`` into chunks for a map step.
+
+    ``json`` expects an array and yields one chunk per element. ``tokens``
+    packs words into chunks of at most ``chunk_size`` estimated tokens, and
+    ``paragraphs`` / ``lines`` pack whole units the same way so that no unit
+    is cut in half; a unit larger than ``chunk_size`` becomes its own chunk.
+    """
+    if by == "json":
+        return parse_json_list(text)
+    if by == "tokens":
+        return _pack(WORD_PATTERN.findall(text), chunk_size, "")
+    if by == "paragraphs":
+        return _pack(PARAGRAPH_BREAK.split(text), chunk_size, "\n\n")
+    if by == "lines":
+        return _pack(text.splitlines(), chunk_size, "\n")
+    raise ValueError(f"Unknown split mode: {by}")
+
+
+def parse_json_list(text: str) -> list[str]:
+    try:
+        items = json.loads(text)
+    except json.JSONDecodeError:
+        items = None
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array")
+    return [item if isinstance(item, str) else json.dumps(item) for item in items]
+
+
+def _pack(units: list[str], chunk_size: int, joiner: str) -> list[str]:
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for unit in units:
+        if not unit.strip():
+            continue
+        tokens = estimate_tokens(unit)
+        if current and current_tokens + tokens > chunk_size:
+            chunks.append(joiner.join(current).strip())
+            current, current_tokens = [], 0
+        current.append(unit if joiner == "" else unit.strip())
+        current_tokens += tokens
+    if current:
+        chunks.append(joiner.join(current).strip())
+    return chunks
@@ -0,0 +1,95 @@
+import math
+import re
+from dataclasses import dataclass
+
+from app.engine.prompt_segments import strip_cache_breaks
+
+WORD_PATTERN = re.compile(r"\S+\s*")
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Token accounting for one model; prices are USD per million tokens."""
+
+    context_window: int
+    max_output_tokens: int
+    input_price: float | None = None
+    output_price: float | None = None
+    chars_per_token: float = DEFAULT_CHARS_PER_TOKEN
+    message_overhead: int = 0
+
+
+# Characters per token calibrated on English prose against each provider's
+# tokenizer; code and non-Latin scripts tokenize denser than this.
+PROVIDER_SPECS: dict[str, ModelSpec] = {
+    "anthropic": ModelSpec(context_window=200_000, max_output_tokens=8_192, chars_per_token=3.5, message_overhead=7),
+    "openai": ModelSpec(context_window=128_000, max_output_tokens=16_384, chars_per_token=4.0, message_overhead=7),
+    "mock": ModelSpec(context_window=128_000, max_output_tokens=4_096, input_price=0.0, output_price=0.0),
+}
+
+MODEL_SPECS: dict[tuple[str, str], ModelSpec] = {
+    ("anthropic", "claude-sonnet-4-5-20250929"): ModelSpec(
+        context_window=200_000, max_output_tokens=64_000, input_price=3.0, output_price=15.0,
+        chars_per_token=3.5, message_overhead=7,
+    ),
+    ("anthropic", "claude-haiku-4-5-20251001"): ModelSpec(
+        context_window=200_000, max_output_tokens=64_000, input_price=1.0, output_price=5.0,
+        chars_per_token=3.5, message_overhead=7,
+    ),
+    ("openai", "gpt-4o"): ModelSpec(
+        context_window=128_000, max_output_tokens=16_384, input_price=2.5, output_price=10.0, message_overhead=7,
+    ),
+    ("openai", "gpt-4o-mini"): ModelSpec(
+        context_window=128_000, max_output_tokens=16_384, input_price=0.15, output_price=0.6, message_overhead=7,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class CallEstimate:
+    input_tokens: int
+    max_output_tokens: int
+    cost: float | None
+    context_window: int
+
+    @property
+    def fits_context(self) -> bool:
+        return self.input_tokens + self.max_output_tokens <= self.context_window
+
+
+def model_spec(provider: str, model: str) -> ModelSpec:
+    return MODEL_SPECS.get((provider, model)) or PROVIDER_SPECS.get(provider) or ModelSpec(128_000, 4_096)
+
+
+def estimate_tokens(text: str, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN) -> int:
+    """Heuristic token count: every word costs at least one token, long words more."""
+    return sum(max(1, math.ceil(len(word.strip()) / chars_per_token)) for word in WORD_PATTERN.findall(text))
+
+
+def estimate_call(
+    provider: str, model: str, prompt: str, generation_params: dict, extra_input_tokens: int = 0
+) -> CallEstimate:
+    """Estimate a single-message call; cost assumes the full output budget is used.
+
+    ``extra_input_tokens`` accounts for text not in ``prompt`` yet, such as
+    outputs of earlier pipeline steps during a preflight.
+    """
+    spec = model_spec(provider, model)
+    input_tokens = estimate_tokens(strip_cache_breaks(prompt), spec.chars_per_token)
+    input_tokens += spec.message_overhead + extra_input_tokens
+    max_output_tokens = generation_params.get("max_tokens") or spec.max_output_tokens
+    cost = None
+    if spec.input_price is not None and spec.output_price is not None:
+        cost = round((input_tokens * spec.input_price + max_output_tokens * spec.output_price) / 1_000_000, 6)
+    return CallEstimate(input_tokens, max_output_tokens, cost, spec.context_window)
+
+
+def check_context_window(provider: str, model: str, prompt: str, generation_params: dict) -> None:
+    """Reject a prompt that cannot fit before it is sent to the provider."""
+    estimate = estimate_call(provider, model, prompt, generation_params)
+    if not estimate.fits_context:
+        raise ValueError(
+            f"Prompt of ~{estimate.input_tokens} tokens plus {estimate.max_output_tokens} output tokens "
+            f"exceeds the {estimate.context_window}-token context window of {model}"
+        )
@@ -1,6 +1,9 @@
 import re
+from collections import OrderedDict
+from collections.abc import Iterable
 
 VARIABLE_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+COMPILED_TEMPLATE_CACHE_SIZE = 1024
 
 
 def substitute_variables(content: str, variables: dict[str, str]) -> str:
@@ -15,3 +18,40 @@ def substitute_variables(content: str, variables: dict[str, str]) -> str:
 
 def extract_variables(content: str) -> list[str]:
     return list(dict.fromkeys(VARIABLE_PATTERN.findall(content)))
+
+
+class CompiledTemplate:
+    def __init__(self, content: str):
+        self.content = content
+        parts = VARIABLE_PATTERN.split(content)
+        self.literals: list[str] = parts[0::2]
+        self.slots: list[str] = parts[1::2]
+        self.variables: list[str] = list(dict.fromkeys(self.slots))
+        self._pieces: list[str] = list(parts)
+
+    def render(self, variables: dict[str, str]) -> str:
+        for name in self.variables:
+            if name not in variables:
+                raise ValueError(f"Missing variable: {name}")
+        pieces = self._pieces.copy()
+        pieces[1::2] = [variables[name] for name in self.slots]
+        return "".join(pieces)
+
+    def render_many(self, variable_sets: Iterable[dict[str, str]]) -> list[str]:
+        return [self.render(variables) for variables in variable_sets]
+
+
+_compiled_templates: OrderedDict[int, CompiledTemplate] = OrderedDict()
+
+
+def compile_template_version(version_id: int, content: str) -> CompiledTemplate:
+    compiled = _compiled_templates.get(version_id)
+    if compiled is not None and compiled.content == content:
+        _compiled_templates.move_to_end(version_id)
+        return compiled
+
+    compiled = CompiledTemplate(content)
+    _compiled_templates[version_id] = compiled
+    if len(_compiled_templates) > COMPILED_TEMPLATE_CACHE_SIZE:
+        _compiled_templates.popitem(last=False)
+    return compiled
@@ -1,22 +1,33 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import api_router
+from app.core.config import settings
 from app.core.database import engine
+from app.core.http_metrics import MetricsMiddleware
+from app.core.metrics import CONTENT_TYPE, metrics
+from app.engine.providers import provider_registry
 from app.models import Base
 
 
 @asynccontextmanager
 async def lifespan(_application: FastAPI):
     Base.metadata.create_all(bind=engine)
+    metrics.absorb_exited_processes()
+    flusher = asyncio.create_task(metrics.flush_periodically(settings.METRICS_FLUSH_INTERVAL_SECONDS))
     yield
+    flusher.cancel()
+    metrics.flush(exiting=True)
+    await provider_registry.aclose()
 
 
 def create_app() -> FastAPI:
     application = FastAPI(title="LLM Prompt Lab", lifespan=lifespan)
     _configure_cors(application)
+    application.add_middleware(MetricsMiddleware)
     _register_routes(application)
     return application
 
@@ -36,6 +47,10 @@ def _register_routes(application: FastAPI) -> None:
     def health_check():
         return {"status": "healthy"}
 
+    @application.get("/metrics", include_in_schema=False)
+    def metrics_exposition():
+        return Response(metrics.render(), media_type=CONTENT_TYPE)
+
     application.include_router(api_router)
 
 
@@ -1,4 +1,6 @@
 from app.models.base import Base
+from app.models.batch import ExecutionBatch, ProviderBatchJob
+from app.models.comparison import ExecutionComparison
 from app.models.execution import Execution, ExecutionStatus
 from app.models.pipeline import Pipeline, PipelineExecution, PipelineStep, PipelineStepExecution
 from app.models.template import Template, TemplateVersion
@@ -7,11 +9,14 @@ from app.models.user import User
 __all__ = [
     "Base",
     "Execution",
+    "ExecutionBatch",
+    "ExecutionComparison",
     "ExecutionStatus",
     "Pipeline",
     "PipelineExecution",
     "PipelineStep",
     "PipelineStepExecution",
+    "ProviderBatchJob",
     "Template",
     "TemplateVersion",
     "User",
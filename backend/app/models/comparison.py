@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Text, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base
+
+
+class ExecutionComparison(Base):
+    __tablename__ = "execution_comparisons"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), nullable=False, index=True
+    )
+    template_id: Mapped[int] = mapped_column(
+        ForeignKey("templates.id", ondelete="CASCADE"), nullable=False
+    )
+    variables: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    template: Mapped["Template"] = relationship()
+    executions: Mapped[list["Execution"]] = relationship(order_by="Execution.id")
+
+
+from app.models.execution import Execution  # noqa: E402
+from app.models.template import Template  # noqa: E402
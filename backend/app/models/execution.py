@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, String, Text, false, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -12,6 +12,7 @@ class ExecutionStatus(str, enum.Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    SKIPPED = "skipped"
 
 
 class Execution(Base):
@@ -24,12 +25,38 @@ class Execution(Base):
     template_version_id: Mapped[int] = mapped_column(
         ForeignKey("template_versions.id"), nullable=False
     )
+    batch_id: Mapped[int | None] = mapped_column(
+        ForeignKey("execution_batches.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    comparison_id: Mapped[int | None] = mapped_column(
+        ForeignKey("execution_comparisons.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    provider_batch_job_id: Mapped[int | None] = mapped_column(
+        ForeignKey("provider_batch_jobs.id", ondelete="SET NULL"), nullable=True, index=True
+    )
     provider: Mapped[str] = mapped_column(String(50), nullable=False)
     model: Mapped[str] = mapped_column(String(100), nullable=False)
     variables: Mapped[str] = mapped_column(Text, nullable=False)
     status: Mapped[ExecutionStatus] = mapped_column(default=ExecutionStatus.PENDING)
     output: Mapped[str | None] = mapped_column(Text, nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    estimated_cost: Mapped[float | None] = mapped_column(nullable=True)
+    # Run options (cache, coalesce) for the worker to apply
+    options: Mapped[str] = mapped_column(Text, nullable=False, default="{}", server_default="{}")
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+    # Shared another request's in-flight provider call instead of making its own
+    coalesced: Mapped[bool] = mapped_column(nullable=False, default=False, server_default=false())
+    # A duplicate request was fired because the first was slower than usual
+    hedged: Mapped[bool] = mapped_column(nullable=False, default=False, server_default=false())
+    input_tokens: Mapped[int | None] = mapped_column(nullable=True)
+    output_tokens: Mapped[int | None] = mapped_column(nullable=True)
+    cache_read_tokens: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+    cache_write_tokens: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+    queue_wait_ms: Mapped[int | None] = mapped_column(nullable=True)
+    provider_latency_ms: Mapped[int | None] = mapped_column(nullable=True)
+    first_token_ms: Mapped[int | None] = mapped_column(nullable=True)
+    # Renewed by the worker while it runs the row; a stale lease means the worker died
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -1,12 +1,21 @@
+import enum
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Index, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text, false, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 from app.models.execution import ExecutionStatus
 
 
+class StepType(str, enum.Enum):
+    PROMPT = "prompt"
+    SPLIT = "split"
+    MAP = "map"
+    AGGREGATE = "aggregate"
+    ROUTE = "route"
+
+
 class Pipeline(Base):
     __tablename__ = "pipelines"
 
@@ -44,12 +53,17 @@ class PipelineStep(Base):
         ForeignKey("pipelines.id", ondelete="CASCADE"), nullable=False
     )
     step_order: Mapped[int] = mapped_column(nullable=False)
-    template_id: Mapped[int] = mapped_column(
-        ForeignKey("templates.id"), nullable=False
+    step_type: Mapped[str] = mapped_column(
+        String(20), nullable=False, default=StepType.PROMPT.value, server_default=StepType.PROMPT.value
+    )
+    template_id: Mapped[int | None] = mapped_column(
+        ForeignKey("templates.id"), nullable=True
     )
-    provider: Mapped[str] = mapped_column(String(50), nullable=False)
-    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    provider: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    model: Mapped[str | None] = mapped_column(String(100), nullable=True)
     output_variable: Mapped[str] = mapped_column(String(100), nullable=False)
+    fallbacks: Mapped[str] = mapped_column(Text, nullable=False, default="[]", server_default="[]")
+    options: Mapped[str] = mapped_column(Text, nullable=False, default="{}", server_default="{}")
 
     pipeline: Mapped["Pipeline"] = relationship(back_populates="steps")
     template: Mapped["Template"] = relationship()
@@ -66,8 +80,19 @@ class PipelineExecution(Base):
     pipeline_id: Mapped[int] = mapped_column(
         ForeignKey("pipelines.id", ondelete="CASCADE"), nullable=False
     )
+    batch_id: Mapped[int | None] = mapped_column(
+        ForeignKey("execution_batches.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    resumed_from_id: Mapped[int | None] = mapped_column(
+        ForeignKey("pipeline_executions.id", ondelete="SET NULL"), nullable=True
+    )
     status: Mapped[ExecutionStatus] = mapped_column(default=ExecutionStatus.PENDING)
     variables: Mapped[str] = mapped_column(Text, nullable=False)
+    estimated_cost: Mapped[float | None] = mapped_column(nullable=True)
+    # Run options (cache, coalesce, memoize, max_parallel_steps) for the worker to apply
+    options: Mapped[str] = mapped_column(Text, nullable=False, default="{}", server_default="{}")
+    # Renewed by the worker while it runs the row; a stale lease means the worker died
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -96,9 +121,23 @@ class PipelineStepExecution(Base):
     )
     step_order: Mapped[int] = mapped_column(nullable=False)
     input_prompt: Mapped[str] = mapped_column(Text, nullable=False)
+    provider: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    model: Mapped[str | None] = mapped_column(String(100), nullable=True)
     output: Mapped[str | None] = mapped_column(Text, nullable=True)
     status: Mapped[ExecutionStatus] = mapped_column(default=ExecutionStatus.PENDING)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+    coalesced: Mapped[bool] = mapped_column(nullable=False, default=False, server_default=false())
+    hedged: Mapped[bool] = mapped_column(nullable=False, default=False, server_default=false())
+    input_tokens: Mapped[int | None] = mapped_column(nullable=True)
+    output_tokens: Mapped[int | None] = mapped_column(nullable=True)
+    cache_read_tokens: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+    cache_write_tokens: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+    queue_wait_ms: Mapped[int | None] = mapped_column(nullable=True)
+    provider_latency_ms: Mapped[int | None] = mapped_column(nullable=True)
+    first_token_ms: Mapped[int | None] = mapped_column(nullable=True)
+    fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    memoized: Mapped[bool] = mapped_column(nullable=False, default=False, server_default=false())
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -0,0 +1,65 @@
+import json
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+
+class BatchCreateRequest(BaseModel):
+    template_id: int | None = None
+    pipeline_id: int | None = None
+    provider: str | None = Field(default=None, pattern=r"^(anthropic|openai)$")
+    model: str | None = None
+    variable_sets: list[dict[str, str]] = Field(min_length=1, max_length=10000)
+    concurrency: int | None = Field(default=None, ge=1, le=64)
+    cache: str = Field(default="bypass", pattern=r"^(bypass|read|write)$")
+    coalesce: bool = False
+    max_cost_usd: float | None = Field(default=None, gt=0)
+    mode: str = Field(default="interactive", pattern=r"^(interactive|offline)$")
+
+    @model_validator(mode="after")
+    def check_target(self) -> "BatchCreateRequest":
+        if (self.template_id is None) == (self.pipeline_id is None):
+            raise ValueError("Exactly one of template_id or pipeline_id is required")
+        if self.template_id is not None and (not self.provider or not self.model):
+            raise ValueError("provider and model are required for template batches")
+        if self.mode == "offline" and self.template_id is None:
+            raise ValueError("Offline mode is only available for template batches")
+        return self
+
+
+class BatchSchema(BaseModel):
+    id: int
+    template_id: int | None
+    pipeline_id: int | None
+    provider: str | None
+    model: str | None
+    mode: str
+    concurrency: int
+    total: int
+    pending: int
+    running: int
+    completed: int
+    failed: int
+    status: str
+    created_at: datetime
+
+
+class BatchResultSchema(BaseModel):
+    id: int
+    variables: dict[str, str]
+    status: str
+    output: str | None
+    error: str | None
+
+    @field_validator("variables", mode="before")
+    @classmethod
+    def parse_variables_json(cls, v: Any) -> dict[str, str]:
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
+
+
+class BatchResultListResponse(BaseModel):
+    results: list[BatchResultSchema]
+    total: int
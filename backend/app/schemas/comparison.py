@@ -0,0 +1,37 @@
+import json
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.schemas.execution import ExecutionSchema
+
+
+class ComparisonTarget(BaseModel):
+    provider: str = Field(pattern=r"^(anthropic|openai)$")
+    model: str
+
+
+class ComparisonCreateRequest(BaseModel):
+    template_id: int
+    variables: dict[str, str]
+    targets: list[ComparisonTarget] = Field(min_length=1, max_length=10)
+    cache: str = Field(default="bypass", pattern=r"^(bypass|read|write)$")
+    coalesce: bool = False
+    max_cost_usd: float | None = Field(default=None, gt=0)
+
+
+class ComparisonSchema(BaseModel):
+    id: int
+    template_id: int
+    template_name: str
+    variables: dict[str, str]
+    executions: list[ExecutionSchema]
+    created_at: datetime
+
+    @field_validator("variables", mode="before")
+    @classmethod
+    def parse_variables_json(cls, v: Any) -> dict[str, str]:
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+
+from app.engine.cost_estimate import StepEstimate, total_cost
+
+
+class CallEstimateSchema(BaseModel):
+    step_order: int | None
+    provider: str
+    model: str
+    input_tokens: int
+    max_output_tokens: int
+    cost_usd: float | None
+    context_window: int
+    fits_context: bool
+
+
+class CostEstimateResponse(BaseModel):
+    calls: list[CallEstimateSchema]
+    input_tokens: int
+    max_output_tokens: int
+    cost_usd: float | None
+
+    @classmethod
+    def from_estimates(cls, estimates: list[StepEstimate]) -> "CostEstimateResponse":
+        return cls(
+            calls=[
+                CallEstimateSchema(
+                    step_order=e.step_order,
+                    provider=e.provider,
+                    model=e.model,
+                    input_tokens=e.call.input_tokens,
+                    max_output_tokens=e.call.max_output_tokens,
+                    cost_usd=e.call.cost,
+                    context_window=e.call.context_window,
+                    fits_context=e.call.fits_context,
+                )
+                for e in estimates
+            ],
+            input_tokens=sum(e.call.input_tokens for e in estimates),
+            max_output_tokens=sum(e.call.max_output_tokens for e in estimates),
+            cost_usd=total_cost(estimates),
+        )
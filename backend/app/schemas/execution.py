@@ -10,6 +10,9 @@ class ExecutionCreateRequest(BaseModel):
     provider: str = Field(pattern=r"^(anthropic|openai)$")
     model: str
     variables: dict[str, str]
+    cache: str = Field(default="bypass", pattern=r"^(bypass|read|write)$")
+    coalesce: bool = False
+    max_cost_usd: float | None = Field(default=None, gt=0)
 
 
 class ExecutionSchema(BaseModel):
@@ -23,6 +26,17 @@ class ExecutionSchema(BaseModel):
     status: str
     output: str | None
     error: str | None
+    estimated_cost: float | None
+    attempts: int
+    coalesced: bool
+    hedged: bool
+    input_tokens: int | None
+    output_tokens: int | None
+    cache_read_tokens: int
+    cache_write_tokens: int
+    queue_wait_ms: int | None
+    provider_latency_ms: int | None
+    first_token_ms: int | None
     created_at: datetime
     completed_at: datetime | None
 
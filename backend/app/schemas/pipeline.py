@@ -1,15 +1,73 @@
 import json
+import re
 from datetime import datetime
 from typing import Any
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
-class PipelineStepCreateRequest(BaseModel):
-    template_id: int
+class StepTarget(BaseModel):
     provider: str = Field(pattern=r"^(anthropic|openai)$")
     model: str
+
+
+class RouteRule(BaseModel):
+    branch: str = Field(min_length=1, max_length=100)
+    match: str = Field(default="equals", pattern=r"^(equals|contains|regex)$")
+    value: str
+
+    @model_validator(mode="after")
+    def check_pattern(self) -> "RouteRule":
+        if self.match == "regex":
+            try:
+                re.compile(self.value)
+            except re.error as e:
+                raise ValueError(f"Invalid route pattern: {e}") from e
+        return self
+
+
+class StepOptions(BaseModel):
+    input_variable: str | None = Field(default=None, min_length=1, max_length=100)
+    split_by: str = Field(default="paragraphs", pattern=r"^(tokens|paragraphs|lines|json)$")
+    chunk_size: int = Field(default=1000, ge=1)
+    item_variable: str = Field(default="item", min_length=1, max_length=100)
+    max_concurrency: int | None = Field(default=None, ge=1, le=64)
+    aggregate: str = Field(default="concat", pattern=r"^(concat|tree)$")
+    separator: str = "\n\n"
+    fan_in: int = Field(default=4, ge=2, le=64)
+    routes: list[RouteRule] = Field(default_factory=list, max_length=50)
+    default_branch: str | None = Field(default=None, min_length=1, max_length=100)
+    router: str | None = Field(default=None, min_length=1, max_length=100)
+    branch: str | None = Field(default=None, min_length=1, max_length=100)
+
+
+class PipelineStepCreateRequest(BaseModel):
+    step_type: str = Field(default="prompt", pattern=r"^(prompt|split|map|aggregate|route)$")
+    template_id: int | None = None
+    provider: str | None = Field(default=None, pattern=r"^(anthropic|openai)$")
+    model: str | None = None
     output_variable: str = Field(min_length=1, max_length=100)
+    fallbacks: list[StepTarget] = Field(default_factory=list, max_length=5)
+    options: StepOptions = Field(default_factory=StepOptions)
+
+    @model_validator(mode="after")
+    def check_step_type(self) -> "PipelineStepCreateRequest":
+        if self.step_type != "prompt" and not self.options.input_variable:
+            raise ValueError(f"{self.step_type} steps require options.input_variable")
+        if self.calls_model() and (self.template_id is None or not self.provider or not self.model):
+            raise ValueError(f"template_id, provider and model are required for {self.step_type} steps")
+        if self.step_type == "route" and self.template_id is None and not self.options.routes:
+            raise ValueError("route steps require a classification template or options.routes")
+        if (self.options.router is None) != (self.options.branch is None):
+            raise ValueError("options.router and options.branch must be set together")
+        return self
+
+    def calls_model(self) -> bool:
+        if self.step_type == "aggregate":
+            return self.options.aggregate == "tree"
+        if self.step_type == "route":
+            return self.template_id is not None
+        return self.step_type != "split"
 
 
 class PipelineCreateRequest(BaseModel):
@@ -27,11 +85,28 @@ class PipelineUpdateRequest(BaseModel):
 class PipelineStepSchema(BaseModel):
     id: int
     step_order: int
-    template_id: int
-    template_name: str
-    provider: str
-    model: str
+    step_type: str
+    template_id: int | None
+    template_name: str | None
+    provider: str | None
+    model: str | None
     output_variable: str
+    fallbacks: list[StepTarget]
+    options: StepOptions
+
+    @field_validator("fallbacks", mode="before")
+    @classmethod
+    def parse_fallbacks_json(cls, v: Any) -> list:
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
+
+    @field_validator("options", mode="before")
+    @classmethod
+    def parse_options_json(cls, v: Any) -> dict:
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
 
 
 class PipelineSchema(BaseModel):
@@ -50,15 +125,44 @@ class PipelineListResponse(BaseModel):
 
 class PipelineExecuteRequest(BaseModel):
     variables: dict[str, str]
+    max_parallel_steps: int | None = Field(default=None, ge=1, le=32)
+    cache: str = Field(default="bypass", pattern=r"^(bypass|read|write)$")
+    coalesce: bool = False
+    force: bool = False
+    max_cost_usd: float | None = Field(default=None, gt=0)
+
+
+class PipelineEstimateRequest(BaseModel):
+    variables: dict[str, str]
+
+
+class PipelineResumeRequest(BaseModel):
+    max_parallel_steps: int | None = Field(default=None, ge=1, le=32)
+    cache: str = Field(default="bypass", pattern=r"^(bypass|read|write)$")
+    coalesce: bool = False
+    max_cost_usd: float | None = Field(default=None, gt=0)
 
 
 class PipelineStepExecutionSchema(BaseModel):
     id: int
     step_order: int
     input_prompt: str
+    provider: str | None
+    model: str | None
     output: str | None
     status: str
     error: str | None
+    attempts: int
+    coalesced: bool
+    hedged: bool
+    memoized: bool
+    input_tokens: int | None
+    output_tokens: int | None
+    cache_read_tokens: int
+    cache_write_tokens: int
+    queue_wait_ms: int | None
+    provider_latency_ms: int | None
+    first_token_ms: int | None
 
     model_config = {"from_attributes": True}
 
@@ -68,7 +172,9 @@ class PipelineExecutionSchema(BaseModel):
     pipeline_id: int
     pipeline_name: str
     status: str
+    resumed_from_id: int | None
     variables: dict[str, str]
+    estimated_cost: float | None
     step_executions: list[PipelineStepExecutionSchema]
     created_at: datetime
     completed_at: datetime | None
@@ -0,0 +1,194 @@
+import json
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session, selectinload
+
+from app.engine.cost_estimate import estimate_plan, estimate_template, total_cost
+from app.engine.execution_plan import compile_execution_plan
+from app.engine.variable_substitution import compile_template_version
+from app.models.batch import ExecutionBatch
+from app.models.execution import Execution, ExecutionStatus
+from app.models.pipeline import PipelineExecution
+from app.schemas.batch import BatchCreateRequest, BatchResultSchema, BatchSchema
+from app.services.budget_service import BudgetService
+from app.services.pipeline_service import PipelineService
+from app.services.template_service import TemplateService
+
+
+class BatchService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_batch(
+        self, request: BatchCreateRequest, user_id: int, status: ExecutionStatus, concurrency: int
+    ) -> ExecutionBatch:
+        batch = ExecutionBatch(
+            user_id=user_id,
+            template_id=request.template_id,
+            pipeline_id=request.pipeline_id,
+            provider=request.provider,
+            model=request.model,
+            mode=request.mode,
+            concurrency=concurrency,
+            total=len(request.variable_sets),
+        )
+        # Queued rows are run by the worker, which reads the options back from the row
+        options = json.dumps({"cache": request.cache, "coalesce": request.coalesce})
+
+        if request.template_id is not None:
+            template = TemplateService(self.db).get_template(request.template_id, user_id)
+            if not template:
+                raise ValueError("Template not found")
+            version = template.latest_version
+            compiled = compile_template_version(version.id, version.content)
+            costs = [
+                estimate_template(compiled, request.provider, request.model, variables).cost
+                for variables in request.variable_sets
+            ]
+            self._check_budget(user_id, costs, request.max_cost_usd)
+            self.db.add(batch)
+            self.db.flush()
+            self._insert_executions(batch, version.id, request.variable_sets, costs, status, options)
+        else:
+            pipeline = PipelineService(self.db).get_pipeline(request.pipeline_id, user_id)
+            if not pipeline:
+                raise ValueError("Pipeline not found")
+            plan = compile_execution_plan(self.db, pipeline, user_id)
+            costs = [total_cost(estimate_plan(plan, variables)) for variables in request.variable_sets]
+            self._check_budget(user_id, costs, request.max_cost_usd)
+            self.db.add(batch)
+            self.db.flush()
+            self._insert_pipeline_executions(batch, request.variable_sets, costs, status, options)
+
+        self.db.commit()
+        self.db.refresh(batch)
+        return batch
+
+    def get_batch(self, batch_id: int, user_id: int) -> ExecutionBatch | None:
+        return (
+            self.db.query(ExecutionBatch)
+            .filter(ExecutionBatch.id == batch_id, ExecutionBatch.user_id == user_id)
+            .first()
+        )
+
+    def to_schema(self, batch: ExecutionBatch) -> BatchSchema:
+        record = self._record_model(batch)
+        counts = dict(
+            self.db.query(record.status, func.count(record.id))
+            .filter(record.batch_id == batch.id)
+            .group_by(record.status)
+            .all()
+        )
+        pending = counts.get(ExecutionStatus.PENDING, 0)
+        running = counts.get(ExecutionStatus.RUNNING, 0)
+        completed = counts.get(ExecutionStatus.COMPLETED, 0)
+        failed = counts.get(ExecutionStatus.FAILED, 0)
+
+        if pending + running == 0:
+            status = ExecutionStatus.COMPLETED
+        elif running + completed + failed > 0:
+            status = ExecutionStatus.RUNNING
+        else:
+            status = ExecutionStatus.PENDING
+
+        return BatchSchema(
+            id=batch.id,
+            template_id=batch.template_id,
+            pipeline_id=batch.pipeline_id,
+            provider=batch.provider,
+            model=batch.model,
+            mode=batch.mode,
+            concurrency=batch.concurrency,
+            total=batch.total,
+            pending=pending,
+            running=running,
+            completed=completed,
+            failed=failed,
+            status=status.value,
+            created_at=batch.created_at,
+        )
+
+    def list_results(self, batch: ExecutionBatch, skip: int = 0, limit: int = 100) -> tuple[list[BatchResultSchema], int]:
+        record = self._record_model(batch)
+        total = (
+            self.db.query(func.count(record.id))
+            .filter(record.batch_id == batch.id)
+            .scalar()
+        )
+
+        query = self.db.query(record).filter(record.batch_id == batch.id).order_by(record.id)
+        if record is PipelineExecution:
+            query = query.options(selectinload(PipelineExecution.step_executions))
+        records = query.offset(skip).limit(limit).all()
+
+        if record is Execution:
+            return [BatchResultSchema.model_validate(r, from_attributes=True) for r in records], total
+        return [self._pipeline_result(r) for r in records], total
+
+    def _check_budget(self, user_id: int, costs: list[float | None], max_cost: float | None) -> None:
+        # A row whose model has no known price makes the whole batch unpriced
+        BudgetService(self.db).check(user_id, None if None in costs else sum(costs), max_cost)
+
+    def _record_model(self, batch: ExecutionBatch):
+        return Execution if batch.template_id is not None else PipelineExecution
+
+    def _pipeline_result(self, pipeline_execution: PipelineExecution) -> BatchResultSchema:
+        completed = [s for s in pipeline_execution.step_executions if s.status == ExecutionStatus.COMPLETED]
+        failed = [s for s in pipeline_execution.step_executions if s.status == ExecutionStatus.FAILED]
+        return BatchResultSchema(
+            id=pipeline_execution.id,
+            variables=pipeline_execution.variables,
+            status=pipeline_execution.status.value,
+            output=completed[-1].output if completed else None,
+            error=failed[0].error if failed else None,
+        )
+
+    def _insert_executions(
+        self,
+        batch: ExecutionBatch,
+        template_version_id: int,
+        variable_sets: list[dict[str, str]],
+        costs: list[float | None],
+        status: ExecutionStatus,
+        options: str,
+    ) -> None:
+        self.db.execute(
+            insert(Execution),
+            [
+                {
+                    "batch_id": batch.id,
+                    "template_id": batch.template_id,
+                    "template_version_id": template_version_id,
+                    "provider": batch.provider,
+                    "model": batch.model,
+                    "variables": json.dumps(variables),
+                    "status": status,
+                    "estimated_cost": cost,
+                    "options": options,
+                }
+                for variables, cost in zip(variable_sets, costs)
+            ],
+        )
+
+    def _insert_pipeline_executions(
+        self,
+        batch: ExecutionBatch,
+        variable_sets: list[dict[str, str]],
+        costs: list[float | None],
+        status: ExecutionStatus,
+        options: str,
+    ) -> None:
+        self.db.execute(
+            insert(PipelineExecution),
+            [
+                {
+                    "batch_id": batch.id,
+                    "pipeline_id": batch.pipeline_id,
+                    "variables": json.dumps(variables),
+                    "status": status,
+                    "estimated_cost": cost,
+                    "options": options,
+                }
+                for variables, cost in zip(variable_sets, costs)
+            ],
+        )
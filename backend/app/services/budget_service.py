@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.execution import Execution
+from app.models.pipeline import Pipeline, PipelineExecution
+from app.models.template import Template
+
+
+class BudgetExceededError(ValueError):
+    pass
+
+
+class BudgetService:
+    """Rejects work whose estimated cost would exceed a budget.
+
+    Spend is the sum of the preflight estimates recorded on executions, which
+    assume every call uses its full output budget, so the daily limit errs on
+    the side of stopping early.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def check(self, user_id: int, cost: float | None, max_cost: float | None = None) -> None:
+        if cost is None:
+            # Without a price there is nothing to add to the daily spend, but
+            # an explicit cap can't be honoured
+            if max_cost is not None:
+                raise BudgetExceededError(
+                    f"Cost cannot be estimated for this model, "
+                    f"so the execution budget of ${max_cost:.4f} can't be enforced"
+                )
+            return
+        if max_cost is not None and cost > max_cost:
+            raise BudgetExceededError(f"Estimated cost ${cost:.4f} exceeds the execution budget of ${max_cost:.4f}")
+
+        limit = settings.USER_DAILY_BUDGET_USD
+        if limit > 0:
+            spent = self.spent_since(user_id, datetime.now(timezone.utc) - timedelta(days=1))
+            if spent + cost > limit:
+                raise BudgetExceededError(
+                    f"Estimated cost ${cost:.4f} would exceed the daily budget of ${limit:.2f} "
+                    f"(${spent:.4f} already committed)"
+                )
+
+    def spent_since(self, user_id: int, since: datetime) -> float:
+        executions = (
+            self.db.query(func.coalesce(func.sum(Execution.estimated_cost), 0.0))
+            .join(Template, Execution.template_id == Template.id)
+            .filter(Template.user_id == user_id, Execution.created_at >= since)
+            .scalar()
+        )
+        pipeline_executions = (
+            self.db.query(func.coalesce(func.sum(PipelineExecution.estimated_cost), 0.0))
+            .join(Pipeline, PipelineExecution.pipeline_id == Pipeline.id)
+            .filter(Pipeline.user_id == user_id, PipelineExecution.created_at >= since)
+            .scalar()
+        )
+        return float(executions) + float(pipeline_executions)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
+
+from app.engine.cost_estimate import estimate_template
+from app.engine.response_cache import CACHE_BYPASS
+from app.engine.variable_substitution import compile_template_version
+from app.models.comparison import ExecutionComparison
+from app.models.execution import Execution, ExecutionStatus
+from app.schemas.comparison import ComparisonCreateRequest, ComparisonSchema
+from app.schemas.execution import ExecutionSchema
+from app.services.budget_service import BudgetService
+from app.services.execution_service import ExecutionService
+from app.services.template_service import TemplateService
+
+
+class ComparisonService:
+    def __init__(self, db: Session, events: asyncio.Queue | None = None):
+        self.db = db
+        self.events = events
+
+    def create_comparison(
+        self, request: ComparisonCreateRequest, user_id: int, status: ExecutionStatus
+    ) -> ExecutionComparison:
+        template = TemplateService(self.db).get_template(request.template_id, user_id)
+        if not template:
+            raise ValueError("Template not found")
+        version = template.latest_version
+        compiled = compile_template_version(version.id, version.content)
+        compiled.render(request.variables)
+        costs = [estimate_template(compiled, t.provider, t.model, request.variables).cost for t in request.targets]
+        BudgetService(self.db).check(user_id, None if None in costs else sum(costs), request.max_cost_usd)
+
+        comparison = ExecutionComparison(
+            user_id=user_id,
+            template_id=template.id,
+            variables=json.dumps(request.variables),
+        )
+        self.db.add(comparison)
+        self.db.flush()
+        self.db.execute(
+            insert(Execution),
+            [
+                {
+                    "comparison_id": comparison.id,
+                    "template_id": template.id,
+                    "template_version_id": version.id,
+                    "provider": target.provider,
+                    "model": target.model,
+                    "variables": comparison.variables,
+                    "status": status,
+                    "estimated_cost": cost,
+                    "options": json.dumps({"cache": request.cache, "coalesce": request.coalesce}),
+                }
+                for target, cost in zip(request.targets, costs)
+            ],
+        )
+        self.db.commit()
+        return self.get_comparison(comparison.id, user_id)
+
+    async def run_comparison(
+        self, comparison: ExecutionComparison, cache_mode: str = CACHE_BYPASS, coalesce: bool = False
+    ) -> None:
+        service = ExecutionService(self.db, events=self.events)
+        await asyncio.gather(
+            *(
+                service.run_execution(execution, cache_mode=cache_mode, coalesce=coalesce)
+                for execution in comparison.executions
+            )
+        )
+
+    def get_comparison(self, comparison_id: int, user_id: int) -> ExecutionComparison | None:
+        return (
+            self.db.query(ExecutionComparison)
+            .options(selectinload(ExecutionComparison.executions), selectinload(ExecutionComparison.template))
+            .filter(ExecutionComparison.id == comparison_id, ExecutionComparison.user_id == user_id)
+            .first()
+        )
+
+    def to_schema(self, comparison: ExecutionComparison) -> ComparisonSchema:
+        template_name = comparison.template.name
+        executions = []
+        for execution in comparison.executions:
+            execution.template_name = template_name
+            executions.append(ExecutionSchema.model_validate(execution))
+        return ComparisonSchema(
+            id=comparison.id,
+            template_id=comparison.template_id,
+            template_name=template_name,
+            variables=comparison.variables,
+            executions=executions,
+            created_at=comparison.created_at,
+        )
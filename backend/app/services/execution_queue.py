@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.execution import Execution, ExecutionStatus
+from app.models.pipeline import PipelineExecution, PipelineStepExecution
+
+CLAIM_CANDIDATES = 10
+
+
+class ExecutionQueue:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def claim_next(self) -> Execution | PipelineExecution | None:
+        """Claim the oldest pending row, whether an execution or a pipeline execution.
+
+        Draining one kind before looking at the other would let a steady
+        stream of single executions starve queued pipelines.
+        """
+        oldest = {
+            model: self.db.query(func.min(model.created_at)).filter(model.status == ExecutionStatus.PENDING).scalar()
+            for model in (Execution, PipelineExecution)
+        }
+        for model in sorted((model for model in oldest if oldest[model] is not None), key=oldest.get):
+            record = self._claim(model)
+            if record:
+                return record
+        self.db.rollback()
+        return None
+
+    def claim_next_execution(self) -> Execution | None:
+        return self._claim(Execution)
+
+    def claim_next_pipeline_execution(self) -> PipelineExecution | None:
+        return self._claim(PipelineExecution)
+
+    def renew_leases(self, model, record_ids: set[int]) -> None:
+        if not record_ids:
+            return
+        self.db.query(model).filter(model.id.in_(record_ids), model.status == ExecutionStatus.RUNNING).update(
+            {model.claimed_at: datetime.now(timezone.utc)}, synchronize_session=False
+        )
+        self.db.commit()
+
+    def requeue_stale(self, lease_seconds: float) -> int:
+        """Put claimed rows whose lease has expired back to PENDING.
+
+        Only rows claimed from the queue carry a lease; executions running
+        inline in the API process have no ``claimed_at`` and are left alone.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+        requeued = 0
+        for model in (Execution, PipelineExecution):
+            stale_ids = [
+                record_id
+                for (record_id,) in self.db.query(model.id).filter(
+                    model.status == ExecutionStatus.RUNNING,
+                    model.claimed_at.is_not(None),
+                    model.claimed_at < cutoff,
+                )
+            ]
+            if not stale_ids:
+                continue
+            if model is PipelineExecution:
+                # Completed steps are carried over when the execution runs again;
+                # the rest would otherwise be recorded a second time
+                self.db.query(PipelineStepExecution).filter(
+                    PipelineStepExecution.pipeline_execution_id.in_(stale_ids),
+                    PipelineStepExecution.status != ExecutionStatus.COMPLETED,
+                ).delete(synchronize_session=False)
+            requeued += (
+                self.db.query(model)
+                .filter(model.id.in_(stale_ids), model.status == ExecutionStatus.RUNNING)
+                .update({model.status: ExecutionStatus.PENDING, model.claimed_at: None}, synchronize_session=False)
+            )
+        self.db.commit()
+        return requeued
+
+    def _claim(self, model):
+        if self.db.get_bind().dialect.name == "postgresql":
+            return self._claim_with_skip_locked(model)
+        return self._claim_with_compare_and_set(model)
+
+    def _claim_with_skip_locked(self, model):
+        record = (
+            self.db.query(model)
+            .filter(model.status == ExecutionStatus.PENDING)
+            .order_by(model.created_at, model.id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if not record:
+            self.db.rollback()
+            return None
+
+        record.status = ExecutionStatus.RUNNING
+        record.claimed_at = datetime.now(timezone.utc)
+        self.db.commit()
+        return record
+
+    def _claim_with_compare_and_set(self, model):
+        candidate_ids = (
+            self.db.query(model.id)
+            .filter(model.status == ExecutionStatus.PENDING)
+            .order_by(model.created_at, model.id)
+            .limit(CLAIM_CANDIDATES)
+            .all()
+        )
+
+        for (record_id,) in candidate_ids:
+            claimed = (
+                self.db.query(model)
+                .filter(model.id == record_id, model.status == ExecutionStatus.PENDING)
+                .update(
+                    {model.status: ExecutionStatus.RUNNING, model.claimed_at: datetime.now(timezone.utc)},
+                    synchronize_session=False,
+                )
+            )
+            self.db.commit()
+            if claimed:
+                record = self.db.get(model, record_id)
+                # Don't keep the connection checked out until the job first commits
+                self.db.commit()
+                return record
+
+        self.db.rollback()
+        return None
@@ -1,55 +1,86 @@
+import asyncio
 import json
 from datetime import datetime, timezone
 
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
-from app.engine.providers import get_provider
-from app.engine.variable_substitution import substitute_variables
+from app.core.metrics import executions_in_flight
+from app.engine.checkpoint import OutputCheckpoint
+from app.engine.cost_estimate import StepEstimate, estimate_template
+from app.engine.providers import get_provider, provider_generation_params
+from app.engine.providers.base import LLMProvider
+from app.engine.providers.call_stats import track_call
+from app.engine.response_cache import CACHE_BYPASS
+from app.engine.token_estimator import check_context_window
+from app.engine.variable_substitution import compile_template_version
 from app.models.execution import Execution, ExecutionStatus
-from app.models.template import Template
+from app.models.template import Template, TemplateVersion
 from app.schemas.execution import ExecutionCreateRequest
+from app.services.budget_service import BudgetService
 from app.services.template_service import TemplateService
 
 
 class ExecutionService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, events: asyncio.Queue | None = None):
         self.db = db
+        self.events = events
 
-    def execute_template(self, request: ExecutionCreateRequest, user_id: int) -> Execution:
-        template = TemplateService(self.db).get_template(request.template_id, user_id)
-        if not template:
-            raise ValueError("Template not found")
+    async def execute_template(self, request: ExecutionCreateRequest, user_id: int) -> Execution:
+        execution = self._commit_new_execution(request, user_id, ExecutionStatus.RUNNING)
+        await self.run_execution(execution, cache_mode=request.cache, coalesce=request.coalesce)
+        return execution
 
-        latest_version = template.latest_version
+    def start_execution(self, request: ExecutionCreateRequest, user_id: int) -> Execution:
+        return self._commit_new_execution(request, user_id, ExecutionStatus.RUNNING)
 
-        execution = Execution(
-            template_id=template.id,
-            template_version_id=latest_version.id,
-            provider=request.provider,
-            model=request.model,
-            variables=json.dumps(request.variables),
-            status=ExecutionStatus.RUNNING,
+    def enqueue_template(self, request: ExecutionCreateRequest, user_id: int) -> Execution:
+        return self._commit_new_execution(request, user_id, ExecutionStatus.PENDING)
+
+    async def run_claimed(self, execution: Execution) -> None:
+        options = json.loads(execution.options)
+        await self.run_execution(
+            execution, cache_mode=options.get("cache", CACHE_BYPASS), coalesce=options.get("coalesce", False)
         )
-        self.db.add(execution)
-        self.db.flush()
 
-        try:
-            resolved_prompt = substitute_variables(latest_version.content, request.variables)
-            provider = get_provider(request.provider)
-            output = provider.execute(resolved_prompt, request.model)
-            execution.output = output
-            execution.status = ExecutionStatus.COMPLETED
-            execution.completed_at = datetime.now(timezone.utc)
-        except Exception as e:
-            execution.error = str(e)
-            execution.status = ExecutionStatus.FAILED
-            execution.completed_at = datetime.now(timezone.utc)
+    async def run_execution(
+        self, execution: Execution, cache_mode: str = CACHE_BYPASS, coalesce: bool = False
+    ) -> None:
+        with executions_in_flight.track_in_progress(kind="template"):
+            version = self.db.get(TemplateVersion, execution.template_version_id)
+            try:
+                template = compile_template_version(version.id, version.content)
+                resolved_prompt = template.render(json.loads(execution.variables))
+                check_context_window(
+                    execution.provider, execution.model, resolved_prompt, provider_generation_params(execution.provider)
+                )
+                provider = get_provider(execution.provider, cache_mode=cache_mode, coalesce=coalesce)
+                # Don't hold a pooled connection or an open transaction across the provider call
+                self.db.commit()
+                with track_call() as call:
+                    try:
+                        output = await self._generate(provider, execution, resolved_prompt)
+                    finally:
+                        for column, value in call.columns().items():
+                            setattr(execution, column, value)
+                execution.output = output
+                execution.status = ExecutionStatus.COMPLETED
+                execution.completed_at = datetime.now(timezone.utc)
+            except Exception as e:
+                execution.error = str(e)
+                execution.status = ExecutionStatus.FAILED
+                execution.completed_at = datetime.now(timezone.utc)
 
         self.db.commit()
-        self.db.refresh(execution)
-        execution.template_name = template.name
-        return execution
+        # Reload the stored timestamp lazily rather than refreshing now, which
+        # would hold a connection while sibling runs on this session await providers
+        self.db.expire(execution, ["completed_at"])
+
+    def estimate(self, request: ExecutionCreateRequest, user_id: int) -> list[StepEstimate]:
+        template = TemplateService(self.db).get_template(request.template_id, user_id)
+        if not template:
+            raise ValueError("Template not found")
+        return [self._estimate(template.latest_version, request)]
 
     def list_executions(self, user_id: int, skip: int = 0, limit: int = 50) -> tuple[list[Execution], int]:
         total = (
@@ -88,3 +119,55 @@ class ExecutionService:
             execution.template_name = execution.template.name
 
         return execution
+
+    def _create_execution(
+        self, request: ExecutionCreateRequest, user_id: int, status: ExecutionStatus
+    ) -> tuple[Template, Execution]:
+        template = TemplateService(self.db).get_template(request.template_id, user_id)
+        if not template:
+            raise ValueError("Template not found")
+
+        estimate = self._estimate(template.latest_version, request)
+        BudgetService(self.db).check(user_id, estimate.call.cost, request.max_cost_usd)
+
+        execution = Execution(
+            template_id=template.id,
+            template_version_id=template.latest_version.id,
+            provider=request.provider,
+            model=request.model,
+            variables=json.dumps(request.variables),
+            status=status,
+            estimated_cost=estimate.call.cost,
+            options=json.dumps({"cache": request.cache, "coalesce": request.coalesce}),
+        )
+        self.db.add(execution)
+        self.db.flush()
+        return template, execution
+
+    def _commit_new_execution(
+        self, request: ExecutionCreateRequest, user_id: int, status: ExecutionStatus
+    ) -> Execution:
+        template, execution = self._create_execution(request, user_id, status)
+        self.db.commit()
+        self.db.refresh(execution)
+        execution.template_name = template.name
+        return execution
+
+    def _estimate(self, version: TemplateVersion, request: ExecutionCreateRequest) -> StepEstimate:
+        template = compile_template_version(version.id, version.content)
+        call = estimate_template(template, request.provider, request.model, request.variables)
+        return StepEstimate(None, request.provider, request.model, call)
+
+    async def _generate(self, provider: LLMProvider, execution: Execution, prompt: str) -> str:
+        if self.events is None:
+            return await provider.execute(prompt, execution.model)
+
+        checkpoint = OutputCheckpoint()
+        chunks: list[str] = []
+        async for text in provider.stream(prompt, execution.model):
+            chunks.append(text)
+            self.events.put_nowait(("token", {"execution_id": execution.id, "text": text}))
+            if checkpoint.is_due():
+                execution.output = "".join(chunks)
+                self.db.commit()
+        return "".join(chunks)
@@ -1,3 +1,5 @@
+import json
+
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
@@ -44,15 +46,7 @@ class PipelineService:
         self.db.flush()
 
         for order, step_req in enumerate(request.steps, start=1):
-            step = PipelineStep(
-                pipeline_id=pipeline.id,
-                step_order=order,
-                template_id=step_req.template_id,
-                provider=step_req.provider,
-                model=step_req.model,
-                output_variable=step_req.output_variable,
-            )
-            self.db.add(step)
+            self.db.add(self._build_step(pipeline.id, order, step_req))
 
         self.db.commit()
         return self.get_pipeline(pipeline.id, user_id)
@@ -88,7 +82,7 @@ class PipelineService:
         return True
 
     def _validate_template_ids(self, steps) -> None:
-        template_ids = {s.template_id for s in steps}
+        template_ids = {s.template_id for s in steps if s.template_id is not None}
         existing_count = (
             self.db.query(func.count(Template.id))
             .filter(Template.id.in_(template_ids))
@@ -103,12 +97,17 @@ class PipelineService:
         self.db.flush()
 
         for order, step_req in enumerate(step_requests, start=1):
-            step = PipelineStep(
-                pipeline_id=pipeline.id,
-                step_order=order,
-                template_id=step_req.template_id,
-                provider=step_req.provider,
-                model=step_req.model,
-                output_variable=step_req.output_variable,
-            )
-            self.db.add(step)
+            self.db.add(self._build_step(pipeline.id, order, step_req))
+
+    def _build_step(self, pipeline_id: int, order: int, step_req) -> PipelineStep:
+        return PipelineStep(
+            pipeline_id=pipeline_id,
+            step_order=order,
+            step_type=step_req.step_type,
+            template_id=step_req.template_id,
+            provider=step_req.provider,
+            model=step_req.model,
+            output_variable=step_req.output_variable,
+            fallbacks=json.dumps([target.model_dump() for target in step_req.fallbacks]),
+            options=json.dumps(step_req.options.model_dump()),
+        )
@@ -1,4 +1,4 @@
-from sqlalchemy import func
+from sqlalchemy import and_, func
 from sqlalchemy.orm import Session, joinedload
 
 from app.models.template import Template, TemplateVersion
@@ -109,6 +109,32 @@ class TemplateService:
             .all()
         )
 
+    def get_latest_versions(self, template_ids: set[int], user_id: int) -> dict[int, TemplateVersion]:
+        latest_numbers = (
+            self.db.query(
+                TemplateVersion.template_id,
+                func.max(TemplateVersion.version_number).label("version_number"),
+            )
+            .join(Template, TemplateVersion.template_id == Template.id)
+            .filter(Template.id.in_(template_ids), Template.user_id == user_id)
+            .group_by(TemplateVersion.template_id)
+            .subquery()
+        )
+
+        versions = (
+            self.db.query(TemplateVersion)
+            .join(
+                latest_numbers,
+                and_(
+                    TemplateVersion.template_id == latest_numbers.c.template_id,
+                    TemplateVersion.version_number == latest_numbers.c.version_number,
+                ),
+            )
+            .all()
+        )
+
+        return {version.template_id: version for version in versions}
+
     def _find_latest_version(self, versions: list[TemplateVersion]) -> TemplateVersion | None:
         if not versions:
             return None
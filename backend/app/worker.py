@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from collections.abc import Coroutine
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.engine.pipeline_executor import PipelineExecutor
+from app.engine.provider_batches import ProviderBatchCoordinator
+from app.engine.providers import provider_registry
+from app.models.execution import Execution, ExecutionStatus
+from app.models.pipeline import PipelineExecution
+from app.services.execution_queue import ExecutionQueue
+from app.services.execution_service import ExecutionService
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionWorker:
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        concurrency: int = settings.WORKER_CONCURRENCY,
+        poll_interval: float = settings.WORKER_POLL_INTERVAL_SECONDS,
+        provider_batch_interval: float = settings.PROVIDER_BATCH_POLL_INTERVAL_SECONDS,
+        lease_seconds: float = settings.WORKER_LEASE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.provider_batch_interval = provider_batch_interval
+        self.lease_seconds = lease_seconds
+        self._running: dict[type, set[int]] = {Execution: set(), PipelineExecution: set()}
+
+    async def run_forever(self) -> None:
+        tasks: set[asyncio.Task] = set()
+        loop = asyncio.get_running_loop()
+        next_provider_batch_run = loop.time()
+        next_lease_run = loop.time()
+        while True:
+            if loop.time() >= next_provider_batch_run:
+                await self.run_provider_batches_once()
+                next_provider_batch_run = loop.time() + self.provider_batch_interval
+
+            if loop.time() >= next_lease_run:
+                self.maintain_leases_once()
+                # Renew well within the lease so a slow cycle doesn't let it lapse
+                next_lease_run = loop.time() + self.lease_seconds / 3
+
+            if len(tasks) >= self.concurrency:
+                _, tasks = await asyncio.wait(
+                    tasks, timeout=max(next_lease_run - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                continue
+
+            try:
+                job = self._claim_next()
+            except Exception:
+                logger.exception("Claiming the next execution failed")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            tasks.add(asyncio.create_task(job))
+            tasks = {task for task in tasks if not task.done()}
+
+    async def run_once(self) -> bool:
+        job = self._claim_next()
+        if job is None:
+            return False
+        await job
+        return True
+
+    async def run_provider_batches_once(self) -> None:
+        db = self.session_factory()
+        try:
+            coordinator = ProviderBatchCoordinator(db)
+            await coordinator.submit_pending()
+            await coordinator.collect_finished()
+        except Exception:
+            logger.exception("Provider batch cycle crashed")
+        finally:
+            db.close()
+
+    def maintain_leases_once(self) -> None:
+        db = self.session_factory()
+        try:
+            queue = ExecutionQueue(db)
+            for model, record_ids in self._running.items():
+                queue.renew_leases(model, record_ids)
+            requeued = queue.requeue_stale(self.lease_seconds)
+            if requeued:
+                logger.warning("Requeued %d executions whose worker lease expired", requeued)
+        except Exception:
+            logger.exception("Lease maintenance failed")
+        finally:
+            db.close()
+
+    def _claim_next(self) -> Coroutine | None:
+        db = self.session_factory()
+        try:
+            record = ExecutionQueue(db).claim_next()
+            if isinstance(record, Execution):
+                self._running[Execution].add(record.id)
+                return self._run_execution(db, record)
+            if isinstance(record, PipelineExecution):
+                self._running[PipelineExecution].add(record.id)
+                return self._run_pipeline_execution(db, record)
+        except Exception:
+            db.close()
+            raise
+
+        db.close()
+        return None
+
+    async def _run_execution(self, db: Session, execution: Execution) -> None:
+        try:
+            await ExecutionService(db).run_claimed(execution)
+        except Exception:
+            logger.exception("Execution %s crashed", execution.id)
+            self._mark_crashed(db, execution)
+        finally:
+            self._running[Execution].discard(execution.id)
+            db.close()
+
+    async def _run_pipeline_execution(self, db: Session, pipeline_execution: PipelineExecution) -> None:
+        try:
+            await PipelineExecutor.for_claimed(db, pipeline_execution).run_claimed(pipeline_execution)
+        except Exception:
+            logger.exception("Pipeline execution %s crashed", pipeline_execution.id)
+            self._mark_crashed(db, pipeline_execution)
+        finally:
+            self._running[PipelineExecution].discard(pipeline_execution.id)
+            db.close()
+
+    def _mark_crashed(self, db: Session, record: Execution | PipelineExecution) -> None:
+        db.rollback()
+        record.status = ExecutionStatus.FAILED
+        record.completed_at = datetime.now(timezone.utc)
+        db.commit()
+
+
+async def _serve() -> None:
+    # With METRICS_MULTIPROC_DIR shared with the API, its /metrics includes the worker
+    metrics.absorb_exited_processes()
+    flusher = asyncio.create_task(metrics.flush_periodically(settings.METRICS_FLUSH_INTERVAL_SECONDS))
+    try:
+        await ExecutionWorker().run_forever()
+    finally:
+        flusher.cancel()
+        metrics.flush(exiting=True)
+        await provider_registry.aclose()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import json
+import math
+import platform
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+RESULTS_VERSION = 1
+
+# Settings that change what a benchmark measures; results recorded under
+# different values are not comparable
+COMPARABLE_CONFIG = ("sweep", "latency", "error_rate", "output_tokens", "token_interval", "prompt_size", "seed", "stand_in")
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    ops: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p99_ms: float
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(name: str, durations: list[float], wall_seconds: float, errors: int = 0) -> BenchmarkResult:
+    """Reduce per-operation durations (seconds) to throughput and latency percentiles."""
+    return BenchmarkResult(
+        name=name,
+        ops=len(durations),
+        errors=errors,
+        throughput=round(len(durations) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        p50_ms=round(percentile(durations, 0.50) * 1000, 3),
+        p99_ms=round(percentile(durations, 0.99) * 1000, 3),
+    )
+
+
+def best_of(runs: list[BenchmarkResult]) -> BenchmarkResult:
+    """Combine repeats of one benchmark, keeping the best value of each metric.
+
+    As with ``timeit``, slower repeats measure interference from the machine
+    rather than the code, so the best observation is the most stable one.
+    """
+    return BenchmarkResult(
+        name=runs[0].name,
+        ops=runs[0].ops,
+        errors=min(run.errors for run in runs),
+        throughput=max(run.throughput for run in runs),
+        p50_ms=min(run.p50_ms for run in runs),
+        p99_ms=min(run.p99_ms for run in runs),
+    )
+
+
+def write_results(path: Path, results: list[BenchmarkResult], config: dict) -> None:
+    payload = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "config": config,
+        "results": [asdict(result) for result in results],
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def load_results(path: Path) -> dict[str, BenchmarkResult]:
+    payload = json.loads(path.read_text())
+    return {item["name"]: BenchmarkResult(**item) for item in payload["results"]}
+
+
+def load_config(path: Path) -> dict:
+    return json.loads(path.read_text())["config"]
+
+
+def config_mismatches(config: dict, baseline_config: dict) -> list[str]:
+    """Describe every comparable setting that differs from the baseline's."""
+    return [
+        f"{key}: {config.get(key)!r} vs baseline {baseline_config.get(key)!r}"
+        for key in COMPARABLE_CONFIG
+        if config.get(key) != baseline_config.get(key)
+    ]
+
+
+def find_regressions(
+    results: list[BenchmarkResult],
+    baseline: dict[str, BenchmarkResult],
+    tolerance: float,
+    min_delta_ms: float = 1.0,
+) -> list[str]:
+    """Describe every result whose throughput fell or p99 rose beyond ``tolerance``.
+
+    A p99 rise must also exceed ``min_delta_ms``, since sub-millisecond
+    timings swing by more than any sensible tolerance. Results missing from
+    the baseline are new scenarios and never regress.
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        if base.throughput > 0 and result.throughput < base.throughput * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: throughput {result.throughput}/s vs baseline {base.throughput}/s"
+            )
+        if result.p99_ms > base.p99_ms * (1 + tolerance) and result.p99_ms - base.p99_ms > min_delta_ms:
+            regressions.append(f"{result.name}: p99 {result.p99_ms}ms vs baseline {base.p99_ms}ms")
+    return regressions
+
+
+def format_table(results: list[BenchmarkResult]) -> str:
+    header = f"{'benchmark':<48} {'ops':>6} {'err':>4} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9}"
+    rows = [
+        f"{r.name:<48} {r.ops:>6} {r.errors:>4} {r.throughput:>10.2f} {r.p50_ms:>9.3f} {r.p99_ms:>9.3f}"
+        for r in results
+    ]
+    return "\n".join([header, *rows])
@@ -0,0 +1,151 @@
+"""Engine benchmark suite.
+
+    python -m benchmarks.run [--quick] [--baseline benchmarks/baseline.json]
+
+Drives variable substitution, ExecutionService and PipelineExecutor against
+a simulated provider, sweeping concurrency, pipeline length and prompt size.
+With ``--stand-in URL`` the calls go through the real OpenAI client to a
+running ``python -m stand_in`` server instead, which injects the faults.
+Results are written as JSON; with a baseline, the run exits non-zero when any
+benchmark loses throughput or gains p99 latency beyond ``--tolerance``. Each
+sweep has its own baseline, and a baseline recorded with different settings
+is refused rather than compared.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Settings are read at import time, so configure them before importing the app.
+os.environ.setdefault("APP_ENV", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/prompt_lab_bench.db")
+os.environ.setdefault("RESPONSE_CACHE_DIR", tempfile.mkdtemp(prefix="prompt_lab_bench_cache_"))
+# Start the adaptive limiter at its ceiling so runs measure the engine, not its ramp-up.
+os.environ.setdefault("PROVIDER_CONCURRENCY_INITIAL", "64")
+
+from app.engine.providers.simulated_provider import LatencyDistribution, SimulatedProvider  # noqa: E402
+from benchmarks import scenarios  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    BenchmarkResult,
+    best_of,
+    config_mismatches,
+    find_regressions,
+    format_table,
+    load_config,
+    load_results,
+    write_results,
+)
+
+BASELINES = {
+    "full": Path(__file__).parent / "baseline.json",
+    "quick": Path(__file__).parent / "baseline-quick.json",
+}
+
+SWEEPS = {
+    "full": {
+        "prompt_sizes": [1_000, 10_000, 100_000],
+        "substitution_iterations": 2_000,
+        "concurrency": [1, 8, 32],
+        "pipeline_lengths": [1, 4, 8],
+        "operations": 200,
+    },
+    "quick": {
+        "prompt_sizes": [1_000, 10_000],
+        "substitution_iterations": 500,
+        "concurrency": [1, 8],
+        "pipeline_lengths": [1, 4],
+        "operations": 40,
+    },
+}
+
+
+async def run_suite(sweep: dict, prompt_size: int, repeats: int) -> list[BenchmarkResult]:
+    runs: dict[str, list[BenchmarkResult]] = {}
+
+    def collect(*results: BenchmarkResult) -> None:
+        for result in results:
+            runs.setdefault(result.name, []).append(result)
+
+    for _ in range(repeats):
+        for size in sweep["prompt_sizes"]:
+            collect(*scenarios.bench_substitution(size, sweep["substitution_iterations"]))
+        for concurrency in sweep["concurrency"]:
+            collect(await scenarios.bench_executions(concurrency, sweep["operations"], prompt_size))
+        for length in sweep["pipeline_lengths"]:
+            for concurrency in sweep["concurrency"]:
+                collect(await scenarios.bench_pipelines(length, concurrency, sweep["operations"] // length))
+    return [best_of(results) for results in runs.values()]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="smaller sweep for CI")
+    parser.add_argument("--stand-in", metavar="URL", help="call a provider stand-in through the real client")
+    parser.add_argument("--latency", default="lognormal:0.02:0.5", help="fixed:S, uniform:S:SPREAD or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output-tokens", type=int, default=50)
+    parser.add_argument("--token-interval", type=float, default=0.0, help="seconds between streamed tokens")
+    parser.add_argument("--prompt-size", type=int, default=2_000, help="template size for execution benchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3, help="runs per benchmark; the best is kept")
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--baseline", type=Path, help="defaults to the sweep's baseline in benchmarks/")
+    parser.add_argument("--update-baseline", action="store_true", help="write results to the baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.35, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p99 rises smaller than this")
+    args = parser.parse_args(argv)
+
+    sweep_name = "quick" if args.quick else "full"
+    baseline = args.baseline or BASELINES[sweep_name]
+    config = {
+        "sweep": sweep_name,
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "output_tokens": args.output_tokens,
+        "token_interval": args.token_interval,
+        "prompt_size": args.prompt_size,
+        "seed": args.seed,
+        "repeats": args.repeats,
+        "stand_in": args.stand_in,
+    }
+    if args.stand_in:
+        scenarios.install_stand_in(args.stand_in)
+    else:
+        scenarios.install_provider(
+            SimulatedProvider(
+                LatencyDistribution.parse(args.latency),
+                error_rate=args.error_rate,
+                output_tokens=args.output_tokens,
+                token_interval=args.token_interval,
+                seed=args.seed,
+            )
+        )
+    results = asyncio.run(run_suite(SWEEPS[sweep_name], args.prompt_size, args.repeats))
+    print(format_table(results))
+
+    write_results(args.output, results, config)
+    if args.update_baseline:
+        write_results(baseline, results, config)
+        print(f"Baseline written to {baseline}")
+        return 0
+    if not baseline.exists():
+        print(f"No baseline at {baseline}; skipping comparison")
+        return 0
+
+    mismatches = config_mismatches(config, load_config(baseline))
+    if mismatches:
+        print(f"Baseline {baseline} was recorded with different settings; not comparing:", file=sys.stderr)
+        for mismatch in mismatches:
+            print(f"  {mismatch}", file=sys.stderr)
+        return 2
+
+    regressions = find_regressions(results, load_results(baseline), args.tolerance, args.min_delta_ms)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.engine.providers as providers
+from app.core.config import settings
+from app.engine.providers.registry import ProviderRegistry
+from app.engine.pipeline_executor import PipelineExecutor
+from app.engine.providers.simulated_provider import SimulatedProvider
+from app.engine.variable_substitution import CompiledTemplate, substitute_variables
+from app.models.base import Base
+from app.models.execution import ExecutionStatus
+from app.models.user import User
+from app.schemas.execution import ExecutionCreateRequest
+from app.schemas.pipeline import PipelineCreateRequest, PipelineStepCreateRequest
+from app.schemas.template import TemplateCreateRequest
+from app.services.execution_service import ExecutionService
+from app.services.pipeline_service import PipelineService
+from app.services.template_service import TemplateService
+from benchmarks.harness import BenchmarkResult, summarize
+
+PROVIDER = "openai"
+MODEL = "gpt-4o-mini"
+SUBSTITUTION_VARIABLES = 10
+
+
+def install_provider(provider: SimulatedProvider) -> None:
+    """Serve every provider name from ``provider``, behind the real wrapper chain."""
+    providers.provider_registry = ProviderRegistry({PROVIDER: lambda: provider})
+
+
+def install_stand_in(url: str) -> None:
+    """Serve calls from the real OpenAI client, pointed at a running stand-in."""
+    settings.OPENAI_BASE_URL = f"{url.rstrip('/')}/v1"
+    settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or "stand-in"
+    providers.provider_registry = ProviderRegistry(providers.PROVIDER_MAP)
+
+
+def _database() -> sessionmaker:
+    """An in-memory database on one shared connection, like the test suite's.
+
+    Each operation still gets its own session, as each API request would.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def _seed(sessions: sessionmaker, contents: list[str]) -> tuple[int, list[int]]:
+    with sessions() as db:
+        user = User(email="bench@example.com", display_name="Bench", hashed_password="-")
+        db.add(user)
+        db.commit()
+        service = TemplateService(db)
+        template_ids = [
+            service.create_template(TemplateCreateRequest(name=f"Bench {i}", content=content), user.id).id
+            for i, content in enumerate(contents)
+        ]
+        return user.id, template_ids
+
+
+def _template_content(size: int) -> str:
+    """A template of roughly ``size`` characters with evenly spread slots."""
+    filler = "lorem ipsum dolor sit amet " * (size // (27 * SUBSTITUTION_VARIABLES) + 1)
+    return "".join(f"{filler[: size // SUBSTITUTION_VARIABLES]}{{{{v{i}}}}}" for i in range(SUBSTITUTION_VARIABLES))
+
+
+def bench_substitution(prompt_size: int, iterations: int) -> list[BenchmarkResult]:
+    content = _template_content(prompt_size)
+    variables = {f"v{i}": f"value {i}" for i in range(SUBSTITUTION_VARIABLES)}
+    compiled = CompiledTemplate(content)
+    results = []
+    for name, render in (
+        ("substitute_variables", lambda: substitute_variables(content, variables)),
+        ("compiled_render", lambda: compiled.render(variables)),
+    ):
+        durations = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            render()
+            durations.append(time.perf_counter() - t0)
+        results.append(summarize(f"{name}[chars={prompt_size}]", durations, time.perf_counter() - started))
+    return results
+
+
+async def _drive(name: str, operation: Callable[[int], Awaitable[object]], total: int, concurrency: int) -> BenchmarkResult:
+    """Run ``operation`` ``total`` times with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    durations: list[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                await operation(i)
+            except Exception:
+                errors += 1
+            durations.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return summarize(name, durations, time.perf_counter() - started, errors)
+
+
+async def bench_executions(concurrency: int, total: int, prompt_size: int) -> BenchmarkResult:
+    sessions = _database()
+    user_id, (template_id,) = _seed(sessions, [_template_content(prompt_size)])
+
+    async def run(i: int) -> None:
+        variables = {f"v{n}": f"run {i}" for n in range(SUBSTITUTION_VARIABLES)}
+        request = ExecutionCreateRequest(template_id=template_id, provider=PROVIDER, model=MODEL, variables=variables)
+        with sessions() as db:
+            execution = await ExecutionService(db).execute_template(request, user_id)
+            if execution.error:
+                raise RuntimeError(execution.error)
+
+    return await _drive(f"execute_template[concurrency={concurrency}]", run, total, concurrency)
+
+
+async def bench_pipelines(length: int, concurrency: int, total: int) -> BenchmarkResult:
+    """A linear chain of ``length`` steps, each consuming the previous output.
+
+    Memoization is off: the simulated provider answers every prompt alike,
+    so later steps would otherwise be served from earlier runs.
+    """
+    sessions = _database()
+    contents = ["Continue: {{input}}"] + [f"Continue: {{{{out{i}}}}}" for i in range(length - 1)]
+    user_id, template_ids = _seed(sessions, contents)
+    steps = [
+        PipelineStepCreateRequest(template_id=template_id, provider=PROVIDER, model=MODEL, output_variable=f"out{i}")
+        for i, template_id in enumerate(template_ids)
+    ]
+    with sessions() as db:
+        pipeline_id = PipelineService(db).create_pipeline(PipelineCreateRequest(name="Bench", steps=steps), user_id).id
+
+    async def run(i: int) -> None:
+        with sessions() as db:
+            execution = await PipelineExecutor(db, memoize=False).execute(pipeline_id, {"input": f"run {i}"}, user_id)
+            if execution.status != ExecutionStatus.COMPLETED:
+                raise RuntimeError(f"Pipeline execution {execution.status}")
+
+    return await _drive(f"pipeline[steps={length},concurrency={concurrency}]", run, total, concurrency)
@@ -0,0 +1,46 @@
+"""Run the provider stand-in.
+
+    python -m stand_in --port 8900 --latency lognormal:0.3:0.6 --rate-limit-rate 0.05
+
+then point the app at it with ``ANTHROPIC_BASE_URL=http://127.0.0.1:8900``
+and ``OPENAI_BASE_URL=http://127.0.0.1:8900/v1``.
+"""
+import argparse
+
+import uvicorn
+
+from app.engine.providers.simulated_provider import LatencyDistribution
+from stand_in.server import Faults, create_app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:S, uniform:S:SPREAD or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of calls answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds sent with each 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--output-tokens", type=int, default=50)
+    parser.add_argument("--token-interval", type=float, default=0.0, help="seconds between streamed tokens")
+    parser.add_argument("--batch-seconds", type=float, default=0.0, help="time until a batch ends")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    faults = Faults(
+        latency=LatencyDistribution.parse(args.latency),
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        output_tokens=args.output_tokens,
+        token_interval=args.token_interval,
+        batch_seconds=args.batch_seconds,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(faults), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""Local stand-in for the Anthropic Messages and OpenAI Chat Completions APIs.
+
+Speaks enough of both wire formats for the real SDK clients: plain and SSE
+responses, Anthropic message batches and OpenAI files/batches. Every model
+call can be delayed, rate limited or failed according to ``Faults``, so the
+real provider stack (connection pooling, error translation, retries, rate
+limiting, circuit breaking) can be load tested offline.
+"""
+import asyncio
+import email.parser
+import email.policy
+import hashlib
+import json
+import random
+import time
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+
+from app.engine.providers.simulated_provider import LatencyDistribution
+from app.engine.token_estimator import estimate_tokens
+
+
+@dataclass
+class Faults:
+    """What the stand-in does to each model call.
+
+    ``rate_limit_rate`` and ``error_rate`` are per-call probabilities of a
+    429 (with ``retry_after`` seconds) and of ``error_status``. Tokens
+    stream ``token_interval`` seconds apart; batches end ``batch_seconds``
+    after they are created.
+    """
+
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    output_tokens: int = 50
+    token_interval: float = 0.0
+    batch_seconds: float = 0.0
+    seed: int = 0
+
+
+class _Fault(Exception):
+    def __init__(self, status: int, headers: dict[str, str] | None = None):
+        self.status = status
+        self.headers = headers or {}
+
+
+class StandIn:
+    def __init__(self, faults: Faults):
+        self.faults = faults
+        self.rng = random.Random(faults.seed)
+        self.calls = 0
+        self.cached_prefixes: set[str] = set()
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+
+    async def begin_call(self) -> None:
+        """Wait out the sampled latency, then maybe fail the call."""
+        self.calls += 1
+        await asyncio.sleep(self.faults.latency.sample(self.rng))
+        roll = self.rng.random()
+        if roll < self.faults.rate_limit_rate:
+            raise _Fault(429, {"retry-after": str(self.faults.retry_after)})
+        if roll < self.faults.rate_limit_rate + self.faults.error_rate:
+            raise _Fault(self.faults.error_status)
+
+    def fails(self) -> bool:
+        return self.rng.random() < self.faults.rate_limit_rate + self.faults.error_rate
+
+    def words(self) -> list[str]:
+        return [f"token{i}" if i == 0 else f" token{i}" for i in range(self.faults.output_tokens)]
+
+    async def paced(self, chunks: list[str]) -> AsyncIterator[str]:
+        for i, chunk in enumerate(chunks):
+            if i and self.faults.token_interval:
+                await asyncio.sleep(self.faults.token_interval)
+            yield chunk
+
+    def cache_usage(self, content) -> tuple[int, int]:
+        """Anthropic-style (read, write) tokens for blocks marked cache_control."""
+        if isinstance(content, str):
+            return 0, 0
+        read = write = 0
+        prefix = ""
+        for block in content:
+            prefix += block.get("text", "")
+            if "cache_control" not in block:
+                continue
+            key = hashlib.sha256(prefix.encode()).hexdigest()
+            if key in self.cached_prefixes:
+                read = estimate_tokens(prefix)
+            else:
+                self.cached_prefixes.add(key)
+                write = estimate_tokens(prefix) - read
+        return read, write
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}{uuid.uuid4().hex[:24]}"
+
+
+def _iso(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+def _sse(event: str | None, data: dict | str) -> str:
+    payload = data if isinstance(data, str) else json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n" if event else f"data: {payload}\n\n"
+
+
+def _prompt_text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content)
+
+
+# --- Anthropic Messages API ---------------------------------------------------
+
+
+def _anthropic_error(status: int, headers: dict[str, str]) -> JSONResponse:
+    kind = {429: "rate_limit_error", 529: "overloaded_error"}.get(status, "api_error")
+    body = {"type": "error", "error": {"type": kind, "message": f"Stand-in injected {status}"}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def _anthropic_message(stand_in: StandIn, params: dict) -> dict:
+    content = params["messages"][-1]["content"]
+    read, write = stand_in.cache_usage(content)
+    return {
+        "id": _new_id("msg_"),
+        "type": "message",
+        "role": "assistant",
+        "model": params["model"],
+        "content": [{"type": "text", "text": "".join(stand_in.words())}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": estimate_tokens(_prompt_text(content)) - read - write,
+            "output_tokens": stand_in.faults.output_tokens,
+            "cache_read_input_tokens": read,
+            "cache_creation_input_tokens": write,
+        },
+    }
+
+
+async def _anthropic_events(stand_in: StandIn, message: dict) -> AsyncIterator[str]:
+    text = message["content"][0]["text"]
+    yield _sse("message_start", {"type": "message_start", "message": {**message, "content": [], "stop_reason": None}})
+    yield _sse("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+    yield _sse("ping", {"type": "ping"})
+    async for chunk in stand_in.paced(stand_in.words() if text else []):
+        yield _sse(
+            "content_block_delta",
+            {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}},
+        )
+    yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+    yield _sse(
+        "message_delta",
+        {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None}, "usage": message["usage"]},
+    )
+    yield _sse("message_stop", {"type": "message_stop"})
+
+
+def _anthropic_batch(batch: dict, base_url: str) -> dict:
+    ended = time.time() >= batch["ends_at"]
+    total = len(batch["results"])
+    succeeded = sum(1 for entry in batch["results"] if entry["result"]["type"] == "succeeded")
+    return {
+        "id": batch["id"],
+        "type": "message_batch",
+        "processing_status": "ended" if ended else "in_progress",
+        "request_counts": {
+            "processing": 0 if ended else total,
+            "succeeded": succeeded if ended else 0,
+            "errored": total - succeeded if ended else 0,
+            "canceled": 0,
+            "expired": 0,
+        },
+        "created_at": batch["created_at"],
+        "expires_at": batch["created_at"],
+        "ended_at": batch["created_at"] if ended else None,
+        "archived_at": None,
+        "cancel_initiated_at": None,
+        "results_url": f"{base_url}v1/messages/batches/{batch['id']}/results" if ended else None,
+    }
+
+
+def anthropic_router(stand_in: StandIn) -> APIRouter:
+    router = APIRouter(prefix="/v1/messages")
+
+    @router.post("")
+    async def create_message(request: Request):
+        params = await request.json()
+        try:
+            await stand_in.begin_call()
+        except _Fault as fault:
+            return _anthropic_error(fault.status, fault.headers)
+        message = _anthropic_message(stand_in, params)
+        if params.get("stream"):
+            return StreamingResponse(_anthropic_events(stand_in, message), media_type="text/event-stream")
+        return message
+
+    @router.post("/batches")
+    async def create_batch(request: Request):
+        body = await request.json()
+        results = []
+        for item in body["requests"]:
+            if stand_in.fails():
+                error = {"type": "error", "error": {"type": "api_error", "message": "Stand-in injected error"}}
+                results.append({"custom_id": item["custom_id"], "result": {"type": "errored", "error": error}})
+            else:
+                message = _anthropic_message(stand_in, item["params"])
+                results.append({"custom_id": item["custom_id"], "result": {"type": "succeeded", "message": message}})
+        now = time.time()
+        batch = {"id": _new_id("msgbatch_"), "created_at": _iso(now), "ends_at": now + stand_in.faults.batch_seconds, "results": results}
+        stand_in.batches[batch["id"]] = batch
+        return _anthropic_batch(batch, str(request.base_url))
+
+    @router.get("/batches/{batch_id}")
+    async def retrieve_batch(batch_id: str, request: Request):
+        batch = stand_in.batches.get(batch_id)
+        if batch is None:
+            return _anthropic_error(404, {})
+        return _anthropic_batch(batch, str(request.base_url))
+
+    @router.get("/batches/{batch_id}/results")
+    async def batch_results(batch_id: str):
+        batch = stand_in.batches.get(batch_id)
+        if batch is None:
+            return _anthropic_error(404, {})
+        lines = "\n".join(json.dumps(entry) for entry in batch["results"])
+        return PlainTextResponse(lines, media_type="application/x-jsonl")
+
+    return router
+
+
+# --- OpenAI Chat Completions, Files and Batches APIs ---------------------------
+
+
+def _openai_error(status: int, headers: dict[str, str]) -> JSONResponse:
+    kind = "rate_limit_exceeded" if status == 429 else "server_error"
+    body = {"error": {"message": f"Stand-in injected {status}", "type": kind, "param": None, "code": kind}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def _openai_usage(stand_in: StandIn, params: dict) -> dict:
+    prompt_tokens = estimate_tokens(_prompt_text(params["messages"][-1]["content"]))
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": stand_in.faults.output_tokens,
+        "total_tokens": prompt_tokens + stand_in.faults.output_tokens,
+        "prompt_tokens_details": {"cached_tokens": 0},
+    }
+
+
+def _openai_completion(stand_in: StandIn, params: dict) -> dict:
+    return {
+        "id": _new_id("chatcmpl-"),
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": params["model"],
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(stand_in.words())},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": _openai_usage(stand_in, params),
+    }
+
+
+async def _openai_chunks(stand_in: StandIn, params: dict) -> AsyncIterator[str]:
+    base = {"id": _new_id("chatcmpl-"), "object": "chat.completion.chunk", "created": int(time.time()), "model": params["model"]}
+    yield _sse(None, {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]})
+    async for chunk in stand_in.paced(stand_in.words()):
+        yield _sse(None, {**base, "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]})
+    yield _sse(None, {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+    if (params.get("stream_options") or {}).get("include_usage"):
+        yield _sse(None, {**base, "choices": [], "usage": _openai_usage(stand_in, params)})
+    yield _sse(None, "[DONE]")
+
+
+def _multipart_file(content_type: str, body: bytes) -> tuple[str, bytes]:
+    """The (filename, content) of the ``file`` field of a multipart upload."""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    for part in message.iter_parts():
+        if part.get_param("name", header="content-disposition") == "file":
+            return part.get_filename() or "upload", part.get_payload(decode=True)
+    raise ValueError("No file in upload")
+
+
+def _openai_file(file_id: str, filename: str, size: int) -> dict:
+    return {
+        "id": file_id,
+        "object": "file",
+        "bytes": size,
+        "created_at": int(time.time()),
+        "filename": filename,
+        "purpose": "batch",
+        "status": "processed",
+    }
+
+
+def _openai_batch(batch: dict) -> dict:
+    ended = time.time() >= batch["ends_at"]
+    return {
+        "id": batch["id"],
+        "object": "batch",
+        "endpoint": batch["endpoint"],
+        "input_file_id": batch["input_file_id"],
+        "completion_window": "24h",
+        "status": "completed" if ended else "in_progress",
+        "created_at": int(batch["created_at"]),
+        "output_file_id": batch["output_file_id"] if ended else None,
+        "error_file_id": batch["error_file_id"] if ended else None,
+        "request_counts": {"total": batch["total"], "completed": batch["completed"] if ended else 0, "failed": batch["failed"] if ended else 0},
+    }
+
+
+def openai_router(stand_in: StandIn) -> APIRouter:
+    router = APIRouter(prefix="/v1")
+
+    @router.post("/chat/completions")
+    async def create_completion(request: Request):
+        params = await request.json()
+        try:
+            await stand_in.begin_call()
+        except _Fault as fault:
+            return _openai_error(fault.status, fault.headers)
+        if params.get("stream"):
+            return StreamingResponse(_openai_chunks(stand_in, params), media_type="text/event-stream")
+        return _openai_completion(stand_in, params)
+
+    @router.post("/files")
+    async def upload_file(request: Request):
+        filename, content = _multipart_file(request.headers["content-type"], await request.body())
+        file_id = _new_id("file-")
+        stand_in.files[file_id] = content
+        return _openai_file(file_id, filename, len(content))
+
+    @router.get("/files/{file_id}/content")
+    async def file_content(file_id: str):
+        if file_id not in stand_in.files:
+            return _openai_error(404, {})
+        return Response(stand_in.files[file_id], media_type="application/octet-stream")
+
+    @router.post("/batches")
+    async def create_batch(request: Request):
+        body = await request.json()
+        output, errors = [], []
+        for line in stand_in.files[body["input_file_id"]].decode().splitlines():
+            item = json.loads(line)
+            if stand_in.fails():
+                error = {"code": "server_error", "message": "Stand-in injected error"}
+                errors.append({"id": _new_id("batch_req_"), "custom_id": item["custom_id"], "response": None, "error": error})
+            else:
+                response = {"status_code": 200, "request_id": _new_id("req_"), "body": _openai_completion(stand_in, item["body"])}
+                output.append({"id": _new_id("batch_req_"), "custom_id": item["custom_id"], "response": response, "error": None})
+
+        def store(lines: list[dict]) -> str | None:
+            if not lines:
+                return None
+            file_id = _new_id("file-")
+            stand_in.files[file_id] = "\n".join(json.dumps(line) for line in lines).encode()
+            return file_id
+
+        now = time.time()
+        batch = {
+            "id": _new_id("batch_"),
+            "endpoint": body["endpoint"],
+            "input_file_id": body["input_file_id"],
+            "created_at": now,
+            "ends_at": now + stand_in.faults.batch_seconds,
+            "output_file_id": store(output),
+            "error_file_id": store(errors),
+            "total": len(output) + len(errors),
+            "completed": len(output),
+            "failed": len(errors),
+        }
+        stand_in.batches[batch["id"]] = batch
+        return _openai_batch(batch)
+
+    @router.get("/batches/{batch_id}")
+    async def retrieve_batch(batch_id: str):
+        batch = stand_in.batches.get(batch_id)
+        if batch is None:
+            return _openai_error(404, {})
+        return _openai_batch(batch)
+
+    return router
+
+
+def create_app(faults: Faults | None = None) -> FastAPI:
+    stand_in = StandIn(faults or Faults())
+    application = FastAPI(title="LLM Provider Stand-in")
+    application.state.stand_in = stand_in
+    application.include_router(anthropic_router(stand_in))
+    application.include_router(openai_router(stand_in))
+    return application
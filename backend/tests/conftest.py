@@ -1,10 +1,10 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.core.database import get_db
+from app.core.database import get_background_db, get_db
 from app.main import app
 from app.models import Base  # noqa: F401 - imports all models via __init__
 
@@ -22,9 +22,27 @@ def db_engine():
     engine.dispose()
 
 
+@pytest.fixture
+def checked_out_connections(db_engine):
+    """Return a callable giving the number of connections currently checked out of the pool."""
+    count = 0
+
+    def checkout(*_):
+        nonlocal count
+        count += 1
+
+    def checkin(*_):
+        nonlocal count
+        count -= 1
+
+    event.listen(db_engine, "checkout", checkout)
+    event.listen(db_engine, "checkin", checkin)
+    return lambda: count
+
+
 @pytest.fixture
 def db_session(db_engine):
-    session_factory = sessionmaker(bind=db_engine)
+    session_factory = sessionmaker(bind=db_engine, expire_on_commit=False)
     session = session_factory()
     try:
         yield session
@@ -38,6 +56,7 @@ def client(db_session):
         yield db_session
 
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_background_db] = lambda: db_session
     yield TestClient(app)
     app.dependency_overrides.clear()
 
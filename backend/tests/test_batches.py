@@ -0,0 +1,214 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from app.core.config import settings
+
+
+def _create_template(client, headers, content="Hello {{name}}"):
+    return client.post(
+        "/api/templates/",
+        json={"name": "Batch Template", "description": None, "content": content},
+        headers=headers,
+    ).json()["id"]
+
+
+def _submit_batch(client, headers, payload):
+    with patch("app.api.batches.spawn") as mock_spawn:
+        response = client.post("/api/batches/", json=payload, headers=headers)
+    spawned = [call.args[0] for call in mock_spawn.call_args_list]
+    # Only the last run is handed back; close the rest so they aren't left unawaited
+    for run in spawned[:-1]:
+        run.close()
+    return response, spawned[-1] if spawned else None
+
+
+@patch("app.engine.batch_runner.get_provider")
+def test_template_batch_runs_every_variable_set(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = lambda prompt, model: f"out:{prompt}"
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers)
+    names = [f"user{i}" for i in range(7)]
+
+    # When
+    response, run = _submit_batch(
+        client,
+        auth_headers,
+        {
+            "template_id": template_id,
+            "provider": "openai",
+            "model": "gpt-4o-mini",
+            "variable_sets": [{"name": n} for n in names],
+            "concurrency": 3,
+        },
+    )
+    asyncio.run(run)
+
+    # Then
+    assert response.status_code == 202
+    assert response.json()["total"] == 7
+    assert response.json()["running"] == 7
+    batch_id = response.json()["id"]
+    batch = client.get(f"/api/batches/{batch_id}", headers=auth_headers).json()
+    assert batch["status"] == "completed"
+    assert batch["completed"] == 7
+    results = client.get(f"/api/batches/{batch_id}/results", headers=auth_headers).json()
+    assert [r["output"] for r in results["results"]] == [f"out:Hello {n}" for n in names]
+
+
+@patch("app.engine.batch_runner.get_provider")
+def test_template_batch_records_row_failures(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "ok"
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers)
+
+    # When
+    response, run = _submit_batch(
+        client,
+        auth_headers,
+        {
+            "template_id": template_id,
+            "provider": "openai",
+            "model": "gpt-4o-mini",
+            "variable_sets": [{"name": "Alice"}, {}],
+        },
+    )
+    asyncio.run(run)
+
+    # Then
+    batch = client.get(f"/api/batches/{response.json()['id']}", headers=auth_headers).json()
+    assert batch["completed"] == 1
+    assert batch["failed"] == 1
+    results = client.get(f"/api/batches/{response.json()['id']}/results", headers=auth_headers).json()
+    assert "Missing variable: name" in results["results"][1]["error"]
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_pipeline_batch(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = lambda prompt, model: prompt.upper()
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers, content="hi {{name}}")
+    pipeline_id = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Batch Pipeline",
+            "steps": [{"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "out"}],
+        },
+        headers=auth_headers,
+    ).json()["id"]
+
+    # When
+    response, run = _submit_batch(
+        client,
+        auth_headers,
+        {"pipeline_id": pipeline_id, "variable_sets": [{"name": "a"}, {"name": "b"}]},
+    )
+    asyncio.run(run)
+
+    # Then
+    batch_id = response.json()["id"]
+    batch = client.get(f"/api/batches/{batch_id}", headers=auth_headers).json()
+    assert batch["status"] == "completed"
+    results = client.get(f"/api/batches/{batch_id}/results", headers=auth_headers).json()
+    assert [r["output"] for r in results["results"]] == ["HI A", "HI B"]
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_pipeline_batch_holds_no_connection_while_rows_run(mock_get_provider, checked_out_connections, client, auth_headers):
+    # Given one row that finishes while the other is still waiting on its provider
+    held = []
+
+    async def execute(prompt, model):
+        if prompt == "hi slow":
+            await asyncio.sleep(0.05)
+        held.append(checked_out_connections())
+        return prompt.upper()
+
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = execute
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers, content="hi {{name}}")
+    pipeline_id = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Batch Pipeline",
+            "steps": [{"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "out"}],
+        },
+        headers=auth_headers,
+    ).json()["id"]
+    response, run = _submit_batch(
+        client,
+        auth_headers,
+        {"pipeline_id": pipeline_id, "variable_sets": [{"name": "slow"}, {"name": "fast"}], "concurrency": 2},
+    )
+
+    # When
+    asyncio.run(run)
+
+    # Then
+    batch = client.get(f"/api/batches/{response.json()['id']}", headers=auth_headers).json()
+    assert batch["status"] == "completed"
+    assert held == [0, 0]
+
+
+def test_queued_batch_leaves_pending_rows(monkeypatch, client, auth_headers):
+    # Given
+    monkeypatch.setattr(settings, "EXECUTION_MODE", "queue")
+    template_id = _create_template(client, auth_headers)
+
+    # When
+    response, run = _submit_batch(
+        client,
+        auth_headers,
+        {"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "variable_sets": [{"name": "a"}]},
+    )
+
+    # Then
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+    assert run is None
+
+
+def test_batch_requires_single_target(client, auth_headers):
+    # When
+    response = client.post(
+        "/api/batches/",
+        json={"variable_sets": [{"name": "a"}]},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 422
+
+
+@patch("app.engine.batch_runner.get_provider")
+def test_template_batch_fails_oversized_rows_without_calling_provider(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "ok"
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers, content="{{text}}")
+
+    # When
+    response, run = _submit_batch(
+        client,
+        auth_headers,
+        {
+            "template_id": template_id,
+            "provider": "openai",
+            "model": "gpt-4o-mini",
+            "variable_sets": [{"text": "short"}, {"text": "word " * 130_000}],
+        },
+    )
+    asyncio.run(run)
+
+    # Then
+    results = client.get(f"/api/batches/{response.json()['id']}/results", headers=auth_headers).json()["results"]
+    assert [r["status"] for r in results] == ["completed", "failed"]
+    assert "context window" in results[1]["error"]
+    mock_provider.execute.assert_awaited_once_with("short", "gpt-4o-mini")
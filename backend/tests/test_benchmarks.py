@@ -0,0 +1,112 @@
+import asyncio
+import random
+
+import pytest
+
+from app.engine.providers.base import ProviderTransientError
+from app.engine.providers.simulated_provider import LatencyDistribution, SimulatedProvider
+from benchmarks.harness import BenchmarkResult, best_of, config_mismatches, find_regressions, summarize
+
+
+def test_latency_distribution_parses_specs():
+    # Given / When
+    fixed = LatencyDistribution.parse("fixed:0.05")
+    lognormal = LatencyDistribution.parse("lognormal:0.05:0.5")
+
+    # Then
+    assert fixed == LatencyDistribution("fixed", 0.05, 0.0)
+    assert lognormal == LatencyDistribution("lognormal", 0.05, 0.5)
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("gamma:1")
+
+
+def test_lognormal_latency_has_a_long_tail():
+    # Given
+    distribution = LatencyDistribution("lognormal", 0.05, 0.5)
+    rng = random.Random(0)
+
+    # When
+    samples = sorted(distribution.sample(rng) for _ in range(1000))
+
+    # Then
+    assert samples[500] == pytest.approx(0.05, rel=0.1)
+    assert samples[990] > 2.5 * samples[500]
+
+
+def test_simulated_provider_streams_output_and_injects_errors():
+    # Given
+    provider = SimulatedProvider(output_tokens=3)
+    failing = SimulatedProvider(error_rate=1.0)
+
+    async def collect():
+        return [chunk async for chunk in provider.stream("p", "m")]
+
+    # When
+    output = asyncio.run(provider.execute("p", "m"))
+    chunks = asyncio.run(collect())
+
+    # Then
+    assert output == "token0 token1 token2"
+    assert "".join(chunks) == output
+    assert provider.calls == 2
+    with pytest.raises(ProviderTransientError):
+        asyncio.run(failing.execute("p", "m"))
+
+
+def test_summarize_reports_throughput_and_percentiles():
+    # Given
+    durations = [0.001] * 98 + [0.010, 0.100]
+
+    # When
+    result = summarize("bench", durations, wall_seconds=0.5)
+
+    # Then
+    assert result == BenchmarkResult("bench", ops=100, errors=0, throughput=200.0, p50_ms=1.0, p99_ms=10.0)
+
+
+def test_best_of_keeps_the_best_metric_of_each_repeat():
+    # Given
+    runs = [BenchmarkResult("b", 10, 0, 100.0, 5.0, 20.0), BenchmarkResult("b", 10, 0, 90.0, 4.0, 30.0)]
+
+    # When
+    result = best_of(runs)
+
+    # Then
+    assert (result.throughput, result.p50_ms, result.p99_ms) == (100.0, 4.0, 20.0)
+
+
+def test_find_regressions_flags_throughput_drops_and_p99_rises():
+    # Given
+    baseline = {
+        "slower": BenchmarkResult("slower", 10, 0, 100.0, 5.0, 20.0),
+        "tail": BenchmarkResult("tail", 10, 0, 100.0, 5.0, 20.0),
+        "noise": BenchmarkResult("noise", 10, 0, 100.0, 0.01, 0.02),
+    }
+    results = [
+        BenchmarkResult("slower", 10, 0, 70.0, 5.0, 20.0),
+        BenchmarkResult("tail", 10, 0, 95.0, 5.0, 30.0),
+        BenchmarkResult("noise", 10, 0, 100.0, 0.01, 0.05),
+        BenchmarkResult("new", 10, 0, 1.0, 500.0, 900.0),
+    ]
+
+    # When
+    regressions = find_regressions(results, baseline, tolerance=0.25)
+
+    # Then
+    assert regressions == [
+        "slower: throughput 70.0/s vs baseline 100.0/s",
+        "tail: p99 30.0ms vs baseline 20.0ms",
+    ]
+
+
+def test_config_mismatches_ignore_repeats_but_not_the_sweep():
+    # Given
+    baseline = {"sweep": "full", "latency": "fixed:0.01", "prompt_size": 2000, "repeats": 3}
+
+    # When
+    same = config_mismatches({**baseline, "repeats": 1}, baseline)
+    different = config_mismatches({**baseline, "sweep": "quick", "prompt_size": 500}, baseline)
+
+    # Then
+    assert same == []
+    assert different == ["sweep: 'quick' vs baseline 'full'", "prompt_size: 500 vs baseline 2000"]
@@ -0,0 +1,125 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.engine.providers.call_stats import track_call
+from app.engine.providers.rate_limited_provider import RateLimitedProvider
+from app.engine.providers.registry import ProviderRegistry
+from app.engine.providers.simulated_provider import LatencyDistribution, SimulatedProvider
+from app.engine.rate_limiter import RateLimiterRegistry
+
+
+def _simulated_registry(latency: float = 0.02) -> ProviderRegistry:
+    provider = SimulatedProvider(LatencyDistribution("fixed", latency), output_tokens=5)
+    return ProviderRegistry({"openai": lambda: provider})
+
+
+def test_rate_limited_provider_times_queue_wait_and_first_token():
+    # Given
+    limiters = RateLimiterRegistry({"sim": {"initial_concurrency": 1, "max_concurrency": 1}})
+    provider = RateLimitedProvider(SimulatedProvider(LatencyDistribution("fixed", 0.05), output_tokens=3), "sim", limiters)
+
+    async def stream(prompt):
+        with track_call() as call:
+            chunks = [chunk async for chunk in provider.stream(prompt, "m")]
+        return chunks, call
+
+    async def run():
+        return await asyncio.gather(stream("first"), stream("second"))
+
+    # When
+    (_, first), (chunks, second) = asyncio.run(run())
+
+    # Then
+    assert "".join(chunks) == "token0 token1 token2"
+    assert first.queue_wait_seconds == pytest.approx(0, abs=0.02)
+    assert second.queue_wait_seconds == pytest.approx(0.05, abs=0.03)
+    assert second.first_token_seconds == pytest.approx(0.05, abs=0.03)
+    assert second.provider_seconds >= second.first_token_seconds
+    assert (second.input_tokens, second.output_tokens) == (2, 3)
+
+
+def test_execution_records_call_instrumentation(client, auth_headers):
+    # Given
+    template_id = client.post(
+        "/api/templates/",
+        json={"name": "Timed", "description": None, "content": "Hello {{name}}"},
+        headers=auth_headers,
+    ).json()["id"]
+
+    # When
+    with patch("app.engine.providers.provider_registry", _simulated_registry()):
+        response = client.post(
+            "/api/executions/",
+            json={"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "variables": {"name": "World"}},
+            headers=auth_headers,
+        )
+
+    # Then
+    execution = response.json()
+    assert execution["status"] == "completed"
+    assert execution["attempts"] == 1
+    assert (execution["input_tokens"], execution["output_tokens"]) == (4, 5)
+    assert execution["provider_latency_ms"] >= 20
+    assert execution["queue_wait_ms"] is not None
+    assert execution["first_token_ms"] is None
+
+
+def test_pipeline_steps_record_call_instrumentation(client, auth_headers):
+    # Given
+    template_id = client.post(
+        "/api/templates/",
+        json={"name": "Timed", "description": None, "content": "Hello {{name}}"},
+        headers=auth_headers,
+    ).json()["id"]
+    pipeline_id = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Timed Pipeline",
+            "description": None,
+            "steps": [{"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "out"}],
+        },
+        headers=auth_headers,
+    ).json()["id"]
+
+    # When
+    with patch("app.engine.providers.provider_registry", _simulated_registry()):
+        client.post(
+            f"/api/pipelines/{pipeline_id}/execute/stream",
+            json={"variables": {"name": "World"}},
+            headers=auth_headers,
+        )
+    executions = client.get(f"/api/pipelines/{pipeline_id}/executions", headers=auth_headers).json()["executions"]
+
+    # Then
+    step = executions[0]["step_executions"][0]
+    assert step["attempts"] == 1
+    assert (step["input_tokens"], step["output_tokens"]) == (4, 5)
+    assert step["first_token_ms"] >= 20
+    assert step["provider_latency_ms"] >= step["first_token_ms"]
+    assert step["queue_wait_ms"] is not None
+
+
+def test_coalesced_calls_are_recorded(client, auth_headers):
+    # Given
+    template_id = client.post(
+        "/api/templates/",
+        json={"name": "Shared", "description": None, "content": "Hello {{name}}"},
+        headers=auth_headers,
+    ).json()["id"]
+    target = {"provider": "openai", "model": "gpt-4o-mini"}
+
+    # When
+    with patch("app.engine.providers.provider_registry", _simulated_registry(latency=0.05)):
+        response = client.post(
+            "/api/comparisons/",
+            json={"template_id": template_id, "variables": {"name": "World"}, "targets": [target, target], "coalesce": True},
+            headers=auth_headers,
+        )
+
+    # Then
+    executions = response.json()["executions"]
+    assert sorted(e["coalesced"] for e in executions) == [False, True]
+    stored = client.get(f"/api/executions/{executions[0]['id']}", headers=auth_headers).json()
+    assert stored["coalesced"] == executions[0]["coalesced"]
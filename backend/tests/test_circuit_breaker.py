@@ -0,0 +1,212 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.engine.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError
+from app.engine.providers.base import ProviderTransientError
+from app.engine.providers.circuit_breaker_provider import CircuitBreakerProvider
+from app.engine.providers.mock_provider import MockProvider
+
+
+def _breaker(**overrides) -> CircuitBreaker:
+    options = {"window": 10, "min_calls": 4, "failure_ratio": 0.5, "slow_call_seconds": 5.0, "open_seconds": 60.0}
+    return CircuitBreaker(**{**options, **overrides})
+
+
+def test_breaker_opens_on_error_rate():
+    # Given
+    breaker = _breaker()
+
+    # When
+    for _ in range(2):
+        breaker.record_success(0.1)
+    breaker.record_failure()
+    still_closed = breaker.state
+    breaker.record_failure()
+
+    # Then
+    assert still_closed == CLOSED
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_counts_slow_calls_as_failures():
+    # Given
+    breaker = _breaker(min_calls=2)
+
+    # When
+    breaker.record_success(6.0)
+    breaker.record_success(7.0)
+
+    # Then
+    assert breaker.state == OPEN
+
+
+def test_breaker_half_opens_with_a_single_probe():
+    # Given
+    breaker = _breaker(min_calls=1, open_seconds=0.0)
+    breaker.record_failure()
+
+    # When
+    probe_allowed = breaker.allow()
+    second_allowed = breaker.allow()
+    state_during_probe = breaker.state
+    breaker.record_success(0.1)
+
+    # Then
+    assert probe_allowed
+    assert not second_allowed
+    assert state_during_probe == HALF_OPEN
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens_breaker():
+    # Given
+    breaker = _breaker(min_calls=1, open_seconds=0.0)
+    breaker.record_failure()
+    breaker.allow()
+
+    # When
+    breaker.record_failure()
+
+    # Then
+    assert breaker.state == OPEN
+
+
+def test_provider_wrapper_fails_fast_when_open():
+    # Given
+    class _DownProvider(MockProvider):
+        calls = 0
+
+        async def execute(self, prompt, model):
+            type(self).calls += 1
+            raise ProviderTransientError("503")
+
+    registry = CircuitBreakerRegistry()
+    provider = CircuitBreakerProvider(_DownProvider(), "anthropic", registry)
+
+    async def run():
+        errors = []
+        for _ in range(15):
+            try:
+                await provider.execute("p", "m")
+            except Exception as e:
+                errors.append(type(e))
+        return errors
+
+    # When
+    errors = asyncio.run(run())
+
+    # Then
+    assert errors[:10] == [ProviderTransientError] * 10
+    assert set(errors[10:]) == {CircuitOpenError}
+    assert _DownProvider.calls == 10
+    assert registry.stats()[0]["state"] == OPEN
+
+
+def test_provider_wrapper_ignores_terminal_errors():
+    # Given
+    inner = AsyncMock()
+    inner.execute.side_effect = ValueError("bad request")
+    registry = CircuitBreakerRegistry()
+    provider = CircuitBreakerProvider(inner, "openai", registry)
+
+    # When
+    for _ in range(12):
+        with pytest.raises(ValueError):
+            asyncio.run(provider.execute("p", "m"))
+
+    # Then
+    assert registry.get("openai", "m").state == CLOSED
+
+
+def _create_failover_pipeline(client, headers):
+    template_id = client.post(
+        "/api/templates/",
+        json={"name": "Failover", "description": None, "content": "{{input}}"},
+        headers=headers,
+    ).json()["id"]
+    return client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Failover Pipeline",
+            "description": None,
+            "steps": [
+                {
+                    "template_id": template_id,
+                    "provider": "anthropic",
+                    "model": "claude-sonnet-4-5-20250929",
+                    "output_variable": "out",
+                    "fallbacks": [{"provider": "openai", "model": "gpt-4o-mini"}],
+                }
+            ],
+        },
+        headers=headers,
+    )
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_step_fails_over_to_fallback(mock_get_provider, client, auth_headers):
+    # Given
+    anthropic, openai = AsyncMock(), AsyncMock()
+    anthropic.execute.side_effect = ProviderTransientError("overloaded")
+    openai.execute.return_value = "from openai"
+    mock_get_provider.side_effect = lambda name, **kwargs: {"anthropic": anthropic, "openai": openai}[name]
+    pipeline = _create_failover_pipeline(client, auth_headers)
+
+    # When
+    with patch("app.engine.pipeline_executor.circuit_breakers", CircuitBreakerRegistry()):
+        response = client.post(
+            f"/api/pipelines/{pipeline.json()['id']}/execute",
+            json={"variables": {"input": "hi"}},
+            headers=auth_headers,
+        )
+
+    # Then
+    assert pipeline.json()["steps"][0]["fallbacks"] == [{"provider": "openai", "model": "gpt-4o-mini"}]
+    step = response.json()["step_executions"][0]
+    assert step["status"] == "completed"
+    assert step["output"] == "from openai"
+    assert (step["provider"], step["model"]) == ("openai", "gpt-4o-mini")
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_step_skips_open_circuit(mock_get_provider, client, auth_headers):
+    # Given
+    openai = AsyncMock()
+    openai.execute.return_value = "from openai"
+    mock_get_provider.return_value = openai
+    registry = CircuitBreakerRegistry()
+    breaker = registry.get("anthropic", "claude-sonnet-4-5-20250929")
+    for _ in range(breaker.min_calls):
+        breaker.record_failure()
+    pipeline = _create_failover_pipeline(client, auth_headers)
+
+    # When
+    with patch("app.engine.pipeline_executor.circuit_breakers", registry):
+        response = client.post(
+            f"/api/pipelines/{pipeline.json()['id']}/execute",
+            json={"variables": {"input": "hi"}},
+            headers=auth_headers,
+        )
+
+    # Then
+    assert response.json()["step_executions"][0]["output"] == "from openai"
+    assert [call.args[0] for call in mock_get_provider.call_args_list] == ["openai"]
+
+
+def test_circuits_endpoint(client, auth_headers):
+    # Given
+    registry = CircuitBreakerRegistry()
+    registry.get("openai", "gpt-4o")
+
+    # When
+    with patch("app.api.providers.circuit_breakers", registry):
+        response = client.get("/api/providers/circuits", headers=auth_headers)
+
+    # Then
+    assert response.status_code == 200
+    assert response.json()["circuits"] == [
+        {"provider": "openai", "model": "gpt-4o", "state": "closed", "failure_rate": 0.0, "calls": 0, "open_for": 0.0}
+    ]
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+from app.engine.providers.base import LLMProvider
+from app.engine.providers.mock_provider import MockProvider
+
+TARGETS = [
+    {"provider": "anthropic", "model": "claude-sonnet-4-5-20250929"},
+    {"provider": "anthropic", "model": "claude-haiku-4-5-20251001"},
+    {"provider": "openai", "model": "gpt-4o"},
+]
+
+
+class _SlowProvider(LLMProvider):
+    async def execute(self, prompt: str, model: str) -> str:
+        await asyncio.sleep(0.2)
+        if model == "gpt-4o":
+            raise RuntimeError("model unavailable")
+        return f"{model}: {prompt}"
+
+
+def _create_template(client, headers, content="Hello {{name}}"):
+    return client.post(
+        "/api/templates/",
+        json={"name": "Compare", "description": None, "content": content},
+        headers=headers,
+    ).json()["id"]
+
+
+def _parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append((event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))))
+    return events
+
+
+@patch("app.services.execution_service.get_provider")
+def test_comparison_runs_targets_concurrently(mock_get_provider, client, auth_headers):
+    # Given
+    mock_get_provider.return_value = _SlowProvider()
+    template_id = _create_template(client, auth_headers)
+
+    # When
+    started = time.perf_counter()
+    response = client.post(
+        "/api/comparisons/",
+        json={"template_id": template_id, "variables": {"name": "Ada"}, "targets": TARGETS},
+        headers=auth_headers,
+    )
+    elapsed = time.perf_counter() - started
+
+    # Then
+    assert response.status_code == 201
+    assert elapsed < 0.5
+    body = response.json()
+    assert body["template_name"] == "Compare"
+    assert [(e["provider"], e["model"]) for e in body["executions"]] == [
+        (t["provider"], t["model"]) for t in TARGETS
+    ]
+    assert [e["status"] for e in body["executions"]] == ["completed", "completed", "failed"]
+    assert body["executions"][0]["output"] == "claude-sonnet-4-5-20250929: Hello Ada"
+    assert body["executions"][2]["error"] == "model unavailable"
+    stored = client.get(f"/api/comparisons/{body['id']}", headers=auth_headers).json()
+    assert stored["executions"] == body["executions"]
+
+
+@patch("app.services.execution_service.get_provider")
+def test_comparison_holds_no_connection_while_targets_run(mock_get_provider, checked_out_connections, client, auth_headers):
+    # Given one target that finishes while the other is still waiting on its provider
+    held = []
+
+    class _StaggeredProvider(LLMProvider):
+        async def execute(self, prompt: str, model: str) -> str:
+            if model == "claude-haiku-4-5-20251001":
+                await asyncio.sleep(0.05)
+            held.append(checked_out_connections())
+            return prompt
+
+    mock_get_provider.return_value = _StaggeredProvider()
+    template_id = _create_template(client, auth_headers)
+
+    # When
+    response = client.post(
+        "/api/comparisons/",
+        json={"template_id": template_id, "variables": {"name": "Ada"}, "targets": TARGETS[1:]},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert [e["status"] for e in response.json()["executions"]] == ["completed", "completed"]
+    assert held == [0, 0]
+
+
+def test_comparison_rejects_missing_variables(client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers)
+
+    # When
+    response = client.post(
+        "/api/comparisons/",
+        json={"template_id": template_id, "variables": {}, "targets": TARGETS},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Missing variable: name"
+
+
+@patch("app.services.execution_service.get_provider")
+def test_stream_comparison_tags_tokens_by_execution(mock_get_provider, client, auth_headers):
+    # Given
+    mock_get_provider.return_value = MockProvider()
+    template_id = _create_template(client, auth_headers)
+
+    # When
+    response = client.post(
+        "/api/comparisons/stream",
+        json={"template_id": template_id, "variables": {"name": "Ada"}, "targets": TARGETS[:2]},
+        headers=auth_headers,
+    )
+
+    # Then
+    events = _parse_sse(response.text)
+    assert events[0][0] == "started"
+    execution_ids = [e["execution_id"] for e in events[0][1]["executions"]]
+    for execution_id in execution_ids:
+        text = "".join(d["text"] for name, d in events if name == "token" and d["execution_id"] == execution_id)
+        assert text == "Mock response for: Hello Ada"
+    assert events[-1][0] == "completed"
+    assert [e["status"] for e in events[-1][1]["executions"]] == ["completed", "completed"]
+
+
+def test_get_comparison_not_found(client, auth_headers):
+    # When
+    response = client.get("/api/comparisons/999", headers=auth_headers)
+
+    # Then
+    assert response.status_code == 404
@@ -0,0 +1,229 @@
+from unittest.mock import AsyncMock, patch
+
+from app.engine.token_estimator import estimate_call, estimate_tokens
+
+
+def _create_template(client, headers, name, content):
+    return client.post(
+        "/api/templates/",
+        json={"name": name, "description": None, "content": content},
+        headers=headers,
+    ).json()["id"]
+
+
+def _execution_request(template_id, **overrides):
+    return {
+        "template_id": template_id,
+        "provider": "openai",
+        "model": "gpt-4o-mini",
+        "variables": {"text": "word " * 100},
+        **overrides,
+    }
+
+
+def test_estimate_is_calibrated_per_provider():
+    # Given
+    text = "Tokenization differs between providers " * 20
+
+    # When
+    anthropic = estimate_call("anthropic", "claude-haiku-4-5-20251001", text, {"max_tokens": 4096})
+    openai = estimate_call("openai", "gpt-4o-mini", text, {})
+
+    # Then
+    assert anthropic.input_tokens > openai.input_tokens
+    assert openai.max_output_tokens == 16_384
+    assert anthropic.cost == round((anthropic.input_tokens * 1.0 + 4096 * 5.0) / 1_000_000, 6)
+
+
+def test_estimate_tokens_counts_long_words_more():
+    # When / Then
+    assert estimate_tokens("a b c") == 3
+    assert estimate_tokens("internationalization") == 5
+
+
+def test_preflight_template_estimate(client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers, "Summarise", "Summarise: {{text}}")
+
+    # When
+    response = client.post("/api/executions/estimate", json=_execution_request(template_id), headers=auth_headers)
+
+    # Then
+    assert response.status_code == 200
+    body = response.json()
+    call = body["calls"][0]
+    assert call["input_tokens"] == estimate_tokens("Summarise: " + "word " * 100) + 7
+    assert call["fits_context"] is True
+    assert body["cost_usd"] == call["cost_usd"] > 0
+
+
+def test_preflight_pipeline_counts_upstream_output_budget(client, auth_headers):
+    # Given
+    first = _create_template(client, auth_headers, "First", "{{text}}")
+    second = _create_template(client, auth_headers, "Second", "Refine {{draft}}")
+    llm = {"provider": "anthropic", "model": "claude-haiku-4-5-20251001"}
+    pipeline_id = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Two steps",
+            "steps": [
+                {"template_id": first, **llm, "output_variable": "draft"},
+                {"template_id": second, **llm, "output_variable": "final"},
+            ],
+        },
+        headers=auth_headers,
+    ).json()["id"]
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline_id}/estimate", json={"variables": {"text": "hi"}}, headers=auth_headers
+    )
+
+    # Then
+    calls = response.json()["calls"]
+    assert [c["step_order"] for c in calls] == [1, 2]
+    assert calls[1]["input_tokens"] == estimate_tokens("Refine ", 3.5) + 7 + calls[0]["max_output_tokens"]
+
+
+@patch("app.services.execution_service.get_provider")
+def test_execution_budget_rejects_before_calling(mock_get_provider, client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers, "Summarise", "Summarise: {{text}}")
+
+    # When
+    response = client.post(
+        "/api/executions/", json=_execution_request(template_id, max_cost_usd=0.0001), headers=auth_headers
+    )
+
+    # Then
+    assert response.status_code == 400
+    assert "exceeds the execution budget" in response.json()["detail"]
+    mock_get_provider.assert_not_called()
+    assert client.get("/api/executions/", headers=auth_headers).json()["total"] == 0
+
+
+@patch("app.services.execution_service.get_provider")
+def test_execution_budget_rejects_unpriced_models(mock_get_provider, client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers, "Summarise", "Summarise: {{text}}")
+
+    # When
+    response = client.post(
+        "/api/executions/",
+        json=_execution_request(template_id, model="unpriced-model", max_cost_usd=1.0),
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 400
+    assert "Cost cannot be estimated" in response.json()["detail"]
+    mock_get_provider.assert_not_called()
+
+
+@patch("app.services.execution_service.get_provider")
+def test_daily_user_budget_allows_unpriced_models(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "Summary"
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers, "Summarise", "Summarise: {{text}}")
+
+    # When
+    with patch("app.services.budget_service.settings.USER_DAILY_BUDGET_USD", 0.000001):
+        response = client.post(
+            "/api/executions/", json=_execution_request(template_id, model="unpriced-model"), headers=auth_headers
+        )
+
+    # Then
+    assert response.status_code == 201
+    assert response.json()["status"] == "completed"
+
+
+@patch("app.services.execution_service.get_provider")
+def test_daily_user_budget(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "ok"
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers, "Summarise", "Summarise: {{text}}")
+    cost = client.post(
+        "/api/executions/estimate", json=_execution_request(template_id), headers=auth_headers
+    ).json()["cost_usd"]
+
+    # When
+    with patch("app.services.budget_service.settings.USER_DAILY_BUDGET_USD", cost * 1.5):
+        first = client.post("/api/executions/", json=_execution_request(template_id), headers=auth_headers)
+        second = client.post("/api/executions/", json=_execution_request(template_id), headers=auth_headers)
+
+    # Then
+    assert first.status_code == 201
+    assert first.json()["estimated_cost"] == cost
+    assert second.status_code == 400
+    assert "daily budget" in second.json()["detail"]
+
+
+@patch("app.services.execution_service.get_provider")
+def test_oversized_prompt_fails_without_network_call(mock_get_provider, client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers, "Huge", "{{text}}")
+
+    # When
+    response = client.post(
+        "/api/executions/",
+        json=_execution_request(template_id, variables={"text": "word " * 130_000}),
+        headers=auth_headers,
+    )
+
+    # Then
+    body = response.json()
+    assert body["status"] == "failed"
+    assert "context window" in body["error"]
+    mock_get_provider.assert_not_called()
+
+
+def test_comparison_budget_rejects_before_creating(client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers, "Summarise", "Summarise: {{text}}")
+
+    # When
+    response = client.post(
+        "/api/comparisons/",
+        json={
+            "template_id": template_id,
+            "variables": {"text": "word " * 100},
+            "targets": [{"provider": "openai", "model": "gpt-4o-mini"}, {"provider": "openai", "model": "gpt-4o"}],
+            "max_cost_usd": 0.0001,
+        },
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 400
+    assert "exceeds the execution budget" in response.json()["detail"]
+
+
+def test_batch_counts_every_row_against_the_daily_budget(client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers, "Summarise", "Summarise: {{text}}")
+    cost = client.post(
+        "/api/executions/estimate", json=_execution_request(template_id), headers=auth_headers
+    ).json()["cost_usd"]
+    batch = {
+        "template_id": template_id,
+        "provider": "openai",
+        "model": "gpt-4o-mini",
+        "variable_sets": [{"text": "word " * 100}] * 3,
+    }
+
+    # When
+    with (
+        patch("app.services.budget_service.settings.USER_DAILY_BUDGET_USD", cost * 2.5),
+        patch("app.api.batches.spawn", side_effect=lambda run: run.close()),
+    ):
+        rejected = client.post("/api/batches/", json=batch, headers=auth_headers)
+        accepted = client.post("/api/batches/", json={**batch, "variable_sets": batch["variable_sets"][:2]}, headers=auth_headers)
+
+    # Then
+    assert rejected.status_code == 400
+    assert "daily budget" in rejected.json()["detail"]
+    assert accepted.status_code == 202
@@ -0,0 +1,97 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import event
+
+from app.engine.execution_plan import compile_execution_plan
+from app.models.pipeline import PipelineExecution
+from app.services.pipeline_service import PipelineService
+
+
+def _create_template(client, headers, name, content):
+    return client.post(
+        "/api/templates/",
+        json={"name": name, "description": None, "content": content},
+        headers=headers,
+    ).json()["id"]
+
+
+def _create_chain_pipeline(client, headers, length):
+    steps = []
+    for i in range(length):
+        content = "{{input}}" if i == 0 else f"{{{{out_{i - 1}}}}}"
+        template_id = _create_template(client, headers, f"Step {i}", content)
+        steps.append(
+            {"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": f"out_{i}"}
+        )
+    return client.post(
+        "/api/pipelines/",
+        json={"name": "Chain", "steps": steps},
+        headers=headers,
+    ).json()["id"]
+
+
+def _user_id(client, headers):
+    return client.get("/api/auth/me", headers=headers).json()["id"]
+
+
+def test_compile_uses_latest_template_versions(client, auth_headers, db_session):
+    # Given
+    pipeline_id = _create_chain_pipeline(client, auth_headers, 2)
+    pipeline = client.get(f"/api/pipelines/{pipeline_id}", headers=auth_headers).json()
+    first_template_id = pipeline["steps"][0]["template_id"]
+    client.put(f"/api/templates/{first_template_id}", json={"content": "v2 {{input}}"}, headers=auth_headers)
+    user_id = _user_id(client, auth_headers)
+
+    # When
+    plan = compile_execution_plan(db_session, PipelineService(db_session).get_pipeline(pipeline_id, user_id), user_id)
+
+    # Then
+    assert [step.output_variable for step in plan.steps] == ["out_0", "out_1"]
+    assert plan.steps[0].template.render({"input": "x"}) == "v2 x"
+    assert plan.steps[1].template.variables == ["out_0"]
+
+
+@pytest.mark.parametrize("length", [2, 6])
+def test_compile_query_count_does_not_grow_with_pipeline_length(length, client, auth_headers, db_session, db_engine):
+    # Given
+    pipeline_id = _create_chain_pipeline(client, auth_headers, length)
+    user_id = _user_id(client, auth_headers)
+    pipeline = PipelineService(db_session).get_pipeline(pipeline_id, user_id)
+    statements = []
+    event.listen(db_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    # When
+    compile_execution_plan(db_session, pipeline, user_id)
+
+    # Then
+    assert len(statements) == 1
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_missing_variable_fails_before_any_provider_call(mock_get_provider, client, auth_headers, db_session):
+    # Given
+    mock_provider = AsyncMock()
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers, "Needs context", "{{input}} and {{context}}")
+    pipeline_id = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Broken",
+            "steps": [{"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "out"}],
+        },
+        headers=auth_headers,
+    ).json()["id"]
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"input": "hello"}},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 400
+    assert "Missing variable: context" in response.json()["detail"]
+    mock_provider.execute.assert_not_awaited()
+    assert db_session.query(PipelineExecution).count() == 0
@@ -1,4 +1,7 @@
-from unittest.mock import MagicMock, patch
+import json
+from unittest.mock import AsyncMock, patch
+
+from app.engine.providers.mock_provider import MockProvider
 
 
 def _create_template(client, headers, name="Test Template", content="Hello {{name}}"):
@@ -9,10 +12,18 @@ def _create_template(client, headers, name="Test Template", content="Hello {{nam
     )
 
 
+def _parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append((event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))))
+    return events
+
+
 @patch("app.services.execution_service.get_provider")
 def test_execute_template(mock_get_provider, client, auth_headers):
     # Given
-    mock_provider = MagicMock()
+    mock_provider = AsyncMock()
     mock_provider.execute.return_value = "Mock response"
     mock_get_provider.return_value = mock_provider
 
@@ -67,7 +78,7 @@ def test_execute_missing_variable(mock_get_provider, client, auth_headers):
 @patch("app.services.execution_service.get_provider")
 def test_list_executions(mock_get_provider, client, auth_headers):
     # Given
-    mock_provider = MagicMock()
+    mock_provider = AsyncMock()
     mock_provider.execute.return_value = "Mock response"
     mock_get_provider.return_value = mock_provider
 
@@ -124,3 +135,94 @@ def test_execute_invalid_provider(client, auth_headers):
 
     # Then
     assert response.status_code == 422
+
+
+@patch("app.services.execution_service.get_provider")
+def test_stream_execution(mock_get_provider, client, auth_headers):
+    # Given
+    mock_get_provider.return_value = MockProvider()
+    template_response = _create_template(client, auth_headers)
+    template_id = template_response.json()["id"]
+
+    # When
+    response = client.post(
+        "/api/executions/stream",
+        json={
+            "template_id": template_id,
+            "provider": "anthropic",
+            "model": "claude-sonnet-4-5-20250929",
+            "variables": {"name": "World"},
+        },
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    assert events[0][0] == "started"
+    tokens = [data["text"] for name, data in events if name == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Mock response for: Hello World"
+    assert events[-1][0] == "completed"
+    assert events[-1][1]["output"] == "Mock response for: Hello World"
+    stored = client.get(f"/api/executions/{events[0][1]['execution_id']}", headers=auth_headers).json()
+    assert stored["status"] == "completed"
+
+
+@patch("app.services.execution_service.ExecutionService.run_execution")
+def test_stream_execution_reports_unexpected_errors(mock_run_execution, client, auth_headers, caplog):
+    # Given
+    mock_run_execution.side_effect = RuntimeError("database went away")
+    template_id = _create_template(client, auth_headers).json()["id"]
+
+    # When
+    response = client.post(
+        "/api/executions/stream",
+        json={"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "variables": {"name": "World"}},
+        headers=auth_headers,
+    )
+
+    # Then
+    events = _parse_sse(response.text)
+    assert [name for name, _ in events] == ["started", "error"]
+    assert events[-1][1] == {"detail": "Internal server error"}
+    assert "Streamed run failed" in caplog.text
+
+
+def test_stream_execution_unknown_template(client, auth_headers):
+    # When
+    response = client.post(
+        "/api/executions/stream",
+        json={"template_id": 999, "provider": "anthropic", "model": "m", "variables": {}},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 400
+
+
+@patch("app.services.execution_service.get_provider")
+def test_execute_template_holds_no_connection_during_provider_call(mock_get_provider, checked_out_connections, client, auth_headers):
+    # Given
+    held = []
+
+    async def execute(prompt, model):
+        held.append(checked_out_connections())
+        return "Mock response"
+
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = execute
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers).json()["id"]
+
+    # When
+    response = client.post(
+        "/api/executions/",
+        json={"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "variables": {"name": "World"}},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.json()["status"] == "completed"
+    assert held == [0]
@@ -0,0 +1,153 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.core.metrics import MetricsRegistry
+from app.engine.providers.registry import ProviderRegistry
+from app.engine.providers.simulated_provider import LatencyDistribution, SimulatedProvider
+
+
+def test_registry_renders_prometheus_text():
+    # Given
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+    # When
+    requests.inc(route='/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5.0)
+    text = registry.render()
+
+    # Then
+    assert text.splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 1',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 5.55",
+        "latency_seconds_count 3",
+    ]
+    with pytest.raises(ValueError):
+        requests.inc(path="/a")
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_multiprocess_merge_sums_counters_and_live_gauges(tmp_path):
+    # Given
+    registry = MetricsRegistry(str(tmp_path))
+    requests = registry.counter("requests_total", "Requests.")
+    in_flight = registry.gauge("in_flight", "In flight.")
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(1.0,))
+    requests.inc(2)
+    in_flight.inc()
+    latency.observe(0.5)
+    for pid in (_dead_pid(), os.getppid()):
+        (tmp_path / f"{pid}.json").write_text(
+            json.dumps({"requests_total": [[[], 3]], "in_flight": [[[], 4]], "latency_seconds": [[[], [1, 0, 2.0]]]})
+        )
+
+    # When
+    values = registry.collect()
+
+    # Then
+    assert values["requests_total"] == {(): 8}
+    assert values["in_flight"] == {(): 5}
+    assert values["latency_seconds"] == {(): [3, 0, 4.5]}
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+
+
+def test_exiting_process_drops_its_gauges(tmp_path):
+    # Given
+    registry = MetricsRegistry(str(tmp_path))
+    registry.gauge("in_flight", "In flight.").inc()
+    registry.counter("requests_total", "Requests.").inc()
+
+    # When
+    registry.flush(exiting=True)
+
+    # Then
+    assert json.loads((tmp_path / f"{os.getpid()}.json").read_text()) == {"requests_total": [[[], 1.0]]}
+
+
+def test_starting_process_absorbs_exited_processes(tmp_path):
+    # Given
+    registry = MetricsRegistry(str(tmp_path))
+    requests = registry.counter("requests_total", "Requests.")
+    registry.gauge("in_flight", "In flight.")
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(1.0,))
+    requests.inc(2)
+    dead_files = [tmp_path / f"{_dead_pid()}.json" for _ in range(2)]
+    for path in dead_files:
+        path.write_text(
+            json.dumps({"requests_total": [[[], 3]], "in_flight": [[[], 4]], "latency_seconds": [[[], [1, 0, 2.0]]]})
+        )
+
+    # When
+    registry.absorb_exited_processes()
+
+    # Then
+    assert [path.name for path in tmp_path.iterdir()] == [f"{os.getpid()}.json"]
+    values = registry.collect()
+    assert values["requests_total"] == {(): 8}
+    assert values["in_flight"] == {}
+    assert values["latency_seconds"] == {(): [2, 0, 4.0]}
+
+
+def test_concurrent_flushes_leave_a_complete_file(tmp_path):
+    # Given
+    registry = MetricsRegistry(str(tmp_path))
+    registry.counter("requests_total", "Requests.").inc()
+
+    # When
+    threads = [threading.Thread(target=registry.flush) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Then
+    assert [path.name for path in tmp_path.iterdir()] == [f"{os.getpid()}.json"]
+    assert json.loads((tmp_path / f"{os.getpid()}.json").read_text()) == {"requests_total": [[[], 1.0]]}
+
+
+def test_metrics_endpoint_reports_requests_and_provider_calls(client, auth_headers):
+    # Given
+    provider = SimulatedProvider(LatencyDistribution("fixed", 0.01), output_tokens=5)
+    template_id = client.post(
+        "/api/templates/",
+        json={"name": "Measured", "description": None, "content": "Hello {{name}}"},
+        headers=auth_headers,
+    ).json()["id"]
+    with patch("app.engine.providers.provider_registry", ProviderRegistry({"openai": lambda: provider})):
+        client.post(
+            "/api/executions/",
+            json={"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "variables": {"name": "a"}},
+            headers=auth_headers,
+        )
+
+    # When
+    response = client.get("/metrics")
+
+    # Then
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/executions/",status="201"}' in response.text
+    assert 'provider_requests_total{provider="openai",model="gpt-4o-mini",outcome="ok"}' in response.text
+    assert 'provider_request_duration_seconds_count{provider="openai",model="gpt-4o-mini"}' in response.text
+    assert 'executions_in_flight{kind="template"} 0' in response.text
@@ -1,4 +1,10 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy.exc import OperationalError
+
+from app.engine.providers.mock_provider import MockProvider
 
 
 def _create_template(client, headers, name="Test Template", content="Hello {{name}}"):
@@ -85,7 +91,7 @@ def test_list_pipelines(client, auth_headers):
 @patch("app.engine.pipeline_executor.get_provider")
 def test_execute_pipeline(mock_get_provider, client, auth_headers):
     # Given
-    mock_provider = MagicMock()
+    mock_provider = AsyncMock()
     mock_provider.execute.side_effect = ["Translated text", "Summary of translated text"]
     mock_get_provider.return_value = mock_provider
 
@@ -120,10 +126,36 @@ def test_execute_pipeline(mock_get_provider, client, auth_headers):
     assert body["step_executions"][1]["output"] == "Summary of translated text"
 
 
+@patch("app.engine.pipeline_executor.get_provider")
+def test_execute_pipeline_holds_no_connection_during_provider_calls(mock_get_provider, checked_out_connections, client, auth_headers):
+    # Given
+    held = []
+
+    async def execute(prompt, model):
+        held.append(checked_out_connections())
+        return f"Output of {prompt}"
+
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = execute
+    mock_get_provider.return_value = mock_provider
+    t1 = _create_template(client, auth_headers, name="First", content="First: {{text}}").json()["id"]
+    t2 = _create_template(client, auth_headers, name="Second", content="Second: {{step_1_output}}").json()["id"]
+    pipeline_id = _create_pipeline(client, auth_headers, [t1, t2]).json()["id"]
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline_id}/execute", json={"variables": {"text": "hi"}}, headers=auth_headers
+    )
+
+    # Then
+    assert response.json()["status"] == "completed"
+    assert held == [0, 0]
+
+
 @patch("app.engine.pipeline_executor.get_provider")
 def test_execute_pipeline_step_failure(mock_get_provider, client, auth_headers):
     # Given
-    mock_provider = MagicMock()
+    mock_provider = AsyncMock()
     mock_provider.execute.side_effect = ["Step 1 output", Exception("LLM error on step 2")]
     mock_get_provider.return_value = mock_provider
 
@@ -155,10 +187,136 @@ def test_execute_pipeline_step_failure(mock_get_provider, client, auth_headers):
     assert "LLM error on step 2" in body["step_executions"][1]["error"]
 
 
+def test_execute_pipeline_records_failures_before_the_provider_call(client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers, content="{{input}}").json()["id"]
+    pipeline_id = _create_pipeline(client, auth_headers, [template_id]).json()["id"]
+
+    for error in (RuntimeError("memo store unavailable"), OperationalError("SELECT", {}, Exception("db gone"))):
+        # When
+        with patch("app.engine.pipeline_executor.find_memoized_step", side_effect=error):
+            response = client.post(
+                f"/api/pipelines/{pipeline_id}/execute", json={"variables": {"input": "hello"}}, headers=auth_headers
+            )
+
+        # Then
+        assert response.status_code == 201
+        body = response.json()
+        assert body["status"] == "failed"
+        assert [s["status"] for s in body["step_executions"]] == ["failed"]
+        assert str(error) in body["step_executions"][0]["error"]
+
+
+def test_execute_pipeline_marks_failed_when_scheduling_fails(client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers, content="{{input}}").json()["id"]
+    pipeline_id = _create_pipeline(client, auth_headers, [template_id]).json()["id"]
+
+    # When
+    with patch("app.engine.pipeline_executor.StepGraph.context_for", side_effect=RuntimeError("bad graph")):
+        response = client.post(
+            f"/api/pipelines/{pipeline_id}/execute", json={"variables": {"input": "hello"}}, headers=auth_headers
+        )
+
+    # Then
+    assert response.status_code == 201
+    assert response.json()["status"] == "failed"
+    assert response.json()["completed_at"] is not None
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_execute_pipeline_runs_independent_steps_concurrently(mock_get_provider, client, auth_headers):
+    # Given
+    in_flight = 0
+    max_in_flight = 0
+
+    async def _execute(prompt, model):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return f"out({prompt})"
+
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = _execute
+    mock_get_provider.return_value = mock_provider
+
+    t1 = _create_template(client, auth_headers, name="Sentiment", content="Sentiment: {{text}}")
+    t2 = _create_template(client, auth_headers, name="Topics", content="Topics: {{text}}")
+    t3 = _create_template(client, auth_headers, name="Report", content="{{sentiment}} + {{topics}}")
+    steps = [
+        {"template_id": t1.json()["id"], "provider": "openai", "model": "gpt-4o-mini", "output_variable": "sentiment"},
+        {"template_id": t2.json()["id"], "provider": "openai", "model": "gpt-4o-mini", "output_variable": "topics"},
+        {"template_id": t3.json()["id"], "provider": "openai", "model": "gpt-4o-mini", "output_variable": "report"},
+    ]
+    pipeline = _create_pipeline(client, auth_headers, [], steps=steps)
+    pipeline_id = pipeline.json()["id"]
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"text": "hi"}},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 201
+    body = response.json()
+    assert body["status"] == "completed"
+    assert max_in_flight == 2
+    assert body["step_executions"][2]["input_prompt"] == "out(Sentiment: hi) + out(Topics: hi)"
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_stream_pipeline_execution(mock_get_provider, client, auth_headers):
+    # Given
+    mock_get_provider.return_value = MockProvider()
+    t1 = _create_template(client, auth_headers, name="Step 1", content="{{input}}")
+    t2 = _create_template(client, auth_headers, name="Step 2", content="{{first}}")
+    steps = [
+        {"template_id": t1.json()["id"], "provider": "openai", "model": "gpt-4o-mini", "output_variable": "first"},
+        {"template_id": t2.json()["id"], "provider": "openai", "model": "gpt-4o-mini", "output_variable": "second"},
+    ]
+    pipeline_id = _create_pipeline(client, auth_headers, [], steps=steps).json()["id"]
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline_id}/execute/stream",
+        json={"variables": {"input": "hello"}},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 200
+    events = [
+        (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+        for block in response.text.strip().split("\n\n")
+    ]
+    names = [name for name, _ in events]
+    assert names[0] == "execution_started"
+    assert names.index("step_started") < names.index("token") < names.index("step_completed")
+    assert [data["step_order"] for name, data in events if name == "step_completed"] == [1, 2]
+    assert names[-1] == "execution_completed"
+    assert events[-1][1]["step_executions"][1]["output"] == "Mock response for: Mock response for: hello"
+
+
+def test_stream_pipeline_execution_not_found(client, auth_headers):
+    # When
+    response = client.post(
+        "/api/pipelines/999/execute/stream",
+        json={"variables": {}},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 404
+
+
 @patch("app.engine.pipeline_executor.get_provider")
 def test_list_all_pipeline_executions(mock_get_provider, client, auth_headers):
     # Given
-    mock_provider = MagicMock()
+    mock_provider = AsyncMock()
     mock_provider.execute.return_value = "output"
     mock_get_provider.return_value = mock_provider
 
@@ -183,6 +341,420 @@ def test_list_all_pipeline_executions(mock_get_provider, client, auth_headers):
     assert body["executions"][0]["pipeline_name"] == "Test Pipeline"
 
 
+def _create_three_step_pipeline(client, headers):
+    t1 = _create_template(client, headers, name="Step 1", content="{{input}}").json()["id"]
+    t2 = _create_template(client, headers, name="Step 2", content="{{a}}").json()["id"]
+    t3 = _create_template(client, headers, name="Step 3", content="{{b}}").json()["id"]
+    steps = [
+        {"template_id": t1, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "a"},
+        {"template_id": t2, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "b"},
+        {"template_id": t3, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "c"},
+    ]
+    return _create_pipeline(client, headers, [t1, t2, t3], steps=steps).json()["id"]
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_resume_failed_execution_reruns_from_failed_step(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = ["out 1", Exception("provider timeout"), "out 2", "out 3"]
+    mock_get_provider.return_value = mock_provider
+    pipeline_id = _create_three_step_pipeline(client, auth_headers)
+    failed = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"input": "hello"}},
+        headers=auth_headers,
+    ).json()
+
+    # When
+    response = client.post(f"/api/pipeline-executions/{failed['id']}/resume", headers=auth_headers)
+
+    # Then
+    assert failed["status"] == "failed"
+    assert response.status_code == 201
+    body = response.json()
+    assert body["status"] == "completed"
+    assert body["resumed_from_id"] == failed["id"]
+    assert [s["output"] for s in body["step_executions"]] == ["out 1", "out 2", "out 3"]
+    assert [s["status"] for s in body["step_executions"]] == ["completed"] * 3
+    assert [call.args[0] for call in mock_provider.execute.call_args_list] == ["hello", "out 1", "out 1", "out 2"]
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_resume_estimates_and_budgets_only_the_remaining_steps(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = ["out 1", Exception("provider timeout"), "out 2", "out 3"]
+    mock_get_provider.return_value = mock_provider
+    pipeline_id = _create_three_step_pipeline(client, auth_headers)
+    failed = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"input": "hello"}},
+        headers=auth_headers,
+    ).json()
+
+    # When
+    over_budget = client.post(
+        f"/api/pipeline-executions/{failed['id']}/resume", json={"max_cost_usd": 0.000001}, headers=auth_headers
+    )
+    resumed = client.post(f"/api/pipeline-executions/{failed['id']}/resume", headers=auth_headers).json()
+
+    # Then
+    assert over_budget.status_code == 400
+    assert "exceeds the execution budget" in over_budget.json()["detail"]
+    assert 0 < resumed["estimated_cost"] < failed["estimated_cost"]
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_resume_rejects_completed_execution(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "output"
+    mock_get_provider.return_value = mock_provider
+    pipeline_id = _create_three_step_pipeline(client, auth_headers)
+    completed = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"input": "hello"}},
+        headers=auth_headers,
+    ).json()
+
+    # When
+    response = client.post(f"/api/pipeline-executions/{completed['id']}/resume", headers=auth_headers)
+
+    # Then
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Only failed pipeline executions can be resumed"
+
+
+def test_resume_unknown_execution(client, auth_headers):
+    # When
+    response = client.post("/api/pipeline-executions/999/resume", headers=auth_headers)
+
+    # Then
+    assert response.status_code == 404
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_rerun_reuses_memoized_steps(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = ["out 1", "out 2", "out 3"]
+    mock_get_provider.return_value = mock_provider
+    pipeline_id = _create_three_step_pipeline(client, auth_headers)
+    client.post(f"/api/pipelines/{pipeline_id}/execute", json={"variables": {"input": "hello"}}, headers=auth_headers)
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"input": "hello"}},
+        headers=auth_headers,
+    )
+
+    # Then
+    body = response.json()
+    assert body["status"] == "completed"
+    assert [s["output"] for s in body["step_executions"]] == ["out 1", "out 2", "out 3"]
+    assert [s["memoized"] for s in body["step_executions"]] == [True, True, True]
+    assert mock_provider.execute.call_count == 3
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_template_change_reruns_only_affected_steps(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = ["out 1", "out 2", "out 3", "new 2", "new 3"]
+    mock_get_provider.return_value = mock_provider
+    pipeline_id = _create_three_step_pipeline(client, auth_headers)
+    client.post(f"/api/pipelines/{pipeline_id}/execute", json={"variables": {"input": "hello"}}, headers=auth_headers)
+    step_2_template = client.get(f"/api/pipelines/{pipeline_id}", headers=auth_headers).json()["steps"][1]["template_id"]
+    client.put(f"/api/templates/{step_2_template}", json={"content": "Rewrite {{a}}"}, headers=auth_headers)
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"input": "hello"}},
+        headers=auth_headers,
+    )
+
+    # Then
+    body = response.json()
+    assert [s["output"] for s in body["step_executions"]] == ["out 1", "new 2", "new 3"]
+    assert [s["memoized"] for s in body["step_executions"]] == [True, False, False]
+    assert [call.args[0] for call in mock_provider.execute.call_args_list[3:]] == ["Rewrite out 1", "new 2"]
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_force_bypasses_memoization(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "output"
+    mock_get_provider.return_value = mock_provider
+    pipeline_id = _create_three_step_pipeline(client, auth_headers)
+    client.post(f"/api/pipelines/{pipeline_id}/execute", json={"variables": {"input": "hello"}}, headers=auth_headers)
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"input": "hello"}, "force": True},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert [s["memoized"] for s in response.json()["step_executions"]] == [False, False, False]
+    assert mock_provider.execute.call_count == 6
+
+
+def _create_map_reduce_pipeline(client, headers, split_by, aggregate):
+    map_template = _create_template(client, headers, name="Summarise", content="sum({{item}})").json()["id"]
+    steps = [
+        {"step_type": "split", "output_variable": "chunks", "options": {"input_variable": "doc", "split_by": split_by}},
+        {
+            "step_type": "map",
+            "template_id": map_template,
+            "provider": "openai",
+            "model": "gpt-4o-mini",
+            "output_variable": "summaries",
+            "options": {"input_variable": "chunks", "max_concurrency": 2},
+        },
+        {"step_type": "aggregate", "output_variable": "result", "options": {"input_variable": "summaries", **aggregate}},
+    ]
+    if aggregate.get("aggregate") == "tree":
+        steps[2].update(template_id=map_template, provider="openai", model="gpt-4o-mini")
+    return _create_pipeline(client, headers, [], steps=steps)
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_split_map_concat_pipeline(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = lambda prompt, model: prompt.upper()
+    mock_get_provider.return_value = mock_provider
+    pipeline = _create_map_reduce_pipeline(
+        client, auth_headers, "paragraphs", {"aggregate": "concat", "separator": " + "}
+    ).json()
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline['id']}/execute",
+        json={"variables": {"doc": "one\n\ntwo\n\nthree"}, "force": True},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert [s["step_type"] for s in pipeline["steps"]] == ["split", "map", "aggregate"]
+    assert pipeline["steps"][0]["template_id"] is None
+    body = response.json()
+    assert body["status"] == "completed"
+    outputs = [s["output"] for s in body["step_executions"]]
+    assert json.loads(outputs[0]) == ["one\n\ntwo\n\nthree"]
+    assert outputs[2] == "SUM(ONE\n\nTWO\n\nTHREE)"
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_map_runs_items_concurrently_under_cap(mock_get_provider, client, auth_headers):
+    # Given
+    in_flight, peak = 0, 0
+
+    async def execute(prompt, model):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return prompt
+
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = execute
+    mock_get_provider.return_value = mock_provider
+    pipeline = _create_map_reduce_pipeline(client, auth_headers, "json", {"aggregate": "concat", "separator": ","}).json()
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline['id']}/execute",
+        json={"variables": {"doc": json.dumps(["a", "b", "c", "d", "e"])}},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.json()["step_executions"][2]["output"] == "sum(a),sum(b),sum(c),sum(d),sum(e)"
+    assert mock_provider.execute.call_count == 5
+    assert peak == 2
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_tree_reduce_combines_in_levels(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = lambda prompt, model: prompt
+    mock_get_provider.return_value = mock_provider
+    pipeline = _create_map_reduce_pipeline(
+        client, auth_headers, "json", {"aggregate": "tree", "fan_in": 2, "separator": "+"}
+    ).json()
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline['id']}/execute",
+        json={"variables": {"doc": json.dumps(["a", "b", "c", "d", "e"])}},
+        headers=auth_headers,
+    )
+
+    # Then
+    result = response.json()["step_executions"][2]["output"]
+    assert result == "sum(sum(sum(sum(a)+sum(b))+sum(sum(c)+sum(d)))+sum(sum(sum(e))))"
+    # 5 map calls, then reduce levels of 3, 2 and 1 calls
+    assert mock_provider.execute.call_count == 11
+
+
+def test_map_step_requires_template(client, auth_headers):
+    # When
+    response = _create_pipeline(
+        client,
+        auth_headers,
+        [],
+        steps=[{"step_type": "map", "output_variable": "out", "options": {"input_variable": "doc"}}],
+    )
+
+    # Then
+    assert response.status_code == 422
+
+
+def _create_routed_pipeline(client, headers, router_step):
+    french = _create_template(client, headers, name="French", content="Réponds: {{question}}").json()["id"]
+    english = _create_template(client, headers, name="English", content="Answer: {{question}}").json()["id"]
+    polish = _create_template(client, headers, name="Polish", content="Polish: {{fr_answer}}").json()["id"]
+    llm = {"provider": "openai", "model": "gpt-4o-mini"}
+    steps = [
+        router_step,
+        {"template_id": french, **llm, "output_variable": "fr_answer", "options": {"router": "lang", "branch": "fr"}},
+        {"template_id": english, **llm, "output_variable": "en_answer", "options": {"router": "lang", "branch": "en"}},
+        {"template_id": polish, **llm, "output_variable": "polished"},
+    ]
+    return _create_pipeline(client, headers, [], steps=steps).json()["id"]
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_rule_router_runs_only_selected_branch(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = lambda prompt, model: f"<{prompt}>"
+    mock_get_provider.return_value = mock_provider
+    pipeline_id = _create_routed_pipeline(
+        client,
+        auth_headers,
+        {
+            "step_type": "route",
+            "output_variable": "lang",
+            "options": {
+                "input_variable": "locale",
+                "routes": [{"branch": "fr", "match": "regex", "value": "^fr"}],
+                "default_branch": "en",
+            },
+        },
+    )
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"locale": "en-GB", "question": "Why?"}},
+        headers=auth_headers,
+    )
+
+    # Then
+    body = response.json()
+    assert body["status"] == "completed"
+    assert [s["status"] for s in body["step_executions"]] == ["completed", "skipped", "completed", "skipped"]
+    assert [s["output"] for s in body["step_executions"]] == ["en", None, "<Answer: Why?>", None]
+    assert [call.args[0] for call in mock_provider.execute.call_args_list] == ["Answer: Why?"]
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_branches_writing_the_same_variable_join(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = lambda prompt, model: f"<{prompt}>"
+    mock_get_provider.return_value = mock_provider
+    french = _create_template(client, auth_headers, name="French", content="Réponds: {{question}}").json()["id"]
+    english = _create_template(client, auth_headers, name="English", content="Answer: {{question}}").json()["id"]
+    polish = _create_template(client, auth_headers, name="Polish", content="Polish {{answer}}").json()["id"]
+    llm = {"provider": "openai", "model": "gpt-4o-mini"}
+    steps = [
+        {
+            "step_type": "route",
+            "output_variable": "lang",
+            "options": {
+                "input_variable": "locale",
+                "routes": [{"branch": "fr", "match": "regex", "value": "^fr"}],
+                "default_branch": "en",
+            },
+        },
+        {"template_id": french, **llm, "output_variable": "answer", "options": {"router": "lang", "branch": "fr"}},
+        {"template_id": english, **llm, "output_variable": "answer", "options": {"router": "lang", "branch": "en"}},
+        {"template_id": polish, **llm, "output_variable": "polished"},
+    ]
+    pipeline_id = _create_pipeline(client, auth_headers, [], steps=steps).json()["id"]
+
+    # When
+    responses = [
+        client.post(
+            f"/api/pipelines/{pipeline_id}/execute",
+            json={"variables": {"locale": locale, "question": "Why?"}},
+            headers=auth_headers,
+        ).json()
+        for locale in ("fr-FR", "en-GB")
+    ]
+
+    # Then
+    french_run, english_run = responses
+    assert [s["status"] for s in french_run["step_executions"]] == ["completed", "completed", "skipped", "completed"]
+    assert french_run["step_executions"][3]["output"] == "<Polish <Réponds: Why?>>"
+    assert [s["status"] for s in english_run["step_executions"]] == ["completed", "skipped", "completed", "completed"]
+    assert english_run["step_executions"][3]["output"] == "<Polish <Answer: Why?>>"
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_classifier_router_uses_model_output(mock_get_provider, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = ["French.", "Parce que.", "Parce que !"]
+    mock_get_provider.return_value = mock_provider
+    classify = _create_template(client, auth_headers, name="Classify", content="Language of: {{question}}").json()["id"]
+    pipeline_id = _create_routed_pipeline(
+        client,
+        auth_headers,
+        {
+            "step_type": "route",
+            "template_id": classify,
+            "provider": "openai",
+            "model": "gpt-4o-mini",
+            "output_variable": "lang",
+            "options": {
+                "input_variable": "question",
+                "routes": [
+                    {"branch": "fr", "match": "contains", "value": "french"},
+                    {"branch": "en", "match": "contains", "value": "english"},
+                ],
+            },
+        },
+    )
+
+    # When
+    response = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"question": "Pourquoi ?"}},
+        headers=auth_headers,
+    )
+
+    # Then
+    body = response.json()
+    assert [s["status"] for s in body["step_executions"]] == ["completed", "completed", "skipped", "completed"]
+    assert body["step_executions"][0]["output"] == "fr"
+    assert [call.args[0] for call in mock_provider.execute.call_args_list] == [
+        "Language of: Pourquoi ?",
+        "Réponds: Pourquoi ?",
+        "Polish: Parce que.",
+    ]
+
+
 def test_delete_pipeline(client, auth_headers):
     # Given
     t1 = _create_template(client, auth_headers, name="Template", content="{{x}}")
@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from app.engine.prompt_segments import split_cache_prefixes
+from app.engine.providers.anthropic_provider import AnthropicProvider, _user_message
+from app.engine.providers.base import LLMProvider
+from app.engine.providers.call_stats import record_cache_usage, track_call
+from app.engine.providers.openai_provider import OpenAIProvider
+
+
+def test_prompt_without_breaks_is_plain_text():
+    # When / Then
+    assert _user_message("hello") == {"role": "user", "content": "hello"}
+
+
+def test_cache_breaks_become_cache_control_blocks():
+    # When
+    message = _user_message("SYSTEM{{/cache}}DOC{{/cache}}question")
+
+    # Then
+    assert message["content"] == [
+        {"type": "text", "text": "SYSTEM", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "DOC", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "question"},
+    ]
+
+
+def test_extra_breaks_merge_into_the_first_prefix():
+    # When
+    prefixes, tail = split_cache_prefixes("a{{/cache}}b{{/cache}}c{{/cache}}d{{/cache}}e{{/cache}}f")
+
+    # Then
+    assert prefixes == ["ab", "c", "d", "e"]
+    assert tail == "f"
+
+
+def test_anthropic_records_cache_tokens():
+    # Given
+    provider = AnthropicProvider()
+    provider.client = SimpleNamespace(messages=SimpleNamespace(create=AsyncMock()))
+    provider.client.messages.create.return_value = SimpleNamespace(
+        content=[SimpleNamespace(text="answer")],
+        usage=SimpleNamespace(
+            input_tokens=12, output_tokens=40, cache_read_input_tokens=1800, cache_creation_input_tokens=0
+        ),
+    )
+
+    async def run():
+        with track_call() as call:
+            output = await provider.execute("DOC{{/cache}}question", "claude-haiku-4-5-20251001")
+        return output, call
+
+    # When
+    output, call = asyncio.run(run())
+
+    # Then
+    assert output == "answer"
+    assert (call.cache_read_tokens, call.cache_write_tokens) == (1800, 0)
+    assert (call.input_tokens, call.output_tokens) == (1812, 40)
+    sent = provider.client.messages.create.call_args.kwargs["messages"][0]["content"]
+    assert sent[0]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_openai_strips_breaks_and_records_cached_prefix():
+    # Given
+    provider = OpenAIProvider()
+    create = AsyncMock(
+        return_value=SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="answer"))],
+            usage=SimpleNamespace(
+                prompt_tokens=1100, completion_tokens=30, prompt_tokens_details=SimpleNamespace(cached_tokens=1024)
+            ),
+        )
+    )
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def run():
+        with track_call() as call:
+            await provider.execute("DOC{{/cache}}question", "gpt-4o-mini")
+        return call
+
+    # When
+    call = asyncio.run(run())
+
+    # Then
+    assert create.call_args.kwargs["messages"] == [{"role": "user", "content": "DOCquestion"}]
+    assert call.cache_read_tokens == 1024
+    assert (call.input_tokens, call.output_tokens) == (1100, 30)
+
+
+@patch("app.services.execution_service.get_provider")
+def test_execution_records_cache_tokens(mock_get_provider, client, auth_headers):
+    # Given
+    class _CachedProvider(LLMProvider):
+        async def execute(self, prompt, model):
+            record_cache_usage(900, 100)
+            return "ok"
+
+    mock_get_provider.return_value = _CachedProvider()
+    template_id = client.post(
+        "/api/templates/",
+        json={"name": "Cached", "description": None, "content": "{{doc}}{{/cache}}Q: {{q}}"},
+        headers=auth_headers,
+    ).json()["id"]
+
+    # When
+    response = client.post(
+        "/api/executions/",
+        json={
+            "template_id": template_id,
+            "provider": "anthropic",
+            "model": "claude-haiku-4-5-20251001",
+            "variables": {"doc": "long", "q": "why"},
+        },
+        headers=auth_headers,
+    )
+
+    # Then
+    body = response.json()
+    assert body["status"] == "completed"
+    assert (body["cache_read_tokens"], body["cache_write_tokens"]) == (900, 100)
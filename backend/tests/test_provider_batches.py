@@ -0,0 +1,217 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.engine.provider_batches import ProviderBatchCoordinator
+from app.engine.providers.base import BatchResult
+from app.engine.providers.mock_provider import MockProvider
+from app.models.batch import ProviderBatchJob
+from app.worker import ExecutionWorker
+
+
+class PendingBatchProvider(MockProvider):
+    """Keeps batches in flight until the test releases them."""
+
+    def __init__(self):
+        super().__init__()
+        self.ended = False
+
+    async def poll_batch(self, batch_id):
+        if not self.ended:
+            return None
+        return await super().poll_batch(batch_id)
+
+
+def _create_template(client, headers, content="Hello {{name}}"):
+    return client.post(
+        "/api/templates/",
+        json={"name": "Offline Template", "description": None, "content": content},
+        headers=headers,
+    ).json()["id"]
+
+
+def _submit_offline_batch(client, headers, template_id, variable_sets):
+    with patch("app.api.batches.spawn") as mock_spawn:
+        response = client.post(
+            "/api/batches/",
+            json={
+                "template_id": template_id,
+                "provider": "anthropic",
+                "model": "claude-sonnet-4-5-20250929",
+                "variable_sets": variable_sets,
+                "mode": "offline",
+            },
+            headers=headers,
+        )
+    assert not mock_spawn.called
+    return response
+
+
+def test_offline_batch_round_trips_through_provider_batch(client, auth_headers, db_session):
+    # Given
+    provider = PendingBatchProvider()
+    template_id = _create_template(client, auth_headers)
+    response = _submit_offline_batch(
+        client, auth_headers, template_id, [{"name": "Ada"}, {"name": "Linus"}, {}]
+    )
+    batch_id = response.json()["id"]
+    coordinator = ProviderBatchCoordinator(db_session)
+
+    # When
+    with patch("app.engine.provider_batches.get_provider", return_value=provider):
+        submitted = asyncio.run(coordinator.submit_pending())
+        in_flight = client.get(f"/api/batches/{batch_id}", headers=auth_headers).json()
+        provider.ended = True
+        collected = asyncio.run(coordinator.collect_finished())
+
+    # Then
+    assert response.status_code == 202
+    assert response.json()["mode"] == "offline"
+    assert submitted == 1
+    assert in_flight["running"] == 2
+    assert in_flight["failed"] == 1
+    assert collected == 1
+    batch = client.get(f"/api/batches/{batch_id}", headers=auth_headers).json()
+    assert batch["status"] == "completed"
+    assert batch["completed"] == 2
+    results = client.get(f"/api/batches/{batch_id}/results", headers=auth_headers).json()["results"]
+    assert [r["output"] for r in results[:2]] == [
+        "Mock response for: Hello Ada",
+        "Mock response for: Hello Linus",
+    ]
+    assert results[2]["error"] == "Missing variable: name"
+    job = db_session.query(ProviderBatchJob).one()
+    assert job.status == "ended"
+    assert job.request_count == 2
+
+
+def test_offline_batch_splits_jobs_at_request_limit(client, auth_headers, db_session):
+    # Given
+    template_id = _create_template(client, auth_headers)
+    _submit_offline_batch(client, auth_headers, template_id, [{"name": str(i)} for i in range(5)])
+    coordinator = ProviderBatchCoordinator(db_session, max_requests=2)
+
+    # When
+    with patch("app.engine.provider_batches.get_provider", return_value=MockProvider()):
+        submitted = asyncio.run(coordinator.submit_pending())
+
+    # Then
+    assert submitted == 3
+    assert [job.request_count for job in db_session.query(ProviderBatchJob).order_by(ProviderBatchJob.id)] == [2, 2, 1]
+
+
+def test_failed_submission_releases_rows(client, auth_headers, db_session):
+    # Given
+    class FailingProvider(MockProvider):
+        async def submit_batch(self, requests):
+            raise RuntimeError("batch quota exceeded")
+
+    template_id = _create_template(client, auth_headers)
+    response = _submit_offline_batch(client, auth_headers, template_id, [{"name": "Ada"}])
+    coordinator = ProviderBatchCoordinator(db_session)
+
+    # When
+    with patch("app.engine.provider_batches.get_provider", return_value=FailingProvider()):
+        submitted = asyncio.run(coordinator.submit_pending())
+
+    # Then
+    assert submitted == 0
+    assert db_session.query(ProviderBatchJob).count() == 0
+    batch = client.get(f"/api/batches/{response.json()['id']}", headers=auth_headers).json()
+    assert batch["running"] == 1
+
+
+def test_missing_results_fail_their_rows(client, auth_headers, db_session):
+    # Given
+    class LossyProvider(MockProvider):
+        async def poll_batch(self, batch_id):
+            results = await super().poll_batch(batch_id)
+            return [BatchResult("unrelated-1", output="?")] + results[1:]
+
+    template_id = _create_template(client, auth_headers)
+    response = _submit_offline_batch(client, auth_headers, template_id, [{"name": "Ada"}, {"name": "Bob"}])
+    coordinator = ProviderBatchCoordinator(db_session)
+
+    # When
+    with patch("app.engine.provider_batches.get_provider", return_value=LossyProvider()):
+        asyncio.run(coordinator.submit_pending())
+        asyncio.run(coordinator.collect_finished())
+
+    # Then
+    results = client.get(f"/api/batches/{response.json()['id']}/results", headers=auth_headers).json()["results"]
+    assert results[0]["status"] == "failed"
+    assert results[0]["error"] == "No result returned by provider batch"
+    assert results[1]["output"] == "Mock response for: Hello Bob"
+
+
+def test_oversized_rows_are_not_submitted(client, auth_headers, db_session):
+    # Given
+    template_id = _create_template(client, auth_headers, content="{{text}}")
+    response = _submit_offline_batch(
+        client, auth_headers, template_id, [{"text": "short"}, {"text": "word " * 130_000}]
+    )
+    coordinator = ProviderBatchCoordinator(db_session)
+
+    # When
+    with patch("app.engine.provider_batches.get_provider", return_value=MockProvider()):
+        asyncio.run(coordinator.submit_pending())
+
+    # Then
+    results = client.get(f"/api/batches/{response.json()['id']}/results", headers=auth_headers).json()["results"]
+    assert results[1]["status"] == "failed"
+    assert "context window" in results[1]["error"]
+    assert db_session.query(ProviderBatchJob).one().request_count == 1
+
+
+def test_worker_runs_provider_batch_cycle(client, auth_headers, db_engine):
+    # Given
+    template_id = _create_template(client, auth_headers)
+    response = _submit_offline_batch(client, auth_headers, template_id, [{"name": "Ada"}])
+    worker = ExecutionWorker(session_factory=sessionmaker(bind=db_engine, expire_on_commit=False))
+
+    # When
+    with patch("app.engine.provider_batches.get_provider", return_value=MockProvider()):
+        asyncio.run(worker.run_provider_batches_once())
+
+    # Then
+    batch = client.get(f"/api/batches/{response.json()['id']}", headers=auth_headers).json()
+    assert batch["completed"] == 1
+
+
+def test_offline_mode_rejects_pipeline_batches(client, auth_headers):
+    # When
+    response = client.post(
+        "/api/batches/",
+        json={"pipeline_id": 1, "variable_sets": [{}], "mode": "offline"},
+        headers=auth_headers,
+    )
+
+    # Then
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("mode", ["interactive", "offline"])
+def test_batch_mode_is_reported(client, auth_headers, mode):
+    # Given
+    template_id = _create_template(client, auth_headers)
+
+    # When
+    with patch("app.api.batches.spawn") as mock_spawn:
+        response = client.post(
+            "/api/batches/",
+            json={
+                "template_id": template_id,
+                "provider": "openai",
+                "model": "gpt-4o-mini",
+                "variable_sets": [{"name": "Ada"}],
+                "mode": mode,
+            },
+            headers=auth_headers,
+        )
+        for call in mock_spawn.call_args_list:
+            call.args[0].close()
+
+    # Then
+    assert response.json()["mode"] == mode
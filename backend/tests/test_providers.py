@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.engine.providers.base import LLMProvider
+from app.engine.providers.registry import ProviderRegistry
+
+
+class _CountingProvider(LLMProvider):
+    MODELS = ["counting-model"]
+    instances = 0
+    closed = 0
+
+    def __init__(self):
+        type(self).instances += 1
+
+    async def execute(self, prompt: str, model: str) -> str:
+        return prompt
+
+    async def aclose(self) -> None:
+        type(self).closed += 1
+
+
+@pytest.fixture(autouse=True)
+def _reset_counters():
+    _CountingProvider.instances = 0
+    _CountingProvider.closed = 0
+
+
+def test_registry_reuses_provider_instances():
+    # Given
+    registry = ProviderRegistry({"counting": _CountingProvider})
+
+    # When
+    first = registry.get("counting")
+    second = registry.get("counting")
+
+    # Then
+    assert first is second
+    assert _CountingProvider.instances == 1
+
+
+def test_registry_closes_providers():
+    # Given
+    registry = ProviderRegistry({"counting": _CountingProvider})
+    registry.get("counting")
+
+    # When
+    asyncio.run(registry.aclose())
+
+    # Then
+    assert _CountingProvider.closed == 1
+    registry.get("counting")
+    assert _CountingProvider.instances == 2
+
+
+def test_registry_rejects_unknown_provider():
+    # Given
+    registry = ProviderRegistry({})
+
+    # When / Then
+    with pytest.raises(ValueError, match="Unknown provider: nope"):
+        registry.get("nope")
+
+
+def test_list_providers_returns_models(client, auth_headers):
+    # When
+    response = client.get("/api/providers/", headers=auth_headers)
+
+    # Then
+    assert response.status_code == 200
+    providers = {p["name"]: p["models"] for p in response.json()["providers"]}
+    assert "gpt-4o-mini" in providers["openai"]
+    assert "claude-sonnet-4-5-20250929" in providers["anthropic"]
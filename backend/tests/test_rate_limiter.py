@@ -0,0 +1,238 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.engine.providers.base import LLMProvider, ProviderRateLimitError
+from app.engine.providers.http_options import retry_after_seconds
+from app.engine.providers.rate_limited_provider import RateLimitedProvider
+from app.engine.rate_limiter import AdaptiveLimiter, RateLimiterRegistry
+
+
+class _ThrottledProvider(LLMProvider):
+    """Rejects calls beyond ``capacity`` concurrent requests with a 429."""
+
+    def __init__(self, capacity: int, retry_after: float | None = 0.0):
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+        self.rejections = 0
+
+    async def execute(self, prompt: str, model: str) -> str:
+        self.calls += 1
+        if self.in_flight >= self.capacity:
+            self.rejections += 1
+            raise ProviderRateLimitError("rate limited", self.retry_after)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            return prompt
+        finally:
+            self.in_flight -= 1
+
+
+def _limiter(**overrides) -> AdaptiveLimiter:
+    options = {"initial_concurrency": 4, "min_concurrency": 1, "max_concurrency": 16}
+    return AdaptiveLimiter(**{**options, **overrides})
+
+
+def test_limiter_widens_on_success():
+    # Given
+    limiter = _limiter(initial_concurrency=2)
+
+    async def run():
+        for _ in range(10):
+            limiter.release(await limiter.acquire())
+
+    # When
+    asyncio.run(run())
+
+    # Then
+    assert limiter.limit > 4
+    assert limiter.in_flight == 0
+
+
+def test_limiter_halves_once_per_overload():
+    # Given
+    limiter = _limiter(initial_concurrency=8)
+
+    async def run():
+        tickets = [await limiter.acquire() for _ in range(4)]
+        for ticket in tickets:
+            limiter.release_rate_limited(ticket, retry_after=0.0)
+
+    # When
+    asyncio.run(run())
+
+    # Then
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_limiter_queues_callers_over_the_limit():
+    # Given
+    limiter = _limiter(initial_concurrency=1, max_concurrency=1)
+    order = []
+
+    async def worker(name):
+        ticket = await limiter.acquire()
+        order.append(f"{name}-start")
+        await asyncio.sleep(0.01)
+        order.append(f"{name}-end")
+        limiter.release(ticket)
+
+    async def run():
+        await asyncio.gather(worker("a"), worker("b"))
+
+    # When
+    asyncio.run(run())
+
+    # Then
+    assert order == ["a-start", "a-end", "b-start", "b-end"]
+
+
+def test_limiter_token_bucket_spaces_requests():
+    # Given
+    limiter = _limiter(requests_per_second=10)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(12):
+            limiter.release(await limiter.acquire())
+        return loop.time() - started
+
+    # When
+    elapsed = asyncio.run(run())
+
+    # Then
+    assert 0.15 <= elapsed < 1.0
+
+
+def test_limiter_waits_for_retry_after():
+    # Given
+    limiter = _limiter()
+
+    async def run():
+        limiter.release_rate_limited(await limiter.acquire(), retry_after=0.05)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        limiter.release(await limiter.acquire())
+        return loop.time() - started
+
+    # When
+    elapsed = asyncio.run(run())
+
+    # Then
+    assert elapsed >= 0.04
+
+
+def test_rate_limited_provider_retries_429s_without_failing():
+    # Given
+    provider = _ThrottledProvider(capacity=3)
+    limited = RateLimitedProvider(provider, "throttled", RateLimiterRegistry(), max_retries=50)
+
+    async def run():
+        return await asyncio.gather(*(limited.execute(f"p{i}", "m") for i in range(30)))
+
+    # When
+    outputs = asyncio.run(run())
+
+    # Then
+    assert outputs == [f"p{i}" for i in range(30)]
+    assert provider.peak <= 3
+    assert provider.rejections < 30
+
+
+def test_rate_limited_provider_gives_up_after_max_retries():
+    # Given
+    provider = _ThrottledProvider(capacity=0)
+    limited = RateLimitedProvider(provider, "throttled", RateLimiterRegistry(), max_retries=2)
+
+    # When / Then
+    with pytest.raises(ProviderRateLimitError):
+        asyncio.run(limited.execute("p", "m"))
+    assert provider.calls == 3
+
+
+def test_failed_calls_free_their_slot_without_widening_the_window():
+    # Given
+    class FailingProvider(LLMProvider):
+        async def execute(self, prompt: str, model: str) -> str:
+            raise RuntimeError("upstream error")
+
+    registry = RateLimiterRegistry()
+    limited = RateLimitedProvider(FailingProvider(), "failing", registry)
+    limit = registry.get("failing", "m").limit
+
+    async def run():
+        for _ in range(20):
+            with pytest.raises(RuntimeError):
+                await limited.execute("p", "m")
+
+    # When
+    asyncio.run(run())
+
+    # Then
+    limiter = registry.get("failing", "m")
+    assert limiter.limit == limit
+    assert limiter.in_flight == 0
+
+
+def test_registry_applies_provider_and_model_overrides():
+    # Given
+    registry = RateLimiterRegistry(
+        {
+            "anthropic": {"max_concurrency": 10, "requests_per_second": 5},
+            "anthropic:claude-haiku-4-5-20251001": {"max_concurrency": 2},
+        }
+    )
+
+    # When
+    haiku = registry.get("anthropic", "claude-haiku-4-5-20251001")
+    sonnet = registry.get("anthropic", "claude-sonnet-4-5-20250929")
+
+    # Then
+    assert haiku.max_concurrency == 2
+    assert haiku.requests_per_second == 5
+    assert sonnet.max_concurrency == 10
+    assert registry.get("anthropic", "claude-haiku-4-5-20251001") is haiku
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"retry-after": "7"}, 7.0),
+        ({"retry-after-ms": "250", "retry-after": "7"}, 0.25),
+        ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+        ({}, None),
+    ],
+)
+def test_retry_after_seconds(headers, expected):
+    assert retry_after_seconds(httpx.Headers(headers)) == expected
+
+
+def test_limits_endpoint_reports_limiters(client, auth_headers):
+    # Given
+    template_id = client.post(
+        "/api/templates/",
+        json={"name": "Limited", "description": None, "content": "Hi"},
+        headers=auth_headers,
+    ).json()["id"]
+    client.post(
+        "/api/executions/",
+        json={"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "variables": {}},
+        headers=auth_headers,
+    )
+
+    # When
+    response = client.get("/api/providers/limits", headers=auth_headers)
+
+    # Then
+    assert response.status_code == 200
+    limiter = next(item for item in response.json()["limiters"] if item["provider"] == "openai")
+    assert limiter["model"] == "gpt-4o-mini"
+    assert limiter["in_flight"] == 0
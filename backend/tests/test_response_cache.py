@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.engine.providers.registry import ProviderRegistry
+from app.engine.response_cache import ResponseCache, response_cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path, memory_entries=2, ttl_seconds=60, max_bytes=10_000)
+
+
+def test_cache_key_depends_on_every_component():
+    # Given
+    base = response_cache_key("anthropic", "claude", {"max_tokens": 10}, "Hi")
+
+    # When
+    variants = {
+        response_cache_key("openai", "claude", {"max_tokens": 10}, "Hi"),
+        response_cache_key("anthropic", "other", {"max_tokens": 10}, "Hi"),
+        response_cache_key("anthropic", "claude", {"max_tokens": 20}, "Hi"),
+        response_cache_key("anthropic", "claude", {"max_tokens": 10}, "Hello"),
+    }
+
+    # Then
+    assert base not in variants
+    assert len(variants) == 4
+
+
+def test_disk_tier_serves_entries_evicted_from_memory(cache):
+    # Given
+    asyncio.run(cache.set("aa1", "first"))
+    asyncio.run(cache.set("bb2", "second"))
+    asyncio.run(cache.set("cc3", "third"))
+
+    # When
+    result = asyncio.run(cache.get("aa1"))
+
+    # Then
+    assert result == "first"
+    assert cache.counters["disk_hits"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    # Given
+    cache = ResponseCache(tmp_path, memory_entries=2, ttl_seconds=0, max_bytes=10_000)
+    asyncio.run(cache.set("aa1", "stale"))
+    time.sleep(0.01)
+
+    # When
+    result = asyncio.run(cache.get("aa1"))
+
+    # Then
+    assert result is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_evicts_oldest_entries_over_size_limit(tmp_path):
+    # Given
+    cache = ResponseCache(tmp_path, memory_entries=1, ttl_seconds=60, max_bytes=300)
+    asyncio.run(cache.set("aa1", "x" * 100))
+    old_file = next(tmp_path.glob("*/aa1.json"))
+    os.utime(old_file, (time.time() - 100, time.time() - 100))
+
+    # When
+    asyncio.run(cache.set("bb2", "y" * 100))
+    asyncio.run(cache.set("cc3", "z" * 100))
+
+    # Then
+    assert not old_file.exists()
+    assert cache.counters["evictions"] >= 1
+    assert asyncio.run(cache.get("cc3")) == "z" * 100
+
+
+def test_overwriting_an_entry_does_not_count_its_bytes_twice(tmp_path):
+    # Given
+    cache = ResponseCache(tmp_path, memory_entries=1, ttl_seconds=60, max_bytes=10_000)
+    asyncio.run(cache.set("aa1", "x" * 100))
+
+    # When
+    for _ in range(5):
+        asyncio.run(cache.set("aa1", "x" * 100))
+
+    # Then
+    assert cache._disk_bytes == next(tmp_path.glob("*/aa1.json")).stat().st_size
+    assert cache.counters["evictions"] == 0
+
+
+def _create_template(client, headers):
+    return client.post(
+        "/api/templates/",
+        json={"name": "Cached", "description": None, "content": "Hello {{name}}"},
+        headers=headers,
+    )
+
+
+def _execute(client, headers, template_id, cache_mode):
+    return client.post(
+        "/api/executions/",
+        json={
+            "template_id": template_id,
+            "provider": "anthropic",
+            "model": "claude-sonnet-4-5-20250929",
+            "variables": {"name": "World"},
+            "cache": cache_mode,
+        },
+        headers=headers,
+    )
+
+
+def test_cache_read_reuses_previous_response(client, auth_headers, tmp_path):
+    # Given
+    provider = AsyncMock()
+    provider.execute.return_value = "Fresh response"
+    provider.generation_params = lambda: {}
+    template_id = _create_template(client, auth_headers).json()["id"]
+    cache = ResponseCache(tmp_path, memory_entries=8, ttl_seconds=60, max_bytes=10_000)
+
+    with (
+        patch("app.engine.providers.provider_registry", ProviderRegistry({"anthropic": lambda: provider})),
+        patch("app.engine.providers.response_cache", cache),
+    ):
+        # When
+        first = _execute(client, auth_headers, template_id, "read")
+        second = _execute(client, auth_headers, template_id, "read")
+        bypassed = _execute(client, auth_headers, template_id, "bypass")
+
+    # Then
+    assert first.json()["output"] == "Fresh response"
+    assert second.json()["output"] == "Fresh response"
+    assert bypassed.json()["status"] == "completed"
+    assert provider.execute.await_count == 2
+    assert cache.counters["memory_hits"] == 1
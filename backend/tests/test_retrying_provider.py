@@ -0,0 +1,235 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.engine.providers.base import LLMProvider, ProviderTransientError
+from app.engine.providers.call_stats import track_call
+from app.engine.providers.mock_provider import MockProvider
+from app.engine.providers.rate_limited_provider import RateLimitedProvider
+from app.engine.providers.retrying_provider import LatencyTracker, RetryingProvider, RetryPolicy
+from app.engine.rate_limiter import RateLimiterRegistry
+
+FAST_POLICY = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.001, deadline=5.0)
+
+
+class _FlakyProvider(LLMProvider):
+    def __init__(self, failures: list[Exception], delays: list[float] | None = None):
+        self.failures = list(failures)
+        self.delays = list(delays or [])
+        self.calls = 0
+
+    async def execute(self, prompt: str, model: str) -> str:
+        self.calls += 1
+        if self.delays:
+            await asyncio.sleep(self.delays.pop(0))
+        if self.failures:
+            raise self.failures.pop(0)
+        return f"ok after {self.calls}"
+
+
+def _run_tracked(coro_factory):
+    async def run():
+        with track_call() as call:
+            try:
+                return await coro_factory(), call
+            except Exception as e:
+                return e, call
+
+    return asyncio.run(run())
+
+
+def test_transient_errors_are_retried():
+    # Given
+    provider = RetryingProvider(
+        _FlakyProvider([ProviderTransientError("502"), ProviderTransientError("timeout")]), "flaky", FAST_POLICY
+    )
+
+    # When
+    output, call = _run_tracked(lambda: provider.execute("p", "m"))
+
+    # Then
+    assert output == "ok after 3"
+    assert call.attempts == 3
+
+
+def test_terminal_errors_are_not_retried():
+    # Given
+    flaky = _FlakyProvider([ValueError("invalid model")])
+    provider = RetryingProvider(flaky, "flaky", FAST_POLICY)
+
+    # When
+    error, call = _run_tracked(lambda: provider.execute("p", "m"))
+
+    # Then
+    assert isinstance(error, ValueError)
+    assert flaky.calls == 1
+    assert call.attempts == 1
+
+
+def test_retries_stop_at_max_attempts():
+    # Given
+    flaky = _FlakyProvider([ProviderTransientError("503")] * 5)
+    provider = RetryingProvider(flaky, "flaky", FAST_POLICY)
+
+    # When
+    error, call = _run_tracked(lambda: provider.execute("p", "m"))
+
+    # Then
+    assert isinstance(error, ProviderTransientError)
+    assert call.attempts == 3
+
+
+def test_deadline_bounds_the_whole_call():
+    # Given
+    flaky = _FlakyProvider([], delays=[1.0])
+    provider = RetryingProvider(flaky, "flaky", RetryPolicy(deadline=0.05))
+
+    # When
+    error, _ = _run_tracked(lambda: provider.execute("p", "m"))
+
+    # Then
+    assert isinstance(error, ProviderTransientError)
+    assert "deadline" in str(error)
+
+
+def test_backoff_is_capped_and_jittered():
+    # Given
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+
+    # When
+    delays = [policy.backoff(attempt) for attempt in range(1, 10) for _ in range(20)]
+
+    # Then
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_slow_call_is_hedged_and_fastest_wins():
+    # Given
+    latencies = LatencyTracker()
+    for _ in range(20):
+        latencies.record("flaky", "m", 0.01)
+    flaky = _FlakyProvider([], delays=[1.0, 0.0])
+    provider = RetryingProvider(flaky, "flaky", RetryPolicy(hedge=True), latencies)
+
+    # When
+    output, call = _run_tracked(lambda: provider.execute("p", "m"))
+
+    # Then
+    assert output == "ok after 2"
+    assert call.attempts == 2
+    assert call.hedged
+
+
+def test_hedging_waits_for_latency_samples():
+    # Given
+    flaky = _FlakyProvider([], delays=[0.05])
+    provider = RetryingProvider(flaky, "flaky", RetryPolicy(hedge=True), LatencyTracker())
+
+    # When
+    output, call = _run_tracked(lambda: provider.execute("p", "m"))
+
+    # Then
+    assert output == "ok after 1"
+    assert not call.hedged
+
+
+def test_stream_retries_before_first_chunk():
+    # Given
+    class _FlakyStream(MockProvider):
+        calls = 0
+
+        async def stream(self, prompt, model):
+            type(self).calls += 1
+            if self.calls == 1:
+                raise ProviderTransientError("connection reset")
+            async for text in super().stream(prompt, model):
+                yield text
+
+    provider = RetryingProvider(_FlakyStream(), "flaky", FAST_POLICY)
+
+    async def collect():
+        return "".join([text async for text in provider.stream("hi", "m")])
+
+    # When
+    output, call = _run_tracked(collect)
+
+    # Then
+    assert output == "Mock response for: hi"
+    assert call.attempts == 2
+
+
+@pytest.mark.parametrize("failures, attempts", [([], 1), ([ProviderTransientError("502")], 2)])
+def test_pipeline_step_records_attempts(client, auth_headers, failures, attempts):
+    # Given
+    flaky = _FlakyProvider(failures)
+    template_id = client.post(
+        "/api/templates/",
+        json={"name": "Retry", "description": None, "content": "{{input}}"},
+        headers=auth_headers,
+    ).json()["id"]
+    pipeline_id = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Retry Pipeline",
+            "description": None,
+            "steps": [
+                {"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "out"}
+            ],
+        },
+        headers=auth_headers,
+    ).json()["id"]
+    wrapped = RetryingProvider(RateLimitedProvider(flaky, "openai", RateLimiterRegistry()), "openai", FAST_POLICY)
+
+    # When
+    with patch("app.engine.pipeline_executor.get_provider", return_value=wrapped):
+        response = client.post(
+            f"/api/pipelines/{pipeline_id}/execute",
+            json={"variables": {"input": "hello"}},
+            headers=auth_headers,
+        )
+
+    # Then
+    step = response.json()["step_executions"][0]
+    assert step["status"] == "completed"
+    assert step["attempts"] == attempts
+
+
+def test_pipeline_step_records_hedging(client, auth_headers):
+    # Given
+    latencies = LatencyTracker()
+    for _ in range(20):
+        latencies.record("openai", "gpt-4o-mini", 0.01)
+    flaky = _FlakyProvider([], delays=[1.0, 0.0])
+    template_id = client.post(
+        "/api/templates/",
+        json={"name": "Hedge", "description": None, "content": "{{input}}"},
+        headers=auth_headers,
+    ).json()["id"]
+    pipeline_id = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Hedge Pipeline",
+            "description": None,
+            "steps": [
+                {"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "out"}
+            ],
+        },
+        headers=auth_headers,
+    ).json()["id"]
+    wrapped = RetryingProvider(flaky, "openai", RetryPolicy(hedge=True), latencies)
+
+    # When
+    with patch("app.engine.pipeline_executor.get_provider", return_value=wrapped):
+        response = client.post(
+            f"/api/pipelines/{pipeline_id}/execute",
+            json={"variables": {"input": "hello"}},
+            headers=auth_headers,
+        )
+
+    # Then
+    step = response.json()["step_executions"][0]
+    assert step["status"] == "completed"
+    assert step["hedged"] is True
+    assert step["attempts"] == 2
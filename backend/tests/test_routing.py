@@ -0,0 +1,38 @@
+import pytest
+
+from app.engine.routing import select_branch
+
+ROUTES = [
+    {"branch": "billing", "match": "contains", "value": "invoice"},
+    {"branch": "bug", "match": "regex", "value": r"\berror \d+"},
+    {"branch": "other", "match": "equals", "value": "Other"},
+]
+
+
+@pytest.mark.parametrize(
+    "value, branch",
+    [
+        ("Question about my INVOICE", "billing"),
+        ("Got error 500 on login", "bug"),
+        ("  other ", "other"),
+    ],
+)
+def test_first_matching_rule_wins(value, branch):
+    # When / Then
+    assert select_branch(value, ROUTES, None) == branch
+
+
+def test_falls_back_to_default_branch():
+    # When / Then
+    assert select_branch("hello", ROUTES, "general") == "general"
+
+
+def test_no_match_without_default_raises():
+    # When / Then
+    with pytest.raises(ValueError, match="No route matched"):
+        select_branch("hello", ROUTES, None)
+
+
+def test_without_rules_the_value_is_the_branch():
+    # When / Then
+    assert select_branch(" billing\n", [], None) == "billing"
@@ -0,0 +1,132 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.engine.providers.base import LLMProvider
+from app.engine.providers.call_stats import track_call
+from app.engine.providers.coalescing_provider import CoalescingProvider
+from app.engine.providers.registry import ProviderRegistry
+from app.engine.single_flight import SingleFlight
+
+
+class _SlowProvider(LLMProvider):
+    def __init__(self, error: Exception | None = None):
+        self.calls = 0
+        self.error = error
+
+    async def execute(self, prompt: str, model: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        if self.error:
+            raise self.error
+        return f"out:{prompt}"
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    # Given
+    upstream = _SlowProvider()
+    provider = CoalescingProvider(upstream, "openai", SingleFlight())
+
+    async def tracked(prompt):
+        with track_call() as call:
+            return await provider.execute(prompt, "gpt-4o-mini"), call.coalesced
+
+    async def run():
+        return await asyncio.gather(*(tracked("same") for _ in range(5)), tracked("other"))
+
+    # When
+    results = asyncio.run(run())
+
+    # Then
+    assert [output for output, _ in results] == ["out:same"] * 5 + ["out:other"]
+    assert [coalesced for _, coalesced in results] == [False, True, True, True, True, False]
+    assert upstream.calls == 2
+
+
+def test_sequential_calls_are_not_coalesced():
+    # Given
+    upstream = _SlowProvider()
+    provider = CoalescingProvider(upstream, "openai", SingleFlight())
+
+    async def run():
+        await provider.execute("same", "gpt-4o-mini")
+        await provider.execute("same", "gpt-4o-mini")
+
+    # When
+    asyncio.run(run())
+
+    # Then
+    assert upstream.calls == 2
+
+
+def test_shared_failure_reaches_every_caller():
+    # Given
+    upstream = _SlowProvider(error=RuntimeError("upstream down"))
+    provider = CoalescingProvider(upstream, "openai", SingleFlight())
+
+    async def run():
+        return await asyncio.gather(
+            *(provider.execute("same", "gpt-4o-mini") for _ in range(3)), return_exceptions=True
+        )
+
+    # When
+    results = asyncio.run(run())
+
+    # Then
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert upstream.calls == 1
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    # Given
+    upstream = _SlowProvider()
+    provider = CoalescingProvider(upstream, "openai", SingleFlight())
+
+    async def run():
+        first = asyncio.create_task(provider.execute("same", "gpt-4o-mini"))
+        second = asyncio.create_task(provider.execute("same", "gpt-4o-mini"))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    # When
+    output = asyncio.run(run())
+
+    # Then
+    assert output == "out:same"
+    assert upstream.calls == 1
+
+
+@pytest.mark.parametrize("coalesce, expected_calls", [(True, 1), (False, 4)])
+def test_batch_rows_coalesce_when_requested(client, auth_headers, coalesce, expected_calls):
+    # Given
+    upstream = _SlowProvider()
+    template_id = client.post(
+        "/api/templates/",
+        json={"name": "Coalesce", "description": None, "content": "Hello {{name}}"},
+        headers=auth_headers,
+    ).json()["id"]
+
+    # When
+    with (
+        patch("app.engine.providers.provider_registry", ProviderRegistry({"openai": lambda: upstream})),
+        patch("app.api.batches.spawn") as mock_spawn,
+    ):
+        response = client.post(
+            "/api/batches/",
+            json={
+                "template_id": template_id,
+                "provider": "openai",
+                "model": "gpt-4o-mini",
+                "variable_sets": [{"name": "Ada"}] * 4,
+                "coalesce": coalesce,
+            },
+            headers=auth_headers,
+        )
+        asyncio.run(mock_spawn.call_args.args[0])
+
+    # Then
+    assert upstream.calls == expected_calls
+    results = client.get(f"/api/batches/{response.json()['id']}/results", headers=auth_headers).json()
+    assert [r["output"] for r in results["results"]] == ["out:Hello Ada"] * 4
@@ -0,0 +1,100 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.engine.providers import anthropic_provider, openai_provider
+from app.engine.providers.anthropic_provider import AnthropicProvider
+from app.engine.providers.base import BatchRequest, ProviderRateLimitError, ProviderTransientError
+from app.engine.providers.call_stats import track_call
+from app.engine.providers.openai_provider import OpenAIProvider
+from stand_in.server import Faults, create_app
+
+
+def _provider(provider_class, faults: Faults | None = None):
+    """A real provider whose client talks to an in-process stand-in."""
+    application = create_app(faults or Faults(output_tokens=3))
+    module = anthropic_provider if provider_class is AnthropicProvider else openai_provider
+    options = {"transport": httpx.ASGITransport(app=application)}
+    with (
+        patch.object(module, "http_client_options", return_value=options),
+        patch.object(settings, "ANTHROPIC_BASE_URL", "http://stand-in"),
+        patch.object(settings, "OPENAI_BASE_URL", "http://stand-in/v1"),
+        patch.object(settings, "ANTHROPIC_API_KEY", "key"),
+        patch.object(settings, "OPENAI_API_KEY", "key"),
+    ):
+        return provider_class(), application.state.stand_in
+
+
+async def _stream(provider, prompt: str, model: str) -> str:
+    return "".join([chunk async for chunk in provider.stream(prompt, model)])
+
+
+@pytest.mark.parametrize("provider_class", [AnthropicProvider, OpenAIProvider])
+def test_real_clients_execute_and_stream(provider_class):
+    # Given
+    provider, stand_in = _provider(provider_class)
+
+    # When
+    output = asyncio.run(provider.execute("Hello", "model"))
+    streamed = asyncio.run(_stream(provider, "Hello", "model"))
+
+    # Then
+    assert output == "token0 token1 token2"
+    assert streamed == output
+    assert stand_in.calls == 2
+
+
+def test_anthropic_cache_breakpoints_report_writes_then_reads():
+    # Given
+    provider, _ = _provider(AnthropicProvider)
+    prompt = "A long shared instruction block.{{/cache}} Question"
+
+    async def run():
+        with track_call() as first:
+            await provider.execute(prompt, "model")
+        with track_call() as second:
+            await _stream(provider, prompt, "model")
+        return first, second
+
+    # When
+    first, second = asyncio.run(run())
+
+    # Then
+    assert (first.cache_read_tokens, first.cache_write_tokens > 0) == (0, True)
+    assert (second.cache_read_tokens, second.cache_write_tokens) == (first.cache_write_tokens, 0)
+
+
+@pytest.mark.parametrize("provider_class", [AnthropicProvider, OpenAIProvider])
+def test_injected_faults_surface_as_provider_errors(provider_class):
+    # Given
+    throttled, _ = _provider(provider_class, Faults(rate_limit_rate=1.0, retry_after=2.5))
+    failing, _ = _provider(provider_class, Faults(error_rate=1.0))
+
+    # When / Then
+    with pytest.raises(ProviderRateLimitError) as rate_limited:
+        asyncio.run(throttled.execute("Hello", "model"))
+    assert rate_limited.value.retry_after == 2.5
+    with pytest.raises(ProviderTransientError):
+        asyncio.run(failing.execute("Hello", "model"))
+
+
+@pytest.mark.parametrize("provider_class", [AnthropicProvider, OpenAIProvider])
+def test_batches_complete_with_results_and_errors(provider_class):
+    # Given
+    provider, _ = _provider(provider_class, Faults(output_tokens=2, error_rate=0.5, seed=3))
+    requests = [BatchRequest(f"row-{i}", f"Prompt {i}", "model") for i in range(6)]
+
+    async def run():
+        batch_id = await provider.submit_batch(requests)
+        return await provider.poll_batch(batch_id)
+
+    # When
+    results = asyncio.run(run())
+
+    # Then
+    assert sorted(result.custom_id for result in results) == [request.custom_id for request in requests]
+    assert {result.output for result in results if result.error is None} == {"token0 token1"}
+    assert 0 < sum(result.error is not None for result in results) < len(requests)
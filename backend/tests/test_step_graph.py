@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+from app.engine.step_graph import StepGraph
+from app.engine.variable_substitution import extract_variables
+
+
+def _step(step_id, output_variable):
+    return SimpleNamespace(id=step_id, output_variable=output_variable)
+
+
+def test_independent_steps_are_ready_immediately():
+    # Given
+    steps = [_step(1, "sentiment"), _step(2, "topics"), _step(3, "report")]
+    contents = {
+        1: "Sentiment of {{text}}",
+        2: "Topics of {{text}}",
+        3: "Combine {{sentiment}} and {{topics}}",
+    }
+
+    # When
+    graph = StepGraph(steps, {step_id: extract_variables(c) for step_id, c in contents.items()})
+
+    # Then
+    assert graph.is_ready(steps[0], {}, set())
+    assert graph.is_ready(steps[1], {}, set())
+    assert not graph.is_ready(steps[2], {1: "positive"}, set())
+    assert graph.is_ready(steps[2], {1: "positive", 2: "pricing"}, set())
+
+
+def test_context_uses_latest_earlier_producer():
+    # Given
+    steps = [_step(1, "draft"), _step(2, "draft"), _step(3, "final")]
+    contents = {1: "Write {{topic}}", 2: "Improve {{draft}}", 3: "Polish {{draft}}"}
+    graph = StepGraph(steps, {step_id: extract_variables(c) for step_id, c in contents.items()})
+
+    # When
+    context = graph.context_for(steps[2], {"topic": "cats"}, {1: "first", 2: "second"}, set())
+
+    # Then
+    assert context == {"topic": "cats", "draft": "second"}
+
+
+def test_step_does_not_depend_on_later_producer():
+    # Given
+    steps = [_step(1, "summary"), _step(2, "text")]
+    contents = {1: "Summarize {{text}}", 2: "Rewrite {{summary}}"}
+
+    # When
+    graph = StepGraph(steps, {step_id: extract_variables(c) for step_id, c in contents.items()})
+
+    # Then
+    assert graph.is_ready(steps[0], {}, set())
+    assert graph.context_for(steps[0], {"text": "input"}, {}, set()) == {"text": "input"}
+
+
+def test_skipped_branch_falls_back_to_producer_that_ran():
+    # Given
+    steps = [_step(1, "lang"), _step(2, "answer"), _step(3, "answer"), _step(4, "final")]
+    contents = {1: "Route {{locale}}", 2: "Réponds {{question}}", 3: "Answer {{question}}", 4: "Polish {{answer}}"}
+    graph = StepGraph(steps, {step_id: extract_variables(c) for step_id, c in contents.items()})
+    skipped = {3}
+
+    # When
+    ready = graph.is_ready(steps[3], {1: "fr", 2: "Parce que."}, skipped)
+    context = graph.context_for(steps[3], {}, {1: "fr", 2: "Parce que."}, skipped)
+
+    # Then
+    assert ready
+    assert not graph.missing_input(steps[3], skipped)
+    assert context == {"answer": "Parce que."}
+
+
+def test_step_waits_for_unskipped_branch():
+    # Given
+    steps = [_step(1, "answer"), _step(2, "answer"), _step(3, "final")]
+    contents = {1: "Réponds {{question}}", 2: "Answer {{question}}", 3: "Polish {{answer}}"}
+    graph = StepGraph(steps, {step_id: extract_variables(c) for step_id, c in contents.items()})
+
+    # When / Then
+    assert not graph.is_ready(steps[2], {}, {1})
+    assert graph.is_ready(steps[2], {2: "Because."}, {1})
+
+
+def test_input_is_missing_when_every_producer_was_skipped():
+    # Given
+    steps = [_step(1, "answer"), _step(2, "answer"), _step(3, "final")]
+    contents = {1: "Réponds {{question}}", 2: "Answer {{question}}", 3: "Polish {{answer}}"}
+    graph = StepGraph(steps, {step_id: extract_variables(c) for step_id, c in contents.items()})
+
+    # When / Then
+    assert graph.is_ready(steps[2], {}, {1, 2})
+    assert graph.missing_input(steps[2], {1, 2})
@@ -0,0 +1,52 @@
+import pytest
+
+from app.engine.text_splitter import split_text
+from app.engine.token_estimator import estimate_tokens
+
+
+def test_split_paragraphs_packs_whole_paragraphs():
+    # Given
+    text = "first one\n\nsecond one\n\n\nthird one"
+
+    # When
+    chunks = split_text(text, "paragraphs", chunk_size=6)
+
+    # Then
+    assert chunks == ["first one\n\nsecond one", "third one"]
+
+
+def test_split_lines_one_per_chunk():
+    # Given
+    text = "a\nb\n\nc\n"
+
+    # When
+    chunks = split_text(text, "lines", chunk_size=1)
+
+    # Then
+    assert chunks == ["a", "b", "c"]
+
+
+def test_split_tokens_respects_chunk_size():
+    # Given
+    text = " ".join(f"w{i}" for i in range(10))
+
+    # When
+    chunks = split_text(text, "tokens", chunk_size=3)
+
+    # Then
+    assert chunks == ["w0 w1 w2", "w3 w4 w5", "w6 w7 w8", "w9"]
+    assert all(estimate_tokens(chunk) <= 3 for chunk in chunks)
+
+
+def test_split_json_array():
+    # When
+    chunks = split_text('["a", {"b": 1}, 2]', "json", chunk_size=1)
+
+    # Then
+    assert chunks == ["a", '{"b": 1}', "2"]
+
+
+def test_split_json_rejects_non_array():
+    # When / Then
+    with pytest.raises(ValueError, match="Expected a JSON array"):
+        split_text('{"a": 1}', "json", chunk_size=1)
@@ -1,6 +1,11 @@
 import pytest
 
-from app.engine.variable_substitution import extract_variables, substitute_variables
+from app.engine.variable_substitution import (
+    CompiledTemplate,
+    compile_template_version,
+    extract_variables,
+    substitute_variables,
+)
 
 
 def test_substitute_variables():
@@ -46,3 +51,45 @@ def test_substitute_no_variables():
 
     # Then
     assert result == "Plain text without any variables."
+
+
+def test_compiled_template_matches_substitute_variables():
+    # Given
+    content = "{{greeting}} {{name}}, {{name}} is from {{place}}."
+    variables = {"greeting": "Hi", "name": "Alice", "place": "Wonderland"}
+
+    # When
+    compiled = CompiledTemplate(content)
+
+    # Then
+    assert compiled.variables == ["greeting", "name", "place"]
+    assert compiled.render(variables) == substitute_variables(content, variables)
+
+
+def test_compiled_template_raises_on_missing_variable():
+    # Given
+    compiled = CompiledTemplate("Hello {{name}}, welcome to {{place}}!")
+
+    # When / Then
+    with pytest.raises(ValueError, match="Missing variable: place"):
+        compiled.render({"name": "Alice"})
+
+
+def test_compiled_template_render_many():
+    # Given
+    compiled = CompiledTemplate("Hello {{name}}")
+
+    # When
+    result = compiled.render_many([{"name": "Alice"}, {"name": "Bob"}])
+
+    # Then
+    assert result == ["Hello Alice", "Hello Bob"]
+
+
+def test_compile_template_version_reuses_compiled_template():
+    # When
+    first = compile_template_version(-1, "Hello {{name}}")
+    second = compile_template_version(-1, "Hello {{name}}")
+
+    # Then
+    assert first is second
@@ -0,0 +1,403 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.execution import Execution, ExecutionStatus
+from app.models.pipeline import PipelineExecution, PipelineStepExecution
+from app.services.execution_queue import ExecutionQueue
+from app.worker import ExecutionWorker
+
+
+@pytest.fixture
+def queue_mode(monkeypatch):
+    monkeypatch.setattr(settings, "EXECUTION_MODE", "queue")
+
+
+@pytest.fixture
+def worker(db_engine):
+    return ExecutionWorker(session_factory=sessionmaker(bind=db_engine, expire_on_commit=False))
+
+
+def _create_template(client, headers, name="Test Template", content="Hello {{name}}"):
+    return client.post(
+        "/api/templates/",
+        json={"name": name, "description": "A test template", "content": content},
+        headers=headers,
+    )
+
+
+def _enqueue_execution(client, headers, template_id, name="World"):
+    return client.post(
+        "/api/executions/",
+        json={
+            "template_id": template_id,
+            "provider": "anthropic",
+            "model": "claude-sonnet-4-5-20250929",
+            "variables": {"name": name},
+        },
+        headers=headers,
+    )
+
+
+def test_queue_mode_returns_pending_execution(queue_mode, client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers).json()["id"]
+
+    # When
+    response = _enqueue_execution(client, auth_headers, template_id)
+
+    # Then
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] == "pending"
+    assert body["output"] is None
+
+
+@patch("app.services.execution_service.get_provider")
+def test_worker_runs_pending_execution(mock_get_provider, queue_mode, worker, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "Worker response"
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers).json()["id"]
+    execution_id = _enqueue_execution(client, auth_headers, template_id).json()["id"]
+
+    # When
+    processed = asyncio.run(worker.run_once())
+
+    # Then
+    assert processed is True
+    body = client.get(f"/api/executions/{execution_id}", headers=auth_headers).json()
+    assert body["status"] == "completed"
+    assert body["output"] == "Worker response"
+    mock_provider.execute.assert_awaited_once_with("Hello World", "claude-sonnet-4-5-20250929")
+
+
+@patch("app.services.execution_service.get_provider")
+def test_worker_applies_queued_execution_options(mock_get_provider, queue_mode, worker, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "Worker response"
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers).json()["id"]
+    client.post(
+        "/api/executions/",
+        json={
+            "template_id": template_id,
+            "provider": "anthropic",
+            "model": "claude-sonnet-4-5-20250929",
+            "variables": {"name": "World"},
+            "cache": "read",
+            "coalesce": True,
+        },
+        headers=auth_headers,
+    )
+
+    # When
+    asyncio.run(worker.run_once())
+
+    # Then
+    mock_get_provider.assert_called_once_with("anthropic", cache_mode="read", coalesce=True)
+
+
+@patch("app.services.execution_service.get_provider")
+def test_worker_applies_queued_comparison_options(mock_get_provider, queue_mode, worker, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "Worker response"
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers).json()["id"]
+    client.post(
+        "/api/comparisons/",
+        json={
+            "template_id": template_id,
+            "variables": {"name": "World"},
+            "targets": [{"provider": "openai", "model": "gpt-4o-mini"}],
+            "cache": "write",
+            "coalesce": True,
+        },
+        headers=auth_headers,
+    )
+
+    # When
+    asyncio.run(worker.run_once())
+
+    # Then
+    mock_get_provider.assert_called_once_with("openai", cache_mode="write", coalesce=True)
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_worker_runs_pending_pipeline_execution(mock_get_provider, queue_mode, worker, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "Step output"
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers, content="{{x}}").json()["id"]
+    pipeline = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Queued Pipeline",
+            "steps": [
+                {"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "out"},
+            ],
+        },
+        headers=auth_headers,
+    )
+    pipeline_id = pipeline.json()["id"]
+    enqueue_response = client.post(
+        f"/api/pipelines/{pipeline_id}/execute",
+        json={"variables": {"x": "hello"}},
+        headers=auth_headers,
+    )
+
+    # When
+    processed = asyncio.run(worker.run_once())
+
+    # Then
+    assert enqueue_response.status_code == 202
+    assert enqueue_response.json()["status"] == "pending"
+    assert processed is True
+    executions = client.get(f"/api/pipelines/{pipeline_id}/executions", headers=auth_headers).json()
+    assert executions["executions"][0]["status"] == "completed"
+    assert executions["executions"][0]["step_executions"][0]["output"] == "Step output"
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_worker_applies_queued_pipeline_options(mock_get_provider, queue_mode, worker, client, auth_headers):
+    # Given
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "Step output"
+    mock_get_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers, content="{{x}}").json()["id"]
+    pipeline_id = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Queued Pipeline",
+            "steps": [
+                {"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "out"},
+            ],
+        },
+        headers=auth_headers,
+    ).json()["id"]
+    for _ in range(2):
+        client.post(
+            f"/api/pipelines/{pipeline_id}/execute",
+            json={"variables": {"x": "hello"}, "force": True, "cache": "read", "coalesce": True},
+            headers=auth_headers,
+        )
+
+    # When
+    asyncio.run(worker.run_once())
+    asyncio.run(worker.run_once())
+
+    # Then
+    executions = client.get(f"/api/pipelines/{pipeline_id}/executions", headers=auth_headers).json()["executions"]
+    assert [e["step_executions"][0]["memoized"] for e in executions] == [False, False]
+    assert mock_provider.execute.await_count == 2
+    mock_get_provider.assert_called_with("openai", cache_mode="read", coalesce=True)
+
+
+def test_worker_reports_idle_when_queue_is_empty(worker):
+    # When
+    processed = asyncio.run(worker.run_once())
+
+    # Then
+    assert processed is False
+
+
+def test_claimed_execution_is_not_claimed_twice(queue_mode, db_session, client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers).json()["id"]
+    _enqueue_execution(client, auth_headers, template_id)
+    queue = ExecutionQueue(db_session)
+
+    # When
+    first = queue.claim_next_execution()
+    second = queue.claim_next_execution()
+
+    # Then
+    assert first.status == ExecutionStatus.RUNNING
+    assert second is None
+    assert db_session.query(Execution).count() == 1
+
+
+def test_claim_releases_the_connection(queue_mode, checked_out_connections, client, auth_headers, worker):
+    # Given
+    template_id = _create_template(client, auth_headers).json()["id"]
+    _enqueue_execution(client, auth_headers, template_id)
+    held_before = checked_out_connections()
+
+    # When
+    job = worker._claim_next()
+
+    # Then
+    assert job is not None
+    assert checked_out_connections() == held_before
+    job.close()
+
+
+def test_stale_running_executions_are_requeued(queue_mode, db_session, client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers).json()["id"]
+    stale_id = _enqueue_execution(client, auth_headers, template_id).json()["id"]
+    fresh_id = _enqueue_execution(client, auth_headers, template_id).json()["id"]
+    queue = ExecutionQueue(db_session)
+    queue.claim_next_execution()
+    queue.claim_next_execution()
+    db_session.get(Execution, stale_id).claimed_at = datetime.now(timezone.utc) - timedelta(minutes=10)
+    db_session.commit()
+
+    # When
+    requeued = queue.requeue_stale(lease_seconds=60)
+
+    # Then
+    assert requeued == 1
+    db_session.expire_all()
+    assert db_session.get(Execution, stale_id).status == ExecutionStatus.PENDING
+    assert db_session.get(Execution, stale_id).claimed_at is None
+    assert db_session.get(Execution, fresh_id).status == ExecutionStatus.RUNNING
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+def test_requeued_pipeline_execution_reruns_only_unfinished_steps(
+    mock_get_provider, queue_mode, db_session, worker, client, auth_headers
+):
+    # Given a worker that died while running the second step
+    second_step_started = asyncio.Event()
+
+    async def execute(prompt, model, **kwargs):
+        if prompt == "first":
+            second_step_started.set()
+            await asyncio.Event().wait()
+        return prompt
+
+    mock_provider = AsyncMock()
+    mock_provider.execute.side_effect = execute
+    mock_get_provider.return_value = mock_provider
+    first_template_id = _create_template(client, auth_headers, name="First", content="{{x}}").json()["id"]
+    second_template_id = _create_template(client, auth_headers, name="Second", content="{{a}}").json()["id"]
+    pipeline_id = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Queued Pipeline",
+            "steps": [
+                {"template_id": first_template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "a"},
+                {"template_id": second_template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "b"},
+            ],
+        },
+        headers=auth_headers,
+    ).json()["id"]
+    execution_id = client.post(
+        f"/api/pipelines/{pipeline_id}/execute", json={"variables": {"x": "first"}}, headers=auth_headers
+    ).json()["id"]
+
+    async def run_until_second_step():
+        task = asyncio.create_task(worker._claim_next())
+        await asyncio.wait_for(second_step_started.wait(), timeout=1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run_until_second_step())
+    db_session.get(PipelineExecution, execution_id).claimed_at = datetime.now(timezone.utc) - timedelta(minutes=10)
+    db_session.commit()
+    mock_provider.execute.side_effect = None
+    mock_provider.execute.return_value = "second"
+
+    # When
+    ExecutionQueue(db_session).requeue_stale(lease_seconds=60)
+    asyncio.run(worker.run_once())
+
+    # Then
+    db_session.expire_all()
+    step_executions = (
+        db_session.query(PipelineStepExecution).filter_by(pipeline_execution_id=execution_id).all()
+    )
+    assert sorted(s.step_order for s in step_executions) == [1, 2]
+    assert all(s.status == ExecutionStatus.COMPLETED for s in step_executions)
+    assert db_session.get(PipelineExecution, execution_id).status == ExecutionStatus.COMPLETED
+    assert mock_provider.execute.await_count == 3
+
+
+@patch("app.engine.pipeline_executor.get_provider")
+@patch("app.services.execution_service.get_provider")
+def test_worker_claims_the_oldest_pending_row(
+    mock_execution_provider, mock_pipeline_provider, queue_mode, db_session, worker, client, auth_headers
+):
+    # Given a pipeline execution queued before a single execution
+    mock_provider = AsyncMock()
+    mock_provider.execute.return_value = "output"
+    mock_execution_provider.return_value = mock_provider
+    mock_pipeline_provider.return_value = mock_provider
+    template_id = _create_template(client, auth_headers, content="{{x}}").json()["id"]
+    pipeline_id = client.post(
+        "/api/pipelines/",
+        json={
+            "name": "Queued Pipeline",
+            "steps": [
+                {"template_id": template_id, "provider": "openai", "model": "gpt-4o-mini", "output_variable": "out"},
+            ],
+        },
+        headers=auth_headers,
+    ).json()["id"]
+    pipeline_execution_id = client.post(
+        f"/api/pipelines/{pipeline_id}/execute", json={"variables": {"x": "hello"}}, headers=auth_headers
+    ).json()["id"]
+    execution_id = _enqueue_execution(client, auth_headers, template_id).json()["id"]
+    db_session.get(PipelineExecution, pipeline_execution_id).created_at = datetime.now(timezone.utc) - timedelta(
+        minutes=1
+    )
+    db_session.commit()
+
+    # When
+    asyncio.run(worker.run_once())
+
+    # Then
+    db_session.expire_all()
+    assert db_session.get(PipelineExecution, pipeline_execution_id).status == ExecutionStatus.COMPLETED
+    assert db_session.get(Execution, execution_id).status == ExecutionStatus.PENDING
+
+
+def test_inline_running_executions_are_not_requeued(db_session, client, auth_headers):
+    # Given
+    template_id = _create_template(client, auth_headers).json()["id"]
+    with patch("app.services.execution_service.ExecutionService.run_execution", AsyncMock()):
+        execution_id = _enqueue_execution(client, auth_headers, template_id).json()["id"]
+
+    # When
+    requeued = ExecutionQueue(db_session).requeue_stale(lease_seconds=0)
+
+    # Then
+    assert requeued == 0
+    assert db_session.get(Execution, execution_id).status == ExecutionStatus.RUNNING
+
+
+def test_worker_survives_claim_errors(worker):
+    # Given
+    claimed = asyncio.Event()
+    attempts = []
+
+    def claim_next():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise TimeoutError("QueuePool limit reached")
+        claimed.set()
+        return None
+
+    worker.poll_interval = 0
+
+    async def run():
+        runner = asyncio.create_task(worker.run_forever())
+        await asyncio.wait_for(claimed.wait(), timeout=1)
+        runner.cancel()
+
+    # When
+    with patch.object(worker, "_claim_next", claim_next), patch.object(worker, "run_provider_batches_once", AsyncMock()):
+        asyncio.run(run())
+
+    # Then
+    assert len(attempts) >= 2
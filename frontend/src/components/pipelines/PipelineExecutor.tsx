@@ -24,6 +24,7 @@ function statusBadge(status: string) {
     failed: "badge-failed",
     running: "badge-running",
     pending: "badge-pending",
+    skipped: "badge-pending",
   };
   return (
     <span
@@ -52,6 +53,10 @@ export default function PipelineExecutor({
     }
 
     const firstStep = pipeline.steps[0];
+    if (firstStep.template_id === null) {
+      setIsLoadingVars(false);
+      return;
+    }
     templatesApi.get(firstStep.template_id).then((template) => {
       const content = template.latest_version?.content ?? "";
       const allVars = extractVariableNames(content);
@@ -33,9 +33,9 @@ export default function PipelineForm({
   const [steps, setSteps] = useState<StepDraft[]>(() => {
     if (pipeline) {
       return pipeline.steps.map((s) => ({
-        template_id: s.template_id,
-        provider: s.provider,
-        model: s.model,
+        template_id: s.template_id ?? "",
+        provider: s.provider ?? "",
+        model: s.model ?? "",
         output_variable: s.output_variable,
       }));
     }
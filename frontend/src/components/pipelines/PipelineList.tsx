@@ -60,14 +60,16 @@ function PipelineCard({
             <span className="font-mono text-xs bg-glass-bg-active px-2 py-0.5 rounded-md text-text-secondary">
               {step.step_order}
             </span>
-            <span>{step.template_name}</span>
+            <span>{step.template_name ?? step.step_type}</span>
             <span className="text-text-tertiary">&rarr;</span>
             <span className="font-mono text-xs text-accent-primary">
               {`{{${step.output_variable}}}`}
             </span>
-            <span className="text-xs text-text-tertiary">
-              ({step.provider}/{step.model})
-            </span>
+            {step.provider && (
+              <span className="text-xs text-text-tertiary">
+                ({step.provider}/{step.model})
+              </span>
+            )}
           </div>
         ))}
       </div>
@@ -9,6 +9,7 @@ const STATUS_STYLES: Record<ExecutionStatus, string> = {
   failed: "badge-failed",
   running: "badge-running",
   pending: "badge-pending",
+  skipped: "badge-pending",
 };
 
 function StatusBadge({ status }: { status: ExecutionStatus }) {
@@ -1,4 +1,4 @@
-export type ExecutionStatus = "pending" | "running" | "completed" | "failed";
+export type ExecutionStatus = "pending" | "running" | "completed" | "failed" | "skipped";
 
 export interface Execution {
   id: number;
@@ -10,6 +10,17 @@ export interface Execution {
   status: ExecutionStatus;
   output?: string;
   error?: string;
+  estimated_cost?: number;
+  attempts: number;
+  coalesced: boolean;
+  hedged: boolean;
+  input_tokens?: number;
+  output_tokens?: number;
+  cache_read_tokens: number;
+  cache_write_tokens: number;
+  queue_wait_ms?: number;
+  provider_latency_ms?: number;
+  first_token_ms?: number;
   created_at: string;
   completed_at?: string;
 }
@@ -19,6 +30,7 @@ export interface ExecutionCreateRequest {
   provider: string;
   model: string;
   variables: Record<string, string>;
+  max_cost_usd?: number;
 }
 
 export interface ExecutionListResponse {
@@ -1,13 +1,44 @@
 import type { ExecutionStatus } from "./execution";
 
+export interface StepTarget {
+  provider: string;
+  model: string;
+}
+
+export type StepType = "prompt" | "split" | "map" | "aggregate" | "route";
+
+export interface RouteRule {
+  branch: string;
+  match?: "equals" | "contains" | "regex";
+  value: string;
+}
+
+export interface StepOptions {
+  input_variable?: string;
+  split_by?: "tokens" | "paragraphs" | "lines" | "json";
+  chunk_size?: number;
+  item_variable?: string;
+  max_concurrency?: number;
+  aggregate?: "concat" | "tree";
+  separator?: string;
+  fan_in?: number;
+  routes?: RouteRule[];
+  default_branch?: string;
+  router?: string;
+  branch?: string;
+}
+
 export interface PipelineStep {
   id: number;
   step_order: number;
-  template_id: number;
-  template_name: string;
-  provider: string;
-  model: string;
+  step_type: StepType;
+  template_id: number | null;
+  template_name: string | null;
+  provider: string | null;
+  model: string | null;
   output_variable: string;
+  fallbacks: StepTarget[];
+  options: StepOptions;
 }
 
 export interface Pipeline {
@@ -20,10 +51,13 @@ export interface Pipeline {
 }
 
 export interface PipelineStepCreateRequest {
-  template_id: number;
-  provider: string;
-  model: string;
+  step_type?: StepType;
+  template_id?: number;
+  provider?: string;
+  model?: string;
   output_variable: string;
+  fallbacks?: StepTarget[];
+  options?: StepOptions;
 }
 
 export interface PipelineCreateRequest {
@@ -41,9 +75,22 @@ export interface PipelineStepExecution {
   id: number;
   step_order: number;
   input_prompt: string;
+  provider?: string;
+  model?: string;
   output?: string;
   status: ExecutionStatus;
   error?: string;
+  attempts: number;
+  coalesced: boolean;
+  hedged: boolean;
+  memoized: boolean;
+  input_tokens?: number;
+  output_tokens?: number;
+  cache_read_tokens: number;
+  cache_write_tokens: number;
+  queue_wait_ms?: number;
+  provider_latency_ms?: number;
+  first_token_ms?: number;
 }
 
 export interface PipelineExecution {
@@ -51,6 +98,8 @@ export interface PipelineExecution {
   pipeline_id: number;
   pipeline_name: string;
   status: ExecutionStatus;
+  resumed_from_id?: number;
+  estimated_cost?: number;
   variables: Record<string, string>;
   step_executions: PipelineStepExecution[];
   created_at: string;